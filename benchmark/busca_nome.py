@@ -0,0 +1,86 @@
+"""
+Benchmark da busca aproximada de pacientes por nome, com e sem o índice de trigramas.
+
+Mede o custo adicional do índice na inclusão de pacientes e a latência da busca (p50 e p99) para
+consultas exatas, com erros de digitação, sem acentos e com parte do nome. Sem índice, a busca percorre
+todos os pacientes, então é medida apenas em uma amostra das consultas.
+
+Uso: python -m benchmark.busca_nome [--pacientes 200000] [--consultas 200]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmark.dados import NOMES, SOBRENOMES
+from main.domain import Paciente
+from main.repository import PacienteRepository
+from main.validacao import gerar_cpf
+
+# Nomes do meio, para que os pacientes tenham nomes completos variados, como em um cadastro real
+NOMES_DO_MEIO = ["Aparecida", "Cristina", "Eduardo", "Helena", "Henrique", "Luiz", "Beatriz", "Vitória",
+                 "Gustavo", "Conceição", "Antônio", "Júlia", "Augusto", "Regina", "Caetano", "Inês"]
+
+
+def gerar_nome(rnd: random.Random) -> str:
+    partes = [rnd.choice(NOMES)]
+    if rnd.random() < 0.6:
+        partes.append(rnd.choice(NOMES_DO_MEIO))
+    partes += rnd.sample(SOBRENOMES, rnd.choice((1, 2)))
+    return " ".join(partes)
+
+
+def alterar(nome: str, rnd: random.Random) -> str:
+    """
+    Simula o que a recepção digita: sem acentos, com um erro de digitação ou apenas parte do nome.
+    """
+    import unicodedata
+    tipo = rnd.randrange(4)
+    if tipo == 0:
+        return nome
+    if tipo == 1:
+        return ''.join(c for c in unicodedata.normalize('NFKD', nome) if not unicodedata.combining(c)).lower()
+    palavras = nome.split()
+    if tipo == 2:
+        i = rnd.randrange(len(palavras))
+        palavra = palavras[i]
+        j = rnd.randrange(1, len(palavra))
+        palavras[i] = palavra[:j - 1] + palavra[j] + palavra[j - 1] + palavra[j + 1:]  # Troca duas letras
+        return " ".join(palavras)
+    return f"{palavras[0]} {palavras[-1]}"
+
+
+def medir_buscas(repositorio: PacienteRepository, consultas: list) -> dict:
+    tempos = []
+    for consulta in consultas:
+        inicio = time.perf_counter()
+        repositorio.buscar_por_nome(consulta, 10)
+        tempos.append(time.perf_counter() - inicio)
+    tempos.sort()
+    return {'p50_ms': statistics.median(tempos) * 1000, 'p99_ms': tempos[int(0.99 * (len(tempos) - 1))] * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pacientes', type=int, default=200_000)
+    parser.add_argument('--consultas', type=int, default=200)
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.semente)
+    pacientes = [Paciente.de_dados_validados(gerar_nome(rnd), gerar_cpf(i + 1), f"p{i + 1}@teste.com", "01/01/1990")
+                 for i in range(args.pacientes)]
+    consultas = [alterar(rnd.choice(pacientes).nome, rnd) for _ in range(args.consultas)]
+
+    for indexar_nome in (False, True):
+        repositorio = PacienteRepository(indexar_nome=indexar_nome)
+        inicio = time.perf_counter()
+        repositorio.inserir_lote(pacientes)
+        duracao = time.perf_counter() - inicio
+        print(f"{'Com' if indexar_nome else 'Sem'} índice: inclusão {duracao / len(pacientes) * 1e6:.2f} µs/paciente")
+        medidas = medir_buscas(repositorio, consultas if indexar_nome else consultas[:max(len(consultas) // 20, 3)])
+        print(f"  busca por nome: p50 {medidas['p50_ms']:.2f} ms, p99 {medidas['p99_ms']:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
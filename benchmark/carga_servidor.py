@@ -0,0 +1,81 @@
+"""
+Gerador de carga assíncrono para o servidor de linhas JSON (main.servidor).
+
+Abre várias conexões simultâneas; cada cliente registra pacientes, insere atendimentos na fila,
+consulta o histórico e chama o próximo paciente, medindo a latência de cada requisição.
+Sem --porta, sobe um servidor no próprio processo.
+
+Uso: python -m benchmark.carga_servidor [--conexoes 1000] [--requisicoes 20] [--host H --porta P]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmark.dados import gerar_cpf
+from main.repository import PacienteRepository, AtendimentoRepository
+from main.service import ProntoSocorroService
+from main.servidor import ServidorPS
+
+RISCOS = ['VERMELHO', 'LARANJA', 'AMARELO', 'VERDE', 'AZUL']
+
+
+def percentil(valores, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+async def cliente(indice: int, requisicoes: int, host: str, porta: int, latencias: list):
+    reader, writer = await asyncio.open_connection(host, porta)
+
+    async def enviar(requisicao: dict) -> dict:
+        inicio = time.perf_counter()
+        writer.write(json.dumps(requisicao).encode() + b'\n')
+        await writer.drain()
+        resposta = json.loads(await reader.readline())
+        latencias.append(time.perf_counter() - inicio)
+        return resposta
+
+    for i in range(requisicoes // 4):
+        cpf = gerar_cpf(indice * requisicoes + i + 1)
+        await enviar({'op': 'registrar_paciente', 'nome': 'Maria Silva', 'cpf': cpf,
+                      'email': 'maria@teste.com', 'nascimento': '21/03/2002'})
+        await enviar({'op': 'enfileirar', 'cpf': cpf, 'risco': RISCOS[i % len(RISCOS)]})
+        await enviar({'op': 'historico', 'cpf': cpf})
+        await enviar({'op': 'chamar_proximo'})
+    writer.close()
+    await writer.wait_closed()
+
+
+async def executar(conexoes: int, requisicoes: int, host: str, porta: int):
+    servidor = None
+    if porta is None:
+        paciente_repo = PacienteRepository()
+        servidor = ServidorPS(ProntoSocorroService(paciente_repo, AtendimentoRepository(paciente_repo)))
+        porta = (await servidor.iniciar(host, 0)).sockets[0].getsockname()[1]
+
+    latencias = []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(i, requisicoes, host, porta, latencias) for i in range(conexoes)))
+    tempo = time.perf_counter() - inicio
+
+    if servidor is not None:
+        await servidor.encerrar()
+    print(f"conexões: {conexoes}  requisições: {len(latencias)}  tempo: {tempo:.2f} s  "
+          f"vazão: {len(latencias) / tempo:,.0f} req/s")
+    print(f"latência p50: {percentil(latencias, 50) * 1000:.2f} ms  "
+          f"p99: {percentil(latencias, 99) * 1000:.2f} ms  máx: {max(latencias) * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--conexoes', type=int, default=1000)
+    parser.add_argument('--requisicoes', type=int, default=20, help='requisições por conexão')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int)
+    args = parser.parse_args()
+    asyncio.run(executar(args.conexoes, args.requisicoes, args.host, args.porta))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Mede a vazão do ProntoSocorroService concorrente com 1, 4 e 16 threads.
+
+Cada thread registra pacientes, registra atendimentos, insere-os na fila e chama o próximo
+paciente, simulando recepção e consultórios operando ao mesmo tempo.
+
+Uso: python -m benchmark.concorrencia [--pacientes 20000] [--threads 1 4 16]
+"""
+import argparse
+import threading
+import time
+
+from benchmark.dados import gerar_pacientes
+from main.concorrencia import criar_servico_concorrente
+from main.domain import Risco
+
+RISCOS = list(Risco)
+
+
+def executar(pacientes, threads: int) -> float:
+    ps_service = criar_servico_concorrente()
+    partes = [pacientes[i::threads] for i in range(threads)]
+    barreira = threading.Barrier(threads + 1)
+
+    def trabalhar(parte):
+        barreira.wait()
+        for i, dados in enumerate(parte):
+            paciente = ps_service.registrar_paciente(*dados)
+            atendimento = ps_service.registrar_atendimento(paciente, RISCOS[i % len(RISCOS)])
+            ps_service.inserir_fila_atendimento(atendimento)
+            ps_service.chamar_proximo()
+
+    trabalhadores = [threading.Thread(target=trabalhar, args=(parte,)) for parte in partes]
+    for t in trabalhadores:
+        t.start()
+    barreira.wait()
+    inicio = time.perf_counter()
+    for t in trabalhadores:
+        t.join()
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pacientes', type=int, default=20_000)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 16])
+    args = parser.parse_args()
+
+    pacientes = list(gerar_pacientes(args.pacientes))
+    print(f"{'threads':<10}{'tempo (s)':>12}{'pacientes/s':>16}")
+    for threads in args.threads:
+        tempo = executar(pacientes, threads)
+        print(f"{threads:<10}{tempo:>12.3f}{args.pacientes / tempo:>16,.0f}")
+
+
+if __name__ == '__main__':
+    main()
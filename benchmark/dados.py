@@ -0,0 +1,23 @@
+"""
+Geração de dados sintéticos para os benchmarks.
+"""
+import random
+from typing import Iterator, Tuple
+
+from main.validacao import gerar_cpf
+
+NOMES = ["Ana", "Bruno", "Carla", "Diego", "Eduarda", "Fernando", "Gabriela", "Heitor", "Isabela", "João",
+         "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sofia", "Tiago", "Valéria", "Yuri"]
+SOBRENOMES = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima",
+              "Gomes", "Costa", "Ribeiro", "Martins", "Carvalho", "Araújo", "Melo", "Barbosa", "Rocha"]
+
+
+def gerar_pacientes(quantidade: int, semente: int = 42) -> Iterator[Tuple[str, str, str, str]]:
+    """
+    Gera tuplas (nome, cpf, email, nascimento) de pacientes sintéticos com CPFs distintos.
+    """
+    rnd = random.Random(semente)
+    for i in range(quantidade):
+        nome = f"{rnd.choice(NOMES)} {rnd.choice(SOBRENOMES)}"
+        nascimento = f"{rnd.randint(1, 28):02d}/{rnd.randint(1, 12):02d}/{rnd.randint(1930, 2020)}"
+        yield nome, gerar_cpf(i + 1), f"paciente{i + 1}@teste.com", nascimento
@@ -0,0 +1,108 @@
+"""
+Compara os motores de fila de atendimento sob uma carga de operações de inserção e remoção, uma a uma
+e em lotes (`inserir_lote` e `proximos_entradas`).
+
+Uso: python -m benchmark.fila [--operacoes 1000000] [--lote 32] [--semente 42]
+"""
+import argparse
+import random
+import time
+
+from main.fila import MotorFilaHeap, MotorFilaBaldes
+
+NIVEIS = 5
+MOTORES = {
+    'heap': MotorFilaHeap,
+    'baldes': MotorFilaBaldes,
+}
+
+
+def gerar_carga(operacoes: int, semente: int):
+    """
+    Gera uma sequência de operações: um nível (0 a 4) para inserir ou None para retirar o próximo.
+    Cerca de 55% das operações são inserções, de modo que a fila cresce ao longo da execução.
+    """
+    rnd = random.Random(semente)
+    carga = []
+    tamanho = 0
+    for _ in range(operacoes):
+        if tamanho == 0 or rnd.random() < 0.55:
+            carga.append(rnd.randrange(NIVEIS))
+            tamanho += 1
+        else:
+            carga.append(None)
+            tamanho -= 1
+    return carga
+
+
+def gerar_rajadas(operacoes: int, tamanho_lote: int, semente: int):
+    """
+    Gera uma carga em rajadas, como a chegada de vítimas de um acidente e a troca de plantão:
+    `tamanho_lote` inserções seguidas de 4/5 desse número de retiradas, até completar as operações.
+    """
+    rnd = random.Random(semente)
+    carga = []
+    while len(carga) < operacoes:
+        carga += [rnd.randrange(NIVEIS) for _ in range(tamanho_lote)]
+        carga += [None] * (tamanho_lote * 4 // 5)
+    return carga[:operacoes]
+
+
+def executar(motor, carga) -> float:
+    inserir = motor.inserir
+    proximo = motor.proximo
+    item = object()
+    inicio = time.perf_counter()
+    for nivel in carga:
+        if nivel is None:
+            proximo()
+        else:
+            inserir(nivel, item)
+    return time.perf_counter() - inicio
+
+
+def executar_em_lotes(motor, carga, tamanho_lote: int) -> float:
+    """
+    Executa a mesma carga agrupando as operações consecutivas do mesmo tipo em lotes de até
+    `tamanho_lote` operações.
+    """
+    item = object()
+    lotes = []
+    for nivel in carga:
+        retirada = nivel is None
+        if lotes and lotes[-1][0] == retirada and len(lotes[-1][1]) < tamanho_lote:
+            lotes[-1][1].append((nivel, item))
+        else:
+            lotes.append((retirada, [(nivel, item)]))
+    inicio = time.perf_counter()
+    for retirada, itens in lotes:
+        if retirada:
+            motor.proximos_entradas(len(itens))
+        else:
+            motor.inserir_lote(itens)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--operacoes', type=int, default=1_000_000)
+    parser.add_argument('--lote', type=int, default=32, help='tamanho máximo dos lotes (padrão: 32)')
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    carga = gerar_carga(args.operacoes, args.semente)
+    print(f"{'motor':<18}{'tempo (s)':>12}{'ops/s':>16}")
+    for nome, classe in MOTORES.items():
+        tempo = executar(classe(NIVEIS), carga)
+        print(f"{nome:<18}{tempo:>12.3f}{args.operacoes / tempo:>16,.0f}")
+
+    print(f"\nRajadas de {args.lote} inserções e {args.lote * 4 // 5} retiradas:")
+    rajadas = gerar_rajadas(args.operacoes, args.lote, args.semente)
+    for nome, classe in MOTORES.items():
+        for modo, funcao in (('uma a uma', executar), ('em lotes', lambda m, c: executar_em_lotes(m, c, args.lote))):
+            tempo = funcao(classe(NIVEIS), rajadas)
+            print(f"{f'{nome} ({modo})':<18}{tempo:>12.3f}{args.operacoes / tempo:>16,.0f}")
+
+
+if __name__ == '__main__':
+    main()
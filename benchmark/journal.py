@@ -0,0 +1,69 @@
+"""
+Mede o tempo de recuperação da fila de atendimento a partir do journal.
+
+Gera um log com milhões de eventos (inserções e chamadas) que termina com uma fila de 100 mil
+entradas e mede a recuperação apenas pelo log e a partir de um snapshot.
+
+Uso: python -m benchmark.journal [--eventos 2000000] [--fila 100000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmark.dados import gerar_pacientes
+from main.domain import Paciente, Atendimento, FilaAtendimento, Risco
+from main.journal import JournalFila
+
+RISCOS = list(Risco)
+
+
+def gerar_log(diretorio: str, eventos: int, tamanho_fila: int):
+    pacientes = [Paciente(*dados) for dados in gerar_pacientes(1000)]
+    journal = JournalFila(diretorio, eventos_por_sync=4096, eventos_por_snapshot=eventos + 1)
+    fila = journal.recuperar(FilaAtendimento())
+    chamadas = (eventos - tamanho_fila) // 2
+    for i in range(eventos - chamadas):
+        fila.inserir(Atendimento(pacientes[i % len(pacientes)], RISCOS[i % len(RISCOS)]))
+        if i < chamadas:
+            fila.proximo()
+    journal.fechar()
+    return journal
+
+
+def recuperar(diretorio: str) -> float:
+    inicio = time.perf_counter()
+    journal = JournalFila(diretorio)
+    fila = journal.recuperar(FilaAtendimento())
+    tempo = time.perf_counter() - inicio
+    journal.fechar()
+    return tempo, fila.tamanho()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--eventos', type=int, default=2_000_000)
+    parser.add_argument('--fila', type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        inicio = time.perf_counter()
+        gerar_log(diretorio, args.eventos, args.fila)
+        tempo_geracao = time.perf_counter() - inicio
+        tamanho_log = os.path.getsize(os.path.join(diretorio, 'fila-0.log'))
+        print(f"log: {args.eventos:,} eventos, {tamanho_log / 2**20:.0f} MiB, "
+              f"gravado em {tempo_geracao:.1f} s ({args.eventos / tempo_geracao:,.0f} eventos/s)")
+
+        tempo, tamanho = recuperar(diretorio)
+        print(f"recuperação pelo log: {tempo:.2f} s, fila com {tamanho:,} entradas")
+
+        journal = JournalFila(diretorio)
+        journal.recuperar(FilaAtendimento())
+        journal.snapshot()
+        journal.fechar()
+        tempo, tamanho = recuperar(diretorio)
+        print(f"recuperação pelo snapshot: {tempo:.2f} s, fila com {tamanho:,} entradas")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Compara, com tracemalloc, a memória ocupada pelo histórico de atendimentos encerrados.
+
+"antes": atendimentos como dataclasses comuns (com __dict__) em uma lista e em listas por paciente,
+como no repositório original. "depois": AtendimentoRepository com entidades em __slots__ e
+atendimentos encerrados apenas no arquivo colunar.
+
+Uso: python -m benchmark.memoria [--atendimentos 500000] [--pacientes 50000]
+"""
+import argparse
+import gc
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from benchmark.dados import gerar_pacientes
+from main.domain import Paciente, Atendimento, Risco
+from main.repository import PacienteRepository, AtendimentoRepository
+
+RISCOS = list(Risco)
+
+
+@dataclass
+class AtendimentoAntigo:
+    """Representação original do atendimento (dataclass sem __slots__)."""
+    paciente: object
+    risco: Risco
+    entrada: datetime
+
+
+def medir(construir):
+    gc.collect()
+    tracemalloc.start()
+    inicio = tracemalloc.get_traced_memory()[0]
+    estrutura = construir()
+    gc.collect()
+    total = tracemalloc.get_traced_memory()[0] - inicio
+    tracemalloc.stop()
+    return total, estrutura
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--atendimentos', type=int, default=500_000)
+    parser.add_argument('--pacientes', type=int, default=50_000)
+    args = parser.parse_args()
+
+    paciente_repo = PacienteRepository()
+    for dados in gerar_pacientes(args.pacientes):
+        paciente_repo.inserir(Paciente(*dados))
+    pacientes = list(paciente_repo.pacientes.values())
+    base = datetime(2024, 1, 1)
+
+    def dados_atendimento(i):
+        return pacientes[i % len(pacientes)], RISCOS[i % len(RISCOS)], base + timedelta(seconds=37 * i)
+
+    def antes():
+        atendimentos, por_paciente = [], {}
+        for i in range(args.atendimentos):
+            atendimento = AtendimentoAntigo(*dados_atendimento(i))
+            atendimentos.append(atendimento)
+            por_paciente.setdefault(atendimento.paciente.cpf, []).append(atendimento)
+        return atendimentos, por_paciente
+
+    def depois():
+        repo = AtendimentoRepository(paciente_repo)
+        for i in range(args.atendimentos):
+            repo.inserir(Atendimento(*dados_atendimento(i)))
+        return repo
+
+    memoria_antes, _ = medir(antes)
+    memoria_depois, _ = medir(depois)
+    print(f"{args.atendimentos:,} atendimentos de {args.pacientes:,} pacientes")
+    print(f"antes:  {memoria_antes / 2**20:8.1f} MiB ({memoria_antes / args.atendimentos:.0f} bytes/atendimento)")
+    print(f"depois: {memoria_depois / 2**20:8.1f} MiB ({memoria_depois / args.atendimentos:.0f} bytes/atendimento)")
+
+
+if __name__ == '__main__':
+    main()
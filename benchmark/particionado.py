@@ -0,0 +1,56 @@
+"""
+Mede a escalabilidade dos repositórios particionados entre processos (`main.particionado`).
+
+Para cada número de partições, importa pacientes sintéticos em lotes (validação, deduplicação e
+inserção feitas dentro das partições) e consulta todos os CPFs em lotes com `existentes`. Para
+comparação, a linha "local" usa o `PacienteRepository` em memória, no próprio processo.
+
+Uso: python -m benchmark.particionado [--pacientes 500000] [--particoes 1 2 4 8] [--lote 5000]
+"""
+import argparse
+import os
+import time
+
+from benchmark.dados import gerar_pacientes
+from main.importacao import CAMPOS, em_lotes, importar_pacientes
+from main.particionado import criar_repositorios_particionados
+from main.repository import PacienteRepository
+
+
+def medir(paciente_repo, linhas, lote: int):
+    inicio = time.perf_counter()
+    resultado = importar_pacientes(paciente_repo, iter(linhas), tamanho_lote=lote)
+    tempo_importacao = time.perf_counter() - inicio
+    assert resultado.importados == len(linhas)
+
+    inicio = time.perf_counter()
+    for bloco in em_lotes((registro['cpf'] for _, registro in linhas), lote):
+        paciente_repo.existentes(bloco)
+    tempo_consulta = time.perf_counter() - inicio
+    return len(linhas) / tempo_importacao, len(linhas) / tempo_consulta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pacientes', type=int, default=500_000)
+    parser.add_argument('--particoes', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--lote', type=int, default=5000)
+    args = parser.parse_args()
+
+    linhas = [(i, dict(zip(CAMPOS, dados))) for i, dados in enumerate(gerar_pacientes(args.pacientes))]
+    print(f"{os.cpu_count()} núcleos, {args.pacientes:,} pacientes, lotes de {args.lote:,}")
+    print(f"{'partições':>10} {'importação/s':>14} {'consultas/s':>14}")
+
+    importacao, consulta = medir(PacienteRepository(), linhas, args.lote)
+    print(f"{'local':>10} {importacao:>14,.0f} {consulta:>14,.0f}")
+    for particoes in args.particoes:
+        paciente_repo, _ = criar_repositorios_particionados(particoes)
+        try:
+            importacao, consulta = medir(paciente_repo, linhas, args.lote)
+        finally:
+            paciente_repo.particoes.fechar()
+        print(f"{particoes:>10} {importacao:>14,.0f} {consulta:>14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
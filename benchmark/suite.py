@@ -0,0 +1,174 @@
+"""
+Suíte de benchmarks das operações do ProntoSocorroService, com relatório em JSON.
+
+Para cada tamanho de população (pacientes cadastrados, atendimentos no histórico e na fila), mede cada
+operação chamada uma a uma e relata a vazão e as latências p50 e p99. Com --base, compara o resultado
+com um relatório gravado anteriormente e termina com código 1 se alguma métrica piorar além do limite.
+
+Uso: python -m benchmark.suite [--tamanhos 1000 10000 100000] [--amostras 5000] [--saida atual.json]
+                               [--base base.json] [--limite 0.25] [--metricas p50_us]
+"""
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from benchmark.dados import gerar_cpf, gerar_pacientes
+from main.domain import Paciente, Atendimento, FichaAnalise, Risco
+from main.repository import PacienteRepository, AtendimentoRepository
+from main.service import ProntoSocorroService
+
+RISCOS = list(Risco)
+# Métricas em que um valor maior é uma piora (as demais, como a vazão, pioram ao diminuir)
+LATENCIAS = ('p50_us', 'p99_us')
+
+
+def medir(operacao: Callable, argumentos: List[tuple]) -> Dict[str, float]:
+    """
+    Chama `operacao(*args)` para cada tupla de argumentos, medindo cada chamada, e retorna a vazão
+    (operações/s) e as latências p50 e p99 em microssegundos.
+    """
+    relogio = time.perf_counter_ns
+    tempos = []
+    registrar = tempos.append
+    gc.disable()  # Evita que uma coleta de lixo caia dentro de uma chamada medida
+    try:
+        for args in argumentos:
+            inicio = relogio()
+            operacao(*args)
+            registrar(relogio() - inicio)
+    finally:
+        gc.enable()
+    percentis = statistics.quantiles(tempos, n=100, method='inclusive')
+    return {
+        'ops_por_s': round(len(tempos) / (sum(tempos) / 1e9), 1),
+        'p50_us': round(percentis[49] / 1000, 3),
+        'p99_us': round(percentis[98] / 1000, 3),
+    }
+
+
+def popular(tamanho: int, semente: int) -> ProntoSocorroService:
+    """
+    Cria um serviço com `tamanho` pacientes, `tamanho` atendimentos no histórico (dez por paciente,
+    para um décimo dos pacientes) e `tamanho` atendimentos aguardando na fila.
+    """
+    rnd = random.Random(semente)
+    pacientes = PacienteRepository()
+    pacientes.inserir_lote(Paciente.de_dados_validados(*dados) for dados in gerar_pacientes(tamanho, semente))
+    ps_service = ProntoSocorroService(pacientes, AtendimentoRepository(pacientes))
+    lista = list(pacientes.pacientes.values())
+    inicio = datetime(2024, 1, 1)
+    for i in range(tamanho):
+        ps_service.atendimentos.inserir(
+            Atendimento(lista[i % max(tamanho // 10, 1)], rnd.choice(RISCOS), inicio + timedelta(minutes=i)))
+    for i in range(tamanho):
+        ps_service.inserir_fila_atendimento(ps_service.registrar_atendimento(lista[i], rnd.choice(RISCOS)))
+    return ps_service
+
+
+def executar(tamanho: int, amostras: int, semente: int) -> Dict[str, Dict[str, float]]:
+    """
+    Mede as operações do serviço sobre uma população do tamanho informado. As operações sobre a fila
+    são medidas com a fila já contendo `tamanho` atendimentos.
+    """
+    rnd = random.Random(semente)
+    ps_service = popular(tamanho, semente)
+    pacientes = list(ps_service.pacientes.pacientes.values())
+    com_historico = pacientes[:max(tamanho // 10, 1)]
+    resultados = {}
+
+    novos = [("Paciente Novo", gerar_cpf(tamanho + i + 1), f"novo{i}@teste.com", "01/01/2000") for i in range(amostras)]
+    resultados['registrar_paciente'] = medir(ps_service.registrar_paciente, novos)
+    resultados['buscar_paciente'] = medir(ps_service.pacientes.buscar,
+                                          [(rnd.choice(pacientes).cpf,) for _ in range(amostras)])
+    fichas = [(FichaAnalise(*(rnd.random() < 0.3 for _ in range(4))),) for _ in range(amostras)]
+    resultados['classificar_risco'] = medir(ps_service.classificar_risco, fichas)
+
+    atendimentos = []
+    resultados['registrar_atendimento'] = medir(
+        lambda paciente, risco: atendimentos.append(ps_service.registrar_atendimento(paciente, risco)),
+        [(rnd.choice(pacientes), rnd.choice(RISCOS)) for _ in range(amostras)])
+    entradas = []
+    resultados['inserir_fila_atendimento'] = medir(
+        lambda atendimento: entradas.append(ps_service.inserir_fila_atendimento(atendimento)),
+        [(atendimento,) for atendimento in atendimentos])
+    resultados['reclassificar'] = medir(ps_service.reclassificar,
+                                        [(entrada, rnd.choice(RISCOS)) for entrada in entradas])
+    resultados['remover_da_fila'] = medir(ps_service.remover_da_fila, [(entrada,) for entrada in entradas])
+    resultados['chamar_proximo'] = medir(ps_service.chamar_proximo, [()] * min(amostras, tamanho))
+
+    resultados['buscar_historico'] = medir(ps_service.buscar_historico,
+                                           [(rnd.choice(com_historico),) for _ in range(amostras)])
+    inicio = datetime(2024, 1, 1)
+    periodos = []
+    for _ in range(amostras):
+        deslocamento = timedelta(minutes=rnd.randrange(tamanho))
+        periodos.append((rnd.choice(com_historico), inicio + deslocamento, inicio + deslocamento + timedelta(days=1)))
+    resultados['buscar_historico_periodo'] = medir(ps_service.buscar_historico, periodos)
+    return resultados
+
+
+def comparar(atual: dict, base: dict, limite: float, metricas=LATENCIAS[:1]) -> List[str]:
+    """
+    Compara dois relatórios e retorna a descrição de cada métrica que piorou mais que `limite`
+    (fração; 0.25 = 25%) em relação à base. Tamanhos e operações ausentes em um dos relatórios são
+    ignorados.
+    """
+    regressoes = []
+    for tamanho, operacoes in atual['resultados'].items():
+        for operacao, medidas in operacoes.items():
+            anteriores = base['resultados'].get(tamanho, {}).get(operacao)
+            if not anteriores:
+                continue
+            for metrica in metricas:
+                antes, depois = anteriores[metrica], medidas[metrica]
+                variacao = (depois - antes) / antes if metrica in LATENCIAS else (antes - depois) / antes
+                if variacao > limite:
+                    regressoes.append(f"{operacao} ({tamanho}): {metrica} {antes} -> {depois} "
+                                      f"({variacao:+.0%} pior, limite {limite:.0%})")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[1000, 10_000, 100_000])
+    parser.add_argument('--amostras', type=int, default=5000, help='chamadas medidas por operação')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--saida', help='grava o relatório JSON neste arquivo (padrão: saída padrão)')
+    parser.add_argument('--base', help='relatório JSON de referência para detectar regressões')
+    parser.add_argument('--limite', type=float, default=0.25, help='piora tolerada em relação à base (padrão: 0.25)')
+    parser.add_argument('--metricas', nargs='+', default=['p50_us'], choices=['ops_por_s', *LATENCIAS],
+                        help='métricas comparadas com a base (padrão: p50_us)')
+    args = parser.parse_args()
+
+    relatorio = {
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'amostras': args.amostras,
+        'resultados': {str(tamanho): executar(tamanho, args.amostras, args.semente) for tamanho in args.tamanhos},
+    }
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto + '\n')
+    else:
+        print(texto)
+
+    if args.base:
+        with open(args.base, encoding='utf-8') as arquivo:
+            regressoes = comparar(relatorio, json.load(arquivo), args.limite, args.metricas)
+        for regressao in regressoes:
+            print(f"REGRESSÃO: {regressao}", file=sys.stderr)
+        if regressoes:
+            sys.exit(1)
+        print("Nenhuma regressão em relação à base.", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Compara a validação de pacientes objeto a objeto com a validação em colunas (`main.validacao`).
+
+"objeto": constrói um `Paciente` por registro, como no cadastro individual. "colunas": valida o
+lote inteiro com `validar_colunas`, com NumPy quando instalado.
+
+Uso: python -m benchmark.validacao [--registros 1000000]
+"""
+import argparse
+import time
+
+from benchmark.dados import gerar_pacientes
+from main import validacao
+from main.domain import Paciente
+from main.validacao import validar_colunas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--registros', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    registros = list(gerar_pacientes(args.registros))
+    colunas = tuple(zip(*registros))
+
+    inicio = time.perf_counter()
+    for registro in registros:
+        Paciente(*registro)
+    tempo = time.perf_counter() - inicio
+    print(f"objeto:  {tempo:.2f} s ({args.registros / tempo:,.0f} registros/s)")
+
+    inicio = time.perf_counter()
+    validar_colunas(*colunas)
+    tempo = time.perf_counter() - inicio
+    numpy = 'com NumPy' if validacao.np is not None else 'sem NumPy'
+    print(f"colunas: {tempo:.2f} s ({args.registros / tempo:,.0f} registros/s, {numpy})")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,103 @@
-from main.cli import TerminalClient
-from main.repository import PacienteRepository, AtendimentoRepository
-from main.service import ProntoSocorroService
+import argparse
+import sys
+
+# Os módulos do sistema são importados sob demanda, apenas os do backend e do modo escolhidos: o modo
+# em lote não carrega o menu interativo, e o backend em memória não carrega o SQLite nem as partições.
+
+
+def criar_repositorios(backend: str, banco: str, particoes: int, cache: int = 0):
+    if backend == 'particionado':
+        from main.particionado import Particoes, PacienteRepositoryParticionado, AtendimentoRepositoryParticionado
+        paciente_repo = PacienteRepositoryParticionado(Particoes(particoes, indexar_nome=True))
+        repositorio_atendimentos = AtendimentoRepositoryParticionado
+    elif backend == 'sqlite':
+        from main.repository_sqlite import PoolConexoes, PacienteRepositorySQLite, AtendimentoRepositorySQLite
+        paciente_repo = PacienteRepositorySQLite(PoolConexoes(banco))
+        repositorio_atendimentos = AtendimentoRepositorySQLite
+    else:
+        from main.repository import PacienteRepository, AtendimentoRepository
+        paciente_repo, repositorio_atendimentos = PacienteRepository(indexar_nome=True), AtendimentoRepository
+    if cache:
+        from main.cache import PacienteRepositoryCache
+        paciente_repo = PacienteRepositoryCache(paciente_repo, cache)
+    return paciente_repo, repositorio_atendimentos(paciente_repo)
+
+
+def importar(ps_service, args):
+    resultado = ps_service.importar_pacientes(args.arquivo, args.rejeitados, args.lote)
+    print(f"Registros lidos: {resultado.lidos}")
+    print(f"Pacientes importados: {resultado.importados}")
+    print(f"Registros rejeitados: {resultado.rejeitados}")
+
+
+def executar_lote(ps_service, args) -> int:
+    from main.lote import ExecutorLote
+    executor = ExecutorLote(ps_service, sys.stdout, args.formato, args.parar_no_erro)
+    if args.roteiro == '-':
+        resultado = executor.executar(sys.stdin)
+    else:
+        with open(args.roteiro, encoding='utf-8') as roteiro:
+            resultado = executor.executar(roteiro)
+    sys.stdout.flush()
+    print(f"Operações: {resultado.operacoes}, erros: {resultado.erros}, "
+          f"{resultado.operacoes_por_segundo:.0f} operações/s", file=sys.stderr)
+    return 1 if resultado.erros else 0
+
 
 if __name__ == '__main__':
-    paciente_repo = PacienteRepository()
-    atendimento_repo = AtendimentoRepository(paciente_repo)
-    ps_service = ProntoSocorroService(paciente_repo, atendimento_repo)
-    cli = TerminalClient(ps_service)
-    cli.executar()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Sistema de controle de fila de atendimentos de um pronto-socorro.')
+    parser.add_argument('--backend', choices=['memoria', 'sqlite', 'particionado'], default='memoria',
+                        help='onde armazenar pacientes e atendimentos (padrão: memoria)')
+    parser.add_argument('--banco', default='pronto_socorro.db', help='arquivo do banco SQLite')
+    parser.add_argument('--particoes', type=int,
+                        help='processos do backend particionado (padrão: número de núcleos)')
+    parser.add_argument('--cache', type=int, metavar='PACIENTES',
+                        help='guarda os pacientes buscados mais recentemente em um cache LRU com esta capacidade '
+                             '(padrão: 1024 nos backends sqlite e particionado; 0 desativa)')
+    parser.add_argument('--journal', metavar='DIRETORIO',
+                        help='grava as alterações da fila neste diretório e a recupera ao iniciar')
+    parser.add_argument('--metricas', nargs='?', const='', metavar='ARQUIVO',
+                        help='mede as operações do serviço; com ARQUIVO, grava as métricas nele ao sair')
+    comandos = parser.add_subparsers(dest='comando', metavar='COMANDO',
+                                     help='sem comando, abre o menu interativo')
+
+    parser_importar = comandos.add_parser('importar', help='importa pacientes de um arquivo CSV ou JSONL')
+    parser_importar.add_argument('arquivo', help='arquivo .csv (com cabeçalho nome,cpf,email,nascimento) ou .jsonl')
+    parser_importar.add_argument('--rejeitados', metavar='RELATORIO', help='grava os registros rejeitados neste CSV')
+    parser_importar.add_argument('--lote', type=int, default=1000, help='registros por lote (padrão: 1000)')
+
+    parser_lote = comandos.add_parser('lote', help='executa um roteiro de operações, uma por linha, sem o menu')
+    parser_lote.add_argument('roteiro', nargs='?', default='-', help='arquivo do roteiro (padrão: entrada padrão)')
+    parser_lote.add_argument('--formato', choices=['texto', 'json', 'silencioso'], default='texto',
+                             help='saída de cada operação; silencioso mostra apenas os erros (padrão: texto)')
+    parser_lote.add_argument('--parar-no-erro', action='store_true', help='interrompe o roteiro no primeiro erro')
+    args = parser.parse_args()
+
+    from main.domain import FilaAtendimento
+    from main.service import ProntoSocorroService
+
+    cache = args.cache if args.cache is not None else (0 if args.backend == 'memoria' else 1024)
+    paciente_repo, atendimento_repo = criar_repositorios(args.backend, args.banco, args.particoes, cache)
+    fila = FilaAtendimento()
+    if args.journal:
+        from main.journal import JournalFila
+        fila = JournalFila(args.journal).recuperar(fila, paciente_repo)
+    ps_service = ProntoSocorroService(paciente_repo, atendimento_repo, fila)
+    if args.metricas is not None:
+        from main.metricas import instrumentar
+        instrumentar(ps_service)
+    codigo = 0
+    try:
+        if args.comando == 'importar':
+            importar(ps_service, args)
+        elif args.comando == 'lote':
+            codigo = executar_lote(ps_service, args)
+        else:
+            from main.cli import TerminalClient
+            TerminalClient(ps_service).executar()
+    finally:
+        if args.metricas:
+            ps_service.metricas.gravar(args.metricas, fila, ps_service.estatisticas_cache())
+        if fila.journal is not None:
+            fila.journal.fechar()
+    sys.exit(codigo)
@@ -0,0 +1,137 @@
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from main.domain import Risco
+from main.error import ValidacaoError
+
+# Largura, em microssegundos, dos períodos dos agregados
+GRANULARIDADES: Dict[str, int] = {
+    'hora': 3600 * 10 ** 6,
+    'dia': 86400 * 10 ** 6,
+}
+
+# Série de contagens: início de cada período e a quantidade de atendimentos por risco nele
+Serie = List[Tuple[datetime, Dict[Risco, int]]]
+
+_EPOCA = datetime(1970, 1, 1)
+_MICROSSEGUNDO = timedelta(microseconds=1)
+
+
+class IndiceTemporal:
+    """
+    Índice dos atendimentos pelo horário de entrada, para relatórios por período.
+
+    Para cada risco, mantém as entradas (em microssegundos desde 01/01/1970) em um array ordenado;
+    para cada granularidade (hora e dia), a contagem de atendimentos por risco em cada período com
+    algum atendimento, além das chaves desses períodos em ordem. Os agregados são atualizados a cada
+    inclusão e reclassificação, de modo que contar os atendimentos de um intervalo custa O(log n) e
+    montar uma série custa O(log n + períodos), sem percorrer os atendimentos.
+    """
+    def __init__(self):
+        self.entradas: Dict[int, array] = {risco.value: array('q') for risco in Risco}
+        self.agregados: Dict[str, Dict[int, array]] = {granularidade: {} for granularidade in GRANULARIDADES}
+        self.chaves: Dict[str, array] = {granularidade: array('q') for granularidade in GRANULARIDADES}
+
+    def adicionar(self, risco: int, entrada: int):
+        """
+        Inclui um atendimento do risco (valor) e entrada (microssegundos) informados.
+        """
+        entradas = self.entradas[risco]
+        if not entradas or entradas[-1] <= entrada:
+            entradas.append(entrada)  # Caso comum: atendimentos chegam em ordem cronológica
+        else:
+            insort(entradas, entrada)
+        for granularidade, largura in GRANULARIDADES.items():
+            chave = entrada // largura
+            contagens = self.agregados[granularidade].get(chave)
+            if contagens is None:
+                contagens = self.agregados[granularidade][chave] = array('I', bytes(4 * len(Risco)))
+                chaves = self.chaves[granularidade]
+                if not chaves or chaves[-1] < chave:
+                    chaves.append(chave)
+                else:
+                    insort(chaves, chave)
+            contagens[risco - 1] += 1
+
+    def reclassificar(self, entrada: int, anterior: int, novo: int):
+        """
+        Move um atendimento já incluído do risco `anterior` para o risco `novo` (valores).
+        """
+        entradas = self.entradas[anterior]
+        del entradas[bisect_left(entradas, entrada)]
+        insort(self.entradas[novo], entrada)
+        for granularidade, largura in GRANULARIDADES.items():
+            contagens = self.agregados[granularidade][entrada // largura]
+            contagens[anterior - 1] -= 1
+            contagens[novo - 1] += 1
+
+    def contar(self, inicio: Optional[datetime] = None, fim: Optional[datetime] = None) -> Dict[Risco, int]:
+        """
+        Retorna a quantidade de atendimentos de cada risco com entrada entre `inicio` e `fim`
+        (inclusive).
+        """
+        return self._contar(None if inicio is None else _microssegundos(inicio),
+                            None if fim is None else _microssegundos(fim))
+
+    def _contar(self, inicio: Optional[int], fim: Optional[int]) -> Dict[Risco, int]:
+        contagens = {}
+        for risco in Risco:
+            entradas = self.entradas[risco.value]
+            i = 0 if inicio is None else bisect_left(entradas, inicio)
+            j = len(entradas) if fim is None else bisect_right(entradas, fim)
+            contagens[risco] = max(j - i, 0)
+        return contagens
+
+    def serie(self, granularidade: str = 'hora', inicio: Optional[datetime] = None,
+              fim: Optional[datetime] = None) -> Serie:
+        """
+        Retorna, em ordem cronológica, os períodos (horas ou dias) com algum atendimento entre `inicio`
+        e `fim` (inclusive) e a quantidade de atendimentos de cada risco em cada um. Nos períodos que
+        começam antes de `inicio` ou terminam depois de `fim`, apenas os atendimentos do intervalo são
+        contados.
+        """
+        largura = largura_periodo(granularidade)
+        inicio_us = None if inicio is None else _microssegundos(inicio)
+        fim_us = None if fim is None else _microssegundos(fim)
+        chaves, agregados = self.chaves[granularidade], self.agregados[granularidade]
+        i = 0 if inicio_us is None else bisect_left(chaves, inicio_us // largura)
+        j = len(chaves) if fim_us is None else bisect_right(chaves, fim_us // largura)
+        serie = []
+        for chave in chaves[i:j]:
+            comeco, termino = chave * largura, (chave + 1) * largura - 1
+            if (inicio_us is not None and comeco < inicio_us) or (fim_us is not None and termino > fim_us):
+                contagens = self._contar(comeco if inicio_us is None else max(comeco, inicio_us),
+                                         termino if fim_us is None else min(termino, fim_us))
+            else:
+                contagens = dict(zip(Risco, agregados[chave]))
+            if any(contagens.values()):
+                serie.append((_EPOCA + timedelta(microseconds=comeco), contagens))
+        return serie
+
+
+def largura_periodo(granularidade: str) -> int:
+    largura = GRANULARIDADES.get(granularidade)
+    if largura is None:
+        raise ValidacaoError(f"Granularidade desconhecida, use uma de: {', '.join(GRANULARIDADES)}.")
+    return largura
+
+
+def somar_contagens(contagens: List[Dict[Risco, int]]) -> Dict[Risco, int]:
+    return {risco: sum(parcial[risco] for parcial in contagens) for risco in Risco}
+
+
+def somar_series(series: List[Serie]) -> Serie:
+    """
+    Combina séries de contagens (por exemplo, de várias partições) somando os mesmos períodos.
+    """
+    periodos: Dict[datetime, List[Dict[Risco, int]]] = {}
+    for serie in series:
+        for periodo, contagens in serie:
+            periodos.setdefault(periodo, []).append(contagens)
+    return [(periodo, somar_contagens(periodos[periodo])) for periodo in sorted(periodos)]
+
+
+def _microssegundos(entrada: datetime) -> int:
+    return (entrada - _EPOCA) // _MICROSSEGUNDO
@@ -0,0 +1,192 @@
+import heapq
+import re
+import unicodedata
+from array import array
+from collections import Counter
+from itertools import islice, product
+from typing import Callable, Dict, Iterable, List, Sequence, Set, Tuple
+
+# Semelhança mínima (índice de Jaccard entre os trigramas) para que uma palavra do nome corresponda a
+# uma palavra da consulta
+LIMIAR_SEMELHANCA = 0.3
+# Palavras do vocabulário consideradas para cada palavra da consulta, das mais semelhantes às menos
+CANDIDATAS_POR_PALAVRA = 5
+# Palavras da consulta consideradas (as demais são ignoradas)
+PALAVRAS_CONSULTA = 5
+
+_SEPARADORES = re.compile(r"[^0-9a-z]+")
+
+# Intersecção das postagens: recebe as palavras de uma combinação, a quantidade de chaves desejada e
+# as chaves já retornadas, e retorna até essa quantidade de chaves novas com todas as palavras
+Intersecao = Callable[[Sequence[str], int, Set[int]], List[int]]
+
+
+def normalizar_nome(nome: str) -> str:
+    """
+    Remove acentos e pontuação e converte para minúsculas: "José D'Ávila" vira "jose d avila".
+    """
+    decomposto = unicodedata.normalize('NFKD', nome.lower())
+    sem_acentos = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return _SEPARADORES.sub(' ', sem_acentos).strip()
+
+
+def palavras_nome(nome: str) -> List[str]:
+    """
+    Palavras distintas do nome normalizado, na ordem em que aparecem.
+    """
+    return list(dict.fromkeys(normalizar_nome(nome).split()))
+
+
+def trigramas(palavra: str) -> Set[str]:
+    # Como no pg_trgm: dois espaços antes e um depois, para valorizar o início da palavra
+    palavra = f"  {palavra} "
+    return {palavra[i:i + 3] for i in range(len(palavra) - 2)}
+
+
+def semelhanca(a: Set[str], b: Set[str]) -> float:
+    comuns = len(a & b)
+    return comuns / (len(a) + len(b) - comuns)
+
+
+class VocabularioTrigramas:
+    """
+    Índice invertido de trigramas sobre as palavras distintas dos nomes. Mesmo com milhões de
+    pacientes, o vocabulário tem poucas dezenas de milhares de palavras, então as palavras semelhantes a
+    uma palavra da consulta são encontradas contando os trigramas em comum apenas nas postagens dos
+    trigramas da consulta.
+    """
+    def __init__(self):
+        self.palavras: List[str] = []
+        self.tamanhos = array('H')  # Quantidade de trigramas de cada palavra
+        self.ids: Dict[str, int] = {}
+        self.postagens: Dict[str, array] = {}
+
+    def adicionar(self, palavra: str):
+        if palavra in self.ids:
+            return
+        id_ = self.ids[palavra] = len(self.palavras)
+        self.palavras.append(palavra)
+        grupo = trigramas(palavra)
+        self.tamanhos.append(len(grupo))
+        for trigrama in grupo:
+            postagem = self.postagens.get(trigrama)
+            if postagem is None:
+                postagem = self.postagens[trigrama] = array('I')
+            postagem.append(id_)
+
+    def semelhantes(self, palavra: str, limiar: float = LIMIAR_SEMELHANCA,
+                    limite: int = CANDIDATAS_POR_PALAVRA) -> List[Tuple[str, float]]:
+        """
+        Retorna até `limite` palavras do vocabulário com semelhança de pelo menos `limiar` com a
+        palavra informada, das mais semelhantes às menos.
+        """
+        grupo = trigramas(palavra)
+        comuns = Counter()
+        for trigrama in grupo:
+            postagem = self.postagens.get(trigrama)
+            if postagem is not None:
+                comuns.update(postagem)
+        tamanho, tamanhos = len(grupo), self.tamanhos
+        pontuadas = ((comum / (tamanho + tamanhos[id_] - comum), id_) for id_, comum in comuns.items())
+        melhores = heapq.nlargest(limite, (item for item in pontuadas if item[0] >= limiar),
+                                  key=lambda item: (item[0], -item[1]))
+        return [(self.palavras[id_], valor) for valor, id_ in melhores]
+
+
+def buscar_nome(consulta: str, vocabulario: VocabularioTrigramas, intersecao: Intersecao,
+                limite: int) -> List[Tuple[int, float]]:
+    """
+    Busca aproximada por nome: retorna até `limite` chaves com a sua semelhança com a consulta (de 0
+    a 1), das mais semelhantes às menos.
+
+    Cada palavra da consulta corresponde a uma das palavras mais semelhantes do vocabulário, ou a
+    nenhuma; a semelhança de um nome é a média, entre as palavras da consulta, da semelhança da palavra
+    correspondente. As combinações de palavras são visitadas da mais semelhante para a menos, e as
+    chaves de cada combinação vêm da intersecção das suas postagens, até completar o limite. Assim,
+    apenas as postagens das palavras candidatas são lidas.
+    """
+    palavras = palavras_nome(consulta)[:PALAVRAS_CONSULTA]
+    if not palavras or limite < 1:
+        return []
+    opcoes = [vocabulario.semelhantes(palavra) + [(None, 0.0)] for palavra in palavras]
+    combinacoes = []
+    for combinacao in product(*opcoes):
+        total = sum(valor for _, valor in combinacao)
+        if total > 0:
+            combinacoes.append((-total, tuple(palavra for palavra, _ in combinacao if palavra is not None)))
+    combinacoes.sort()
+
+    resultado: List[Tuple[int, float]] = []
+    vistos: Set[int] = set()
+    for total, combinacao in combinacoes:
+        chaves = intersecao(combinacao, limite - len(resultado), vistos)
+        vistos.update(chaves)
+        resultado += [(chave, -total / len(palavras)) for chave in chaves]
+        if len(resultado) >= limite:
+            break
+    return resultado
+
+
+class IndiceNomes:
+    """
+    Índice de busca aproximada por nome (sem acentos, sem diferenciar maiúsculas e tolerante a erros de
+    digitação), atualizado a cada inclusão.
+
+    Para cada palavra dos nomes, guarda as chaves (CPFs como inteiros) dos pacientes que a contêm, na
+    ordem de inclusão; as palavras semelhantes às da consulta são encontradas em um
+    `VocabularioTrigramas`. Ver `buscar_nome`.
+    """
+    def __init__(self):
+        self.vocabulario = VocabularioTrigramas()
+        self.postagens: Dict[str, array] = {}
+
+    def adicionar(self, chave: int, nome: str):
+        for palavra in palavras_nome(nome):
+            postagem = self.postagens.get(palavra)
+            if postagem is None:
+                postagem = self.postagens[palavra] = array('Q')
+                self.vocabulario.adicionar(palavra)
+            postagem.append(chave)
+
+    def remover(self, chave: int, nome: str):
+        for palavra in palavras_nome(nome):
+            self.postagens[palavra].remove(chave)
+
+    def buscar(self, consulta: str, limite: int = 10) -> List[Tuple[int, float]]:
+        return buscar_nome(consulta, self.vocabulario, self._intersecao, limite)
+
+    def _intersecao(self, palavras: Sequence[str], quantidade: int, vistos: Set[int]) -> List[int]:
+        postagens = sorted((self.postagens[palavra] for palavra in palavras), key=len)
+        if len(postagens) == 1:
+            return list(islice((chave for chave in postagens[0] if chave not in vistos), quantidade))
+        comuns = set(postagens[0]).difference(vistos)
+        for postagem in postagens[1:]:
+            if not comuns:
+                break
+            comuns.intersection_update(postagem)
+        return heapq.nsmallest(quantidade, comuns)
+
+
+def semelhanca_nome(consulta: str, nome: str) -> float:
+    """
+    Semelhança entre a consulta e um nome, como em `buscar_nome`, mas comparando com todas as palavras
+    do nome. Usada pelos repositórios sem índice de nomes, que percorrem todos os pacientes.
+    """
+    palavras = palavras_nome(consulta)[:PALAVRAS_CONSULTA]
+    grupos = [trigramas(palavra) for palavra in palavras_nome(nome)]
+    if not palavras or not grupos:
+        return 0.0
+    total = 0.0
+    for palavra in palavras:
+        grupo = trigramas(palavra)
+        melhor = max(semelhanca(grupo, outro) for outro in grupos)
+        total += melhor if melhor >= LIMIAR_SEMELHANCA else 0.0
+    return total / len(palavras)
+
+
+def ordenar_por_semelhanca(consulta: str, itens: Iterable[Tuple[object, str]], limite: int) -> List[Tuple[object, float]]:
+    """
+    Retorna os `limite` itens (objeto, nome) com nome mais semelhante à consulta, por `semelhanca_nome`.
+    """
+    pontuados = ((item, semelhanca_nome(consulta, nome)) for item, nome in itens)
+    return heapq.nlargest(limite, (par for par in pontuados if par[1] > 0), key=lambda par: par[1])
@@ -0,0 +1,108 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from main.domain import Paciente, normalizar_cpf
+
+
+@dataclass
+class EstatisticasCache:
+    """
+    Contadores de uso do cache de pacientes.
+
+    Attributes:
+        acertos: Buscas atendidas pelo cache.
+        falhas: Buscas que consultaram o repositório.
+        descartes: Pacientes descartados do cache por falta de espaço (os menos usados recentemente).
+        invalidacoes: Pacientes retirados do cache por inclusão ou atualização.
+    """
+    acertos: int = 0
+    falhas: int = 0
+    descartes: int = 0
+    invalidacoes: int = 0
+
+    @property
+    def taxa_acertos(self) -> float:
+        buscas = self.acertos + self.falhas
+        return self.acertos / buscas if buscas else 0.0
+
+
+class PacienteRepositoryCache:
+    """
+    Cache de leitura (read-through) na frente de um repositório de pacientes, com a mesma interface.
+
+    As buscas por CPF são atendidas pelo cache quando possível; as demais consultam o repositório e
+    guardam o paciente encontrado (CPFs não cadastrados não são guardados). Com o cache cheio, o
+    paciente usado há mais tempo é descartado (LRU). Inclusões e atualizações passam direto para o
+    repositório e invalidam o CPF no cache. Útil com os repositórios SQLite e particionado, em que
+    cada busca é uma consulta ao banco ou a outro processo: um paciente que retorna é buscado no
+    repositório uma única vez durante o atendimento.
+
+    Os demais métodos e atributos são os do repositório. O cache pode ser usado por várias threads.
+    """
+    def __init__(self, repositorio, capacidade: int = 1024):
+        if capacidade < 1:
+            raise ValueError('A capacidade do cache deve ser de pelo menos um paciente.')
+        self.repositorio = repositorio
+        self.capacidade = capacidade
+        self.pacientes: "OrderedDict[str, Paciente]" = OrderedDict()
+        self.estatisticas = EstatisticasCache()
+        self.versao = 0  # Incrementada a cada invalidação
+        self.lock = threading.Lock()
+
+    def __getattr__(self, nome: str):
+        return getattr(self.repositorio, nome)
+
+    def buscar(self, cpf: str) -> Optional[Paciente]:
+        cpf = normalizar_cpf(cpf)
+        with self.lock:
+            paciente = self.pacientes.get(cpf)
+            if paciente is not None:
+                self.pacientes.move_to_end(cpf)
+                self.estatisticas.acertos += 1
+                return paciente
+            self.estatisticas.falhas += 1
+            versao = self.versao
+        paciente = self.repositorio.buscar(cpf)
+        if paciente is not None:
+            with self.lock:
+                # Se algum CPF foi invalidado durante a consulta, o paciente lido pode estar desatualizado
+                if versao == self.versao:
+                    self.pacientes[cpf] = paciente
+                    if len(self.pacientes) > self.capacidade:
+                        self.pacientes.popitem(last=False)
+                        self.estatisticas.descartes += 1
+        return paciente
+
+    def inserir(self, paciente: Paciente):
+        try:
+            self.repositorio.inserir(paciente)
+        finally:
+            self.invalidar(paciente.cpf)
+
+    def inserir_lote(self, pacientes: Iterable[Paciente]):
+        pacientes = list(pacientes)
+        try:
+            self.repositorio.inserir_lote(pacientes)
+        finally:
+            for paciente in pacientes:
+                self.invalidar(paciente.cpf)
+
+    def atualizar(self, paciente: Paciente):
+        try:
+            self.repositorio.atualizar(paciente)
+        finally:
+            self.invalidar(paciente.cpf)
+
+    def invalidar(self, cpf: Optional[str] = None):
+        """
+        Retira um CPF do cache ou, sem CPF, esvazia o cache.
+        """
+        with self.lock:
+            self.versao += 1
+            if cpf is None:
+                self.estatisticas.invalidacoes += len(self.pacientes)
+                self.pacientes.clear()
+            elif self.pacientes.pop(normalizar_cpf(cpf), None) is not None:
+                self.estatisticas.invalidacoes += 1
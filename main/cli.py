@@ -5,8 +5,9 @@ class TerminalClient:
     """
     Cliente em linha de comando para o sistema de controle de fila de atendimentos de um pronto-socorro.
     """
-    def __init__(self, ps_service: ProntoSocorroService):
+    def __init__(self, ps_service: ProntoSocorroService, tamanho_pagina: int = TAMANHO_PAGINA):
         self.ps_service = ps_service
+        self.tamanho_pagina = tamanho_pagina
 
     def mostrar_menu(self):
         print("\n--- MENU ---")
@@ -15,6 +16,10 @@ class TerminalClient:
         print("3 - Chamar Próximo da Fila")
         print("4 - Buscar Histórico de Atendimento")
         print("5 - Sair")
+        print("6 - Exportar Métricas")
+        print("7 - Tempos de Espera por Risco")
+        print("8 - Relatório de Atendimentos por Período")
+        print("9 - Buscar Paciente por Nome")
 
 
     def registrar_paciente(self):
@@ -82,14 +87,84 @@ class TerminalClient:
                 print(Fore.RED + "\nPaciente não encontrado." + Style.RESET_ALL)
                 return
 
-            # Busca o histórico
-            historico = self.ps_service.buscar_historico(paciente)
+            recentes_primeiro = input("Mais recentes primeiro? (Sim ou Não) ").strip().lower() == "sim"
+
+            # Busca o histórico uma página de cada vez
             print(f"\nHistórico de atendimentos para {paciente.nome}:")
-            for atendimento in historico:
-                print(atendimento)
+            cursor = None
+            while True:
+                pagina = self.ps_service.pagina_historico(paciente, self.tamanho_pagina, cursor, recentes_primeiro)
+                for atendimento in pagina.atendimentos:
+                    print(atendimento)
+                cursor = pagina.cursor
+                if cursor is None or input("\nEnter para a próxima página, 0 para parar: ").strip() == "0":
+                    break
         except PSBaseError as e:
             print(Fore.RED + f"\nErro ao buscar histórico: {e.message}" + Style.RESET_ALL)
 
+    def exportar_metricas(self):
+        print("\n--- EXPORTAR MÉTRICAS ---")
+        metricas = self.ps_service.metricas
+        if metricas is None:
+            print(Fore.RED + "\nMétricas desativadas, inicie o sistema com --metricas." + Style.RESET_ALL)
+            return
+        caminho = input("Arquivo de destino (vazio para exibir na tela): ").strip()
+        if caminho:
+            metricas.gravar(caminho, self.ps_service.fila_atendimento, self.ps_service.estatisticas_cache())
+            print(f"\nMétricas gravadas em {caminho}.")
+        else:
+            print()
+            print(metricas.exportar(self.ps_service.fila_atendimento, self.ps_service.estatisticas_cache()), end="")
+
+    def tempos_espera(self):
+        print("\n--- TEMPOS DE ESPERA POR RISCO ---")
+        janela = input("Janela (hora, plantao, dia ou vazio para desde o início): ").strip().lower() or None
+
+        try:
+            percentis = self.ps_service.percentis_espera(janela)
+            print(f"\n{'Risco':<10}{'p50':>10}{'p90':>10}{'p99':>10}  (minutos)")
+            for risco, valores in percentis.items():
+                colunas = "".join(f"{'-' if v is None else f'{v.total_seconds() / 60:.1f}':>10}" for v in valores.values())
+                print(f"{risco.name:<10}{colunas}")
+        except PSBaseError as e:
+            print(Fore.RED + f"\nErro ao consultar tempos de espera: {e.message}" + Style.RESET_ALL)
+
+    def relatorio_atendimentos(self):
+        print("\n--- RELATÓRIO DE ATENDIMENTOS POR PERÍODO ---")
+        granularidade = input("Agrupar por (hora ou dia, vazio para hora): ").strip().lower() or "hora"
+        dias = input("Últimos dias (vazio para 1): ").strip() or "1"
+
+        try:
+            if not dias.isdigit():
+                raise ValidacaoError("Quantidade de dias inválida.")
+            fim = self.ps_service.relogio()
+            inicio = fim - timedelta(days=int(dias))
+            serie = self.ps_service.relatorio_atendimentos(granularidade, inicio, fim)
+            formato = "%d/%m/%Y %H:00" if granularidade == "hora" else "%d/%m/%Y"
+            print(f"\n{'Período':<18}" + "".join(f"{risco.name:>10}" for risco in Risco) + f"{'Total':>10}")
+            for periodo, contagens in serie:
+                print(f"{periodo.strftime(formato):<18}" + "".join(f"{total:>10}" for total in contagens.values())
+                      + f"{sum(contagens.values()):>10}")
+            totais = self.ps_service.contar_atendimentos(inicio, fim)
+            print(f"{'Total':<18}" + "".join(f"{total:>10}" for total in totais.values()) + f"{sum(totais.values()):>10}")
+        except PSBaseError as e:
+            print(Fore.RED + f"\nErro ao gerar relatório: {e.message}" + Style.RESET_ALL)
+
+    def buscar_paciente_por_nome(self):
+        print("\n--- BUSCAR PACIENTE POR NOME ---")
+        nome = input("Nome (completo ou parte): ").strip()
+        if not nome:
+            print(Fore.RED + "\nInforme o nome do paciente." + Style.RESET_ALL)
+            return
+
+        resultados = self.ps_service.buscar_pacientes_por_nome(nome)
+        if not resultados:
+            print(Fore.RED + "\nNenhum paciente encontrado." + Style.RESET_ALL)
+            return
+        print(f"\n{'Nome':<40}{'CPF':<14}{'Nascimento':<12}{'Semelhança':>10}")
+        for paciente, semelhanca in resultados:
+            print(f"{paciente.nome:<40}{paciente.cpf:<14}{paciente.nascimento:<12}{semelhanca:>10.0%}")
+
     def executar(self):
         # Inicializa o cliente do serviço do pronto-socorro
         while True:
@@ -107,5 +182,13 @@ class TerminalClient:
             elif opcao == "5":
                 print("\nSaindo do sistema...")
                 break
+            elif opcao == "6":
+                self.exportar_metricas()
+            elif opcao == "7":
+                self.tempos_espera()
+            elif opcao == "8":
+                self.relatorio_atendimentos()
+            elif opcao == "9":
+                self.buscar_paciente_por_nome()
             else:
                 print(Fore.RED + "\nOpção inválida, tente novamente." + Style.RESET_ALL)
@@ -0,0 +1,164 @@
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from main.analitico import Serie
+from main.domain import Paciente, Atendimento, FilaAtendimento, EntradaFila, Risco
+from main.paginacao import PaginaHistorico
+from main.repository import PacienteRepository, AtendimentoRepository
+from main.service import ProntoSocorroService
+
+
+class LocksPorCPF:
+    """
+    Conjunto fixo de locks distribuídos pelo hash do CPF (lock striping).
+
+    Operações sobre CPFs diferentes raramente disputam o mesmo lock, enquanto operações sobre o
+    mesmo CPF são sempre serializadas.
+    """
+    def __init__(self, faixas: int = 64):
+        self.locks = [threading.Lock() for _ in range(faixas)]
+
+    def lock(self, cpf: str) -> threading.Lock:
+        return self.locks[hash(cpf) % len(self.locks)]
+
+
+class PacienteRepositoryConcorrente(PacienteRepository):
+    """
+    Repositório de pacientes seguro para uso por várias threads.
+
+    A verificação de CPF duplicado e a inserção são atômicas por CPF (lock striping); os índices
+    secundários, compartilhados entre CPFs, têm um lock próprio. As buscas não usam lock.
+    """
+    def __init__(self, faixas: int = 64, **kwargs):
+        super().__init__(**kwargs)
+        self.locks = LocksPorCPF(faixas)
+        self.lock_indices = threading.Lock()
+
+    def inserir(self, paciente: Paciente):
+        with self.locks.lock(paciente.cpf):
+            super().inserir(paciente)
+
+    def atualizar(self, paciente: Paciente):
+        with self.locks.lock(paciente.cpf):
+            super().atualizar(paciente)
+
+    def _indexar(self, paciente: Paciente):
+        with self.lock_indices:
+            super()._indexar(paciente)
+
+    def _desindexar(self, paciente: Paciente):
+        with self.lock_indices:
+            super()._desindexar(paciente)
+
+
+class AtendimentoRepositoryConcorrente(AtendimentoRepository):
+    """
+    Repositório de atendimentos seguro para uso por várias threads.
+
+    O histórico de cada paciente é protegido pelo lock da faixa do seu CPF; o arquivo colunar, os
+    atendimentos abertos e o índice temporal têm um lock próprio, mantido apenas durante a inclusão,
+    o encerramento e as consultas por período.
+    """
+    def __init__(self, paciente_repository: PacienteRepository, faixas: int = 64):
+        super().__init__(paciente_repository)
+        self.locks = LocksPorCPF(faixas)
+        self.lock_geral = threading.Lock()
+
+    def _armazenar(self, atendimento: Atendimento) -> int:
+        with self.lock_geral:
+            return super()._armazenar(atendimento)
+
+    def abrir(self, atendimento: Atendimento) -> Optional[int]:
+        with self.locks.lock(atendimento.paciente.cpf), self.lock_geral:
+            return super().abrir(atendimento)
+
+    def encerrar(self, atendimento: Atendimento):
+        with self.lock_geral:
+            super().encerrar(atendimento)
+
+    def contagem_por_risco(self, inicio: Optional[datetime] = None,
+                           fim: Optional[datetime] = None) -> Dict[Risco, int]:
+        with self.lock_geral:
+            return super().contagem_por_risco(inicio, fim)
+
+    def serie_por_risco(self, granularidade: str = 'hora', inicio: Optional[datetime] = None,
+                        fim: Optional[datetime] = None) -> Serie:
+        with self.lock_geral:
+            return super().serie_por_risco(granularidade, inicio, fim)
+
+    def _indexar(self, atendimento: Atendimento, linha: int):
+        with self.locks.lock(atendimento.paciente.cpf):
+            super()._indexar(atendimento, linha)
+
+    def _historico_periodo(self, paciente: Paciente, inicio: Optional[datetime],
+                           fim: Optional[datetime]) -> List[Atendimento]:
+        with self.locks.lock(paciente.cpf):
+            return super()._historico_periodo(paciente, inicio, fim)
+
+    def _pagina_historico(self, paciente: Paciente, tamanho: int, cursor: Optional[str], recentes_primeiro: bool,
+                          inicio: Optional[datetime], fim: Optional[datetime]) -> PaginaHistorico:
+        with self.locks.lock(paciente.cpf):
+            return super()._pagina_historico(paciente, tamanho, cursor, recentes_primeiro, inicio, fim)
+
+
+class FilaAtendimentoConcorrente(FilaAtendimento):
+    """
+    Fila de atendimento segura para uso por várias threads.
+
+    Todas as operações sobre o motor da fila são feitas sob um único lock dedicado, de modo que a
+    verificação de fila vazia e a retirada do próximo paciente são atômicas: nenhum paciente é
+    entregue a dois consultórios nem se perde.
+    """
+    def __init__(self, motor=None):
+        super().__init__(motor)
+        self.lock = threading.Lock()
+
+    def inserir(self, atendimento: Atendimento) -> EntradaFila:
+        with self.lock:
+            return super().inserir(atendimento)
+
+    def inserir_lote(self, atendimentos: Iterable[Atendimento]) -> List[EntradaFila]:
+        atendimentos = list(atendimentos)
+        with self.lock:
+            return super().inserir_lote(atendimentos)
+
+    def proximo(self) -> Atendimento:
+        with self.lock:
+            return super().proximo()
+
+    def proximos(self, quantidade: int) -> List[Atendimento]:
+        with self.lock:
+            return super().proximos(quantidade)
+
+    def reclassificar(self, entrada: EntradaFila, novo_risco: Risco):
+        with self.lock:
+            super().reclassificar(entrada, novo_risco)
+
+    def remover(self, entrada: EntradaFila) -> Atendimento:
+        with self.lock:
+            return super().remover(entrada)
+
+    def possui_proximo(self):
+        with self.lock:
+            return super().possui_proximo()
+
+    def tamanho(self, risco: Optional[Risco] = None) -> int:
+        with self.lock:
+            return super().tamanho(risco)
+
+    def definir_metas(self, metas):
+        with self.lock:
+            super().definir_metas(metas)
+
+
+def criar_servico_concorrente(faixas: int = 64, fila_atendimento: Optional[FilaAtendimentoConcorrente] = None,
+                              **kwargs) -> ProntoSocorroService:
+    """
+    Cria um `ProntoSocorroService` com repositórios e fila seguros para uso por várias threads.
+    Os argumentos adicionais são repassados ao `PacienteRepositoryConcorrente`.
+    """
+    pacientes = PacienteRepositoryConcorrente(faixas, **kwargs)
+    atendimentos = AtendimentoRepositoryConcorrente(pacientes, faixas)
+    fila = fila_atendimento if fila_atendimento is not None else FilaAtendimentoConcorrente()
+    return ProntoSocorroService(pacientes, atendimentos, fila)
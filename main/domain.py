@@ -1,20 +1,22 @@
-import heapq
-import re
-from dataclasses import dataclass
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from enum import Enum
+from typing import Dict, FrozenSet, Iterable, List, Optional
 
 from main.error import *
+from main.fila import EntradaFila, MotorFilaBaldes, MotorFilaPrazo
+from main import validacao
+from main.validacao import normalizar_cpf
 
 
-@dataclass
+@dataclass(slots=True)
 class Paciente:
     """
     Representa um paciente no sistema.
 
     Attributes:
         nome: Nome completo do paciente.
-        cpf: CPF do paciente (no formato 11111111111, com 11 dígitos numéricos).
+        cpf: CPF do paciente (no formato 11111111111, com 11 dígitos numéricos e dígitos verificadores válidos).
         email: E-mail do paciente.
         nascimento: Data de nascimento do paciente (no formato DD/MM/YYYY).
     """
@@ -25,35 +27,31 @@ class Paciente:
 
     def __post_init__(self):
         self.validar_nome(self.nome)
-        self.validar_cpf(self.cpf)
+        self.cpf = self.validar_cpf(self.cpf)
         self.validar_email(self.email)
+        self.validar_nascimento(self.nascimento)
+
+    @classmethod
+    def de_dados_validados(cls, nome: str, cpf: str, email: str, nascimento: str) -> 'Paciente':
+        """
+        Cria um paciente sem repetir as validações, a partir de dados já validados (por exemplo, por
+        `main.validacao.validar_colunas` ou lidos de um repositório). O CPF deve estar normalizado.
+        """
+        paciente = object.__new__(cls)
+        paciente.nome, paciente.cpf, paciente.email, paciente.nascimento = nome, cpf, email, nascimento
+        return paciente
 
     def validar_nome(self, nome: str) -> str:
-        if not nome or not nome.strip():
-            raise ValidacaoError("O nome do paciente é obrigatório.")
-        if not re.match(r"^[a-zA-ZÀ-ú\s]+$", nome):
-            raise ValidacaoError("O nome do paciente contém caracteres inválidos.")
-        return nome.strip()
+        return validacao.validar_nome(nome)
 
     def validar_cpf(self, cpf: str) -> str:
-        cpf = re.sub(r"[^0-9]", "", cpf)  # Remove caracteres não numéricos
-        if not cpf.isdigit():
-            raise ValidacaoError("CPF inválido, deve conter 11 dígitos numéricos.")
-        return cpf
+        return validacao.validar_cpf(cpf)  # Remove pontos, hífen e espaços e confere os dígitos verificadores
 
     def validar_email(self, email: str) -> str:
-        if not re.match(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$", email):
-            raise ValidacaoError("E-mail inválido.")
-        return email
+        return validacao.validar_email(email)
 
     def validar_nascimento(self, nascimento: str) -> str:
-        try:
-            data = datetime.strptime(nascimento, "%d/%m/%Y")
-            if data > datetime.now():
-                raise ValidacaoError("A data de nascimento não pode ser futura.")
-            return nascimento
-        except ValueError:
-            raise ValidacaoError("Data de nascimento inválida, use o formato DD/MM/YYYY.")
+        return validacao.validar_nascimento(nascimento)
 
     def __str__(self):
         return f'Paciente: {self.nome} ({self.cpf})'
@@ -75,7 +73,16 @@ class Risco(Enum):
     VERDE    = 4
     AZUL     = 5
 
-@dataclass
+# Tempo máximo de espera por atendimento para cada nível de risco, segundo o protocolo de Manchester
+METAS_MANCHESTER: Dict[Risco, timedelta] = {
+    Risco.VERMELHO: timedelta(0),
+    Risco.LARANJA:  timedelta(minutes=10),
+    Risco.AMARELO:  timedelta(minutes=60),
+    Risco.VERDE:    timedelta(minutes=120),
+    Risco.AZUL:     timedelta(minutes=240),
+}
+
+@dataclass(slots=True)
 class FichaAnalise:
     """
     Representa a ficha de análise de um paciente durante a triagem.
@@ -85,13 +92,17 @@ class FichaAnalise:
         gravidade_alta: Indica se o paciente tem gravidade alta.
         gravidade_moderada: Indica se o paciente tem gravidade moderada.
         gravidade_baixa: Indica se o paciente tem gravidade baixa.
+        fluxograma: Fluxograma de Manchester da queixa principal (ver `main.triagem.FLUXOGRAMAS`).
+        discriminadores: Discriminadores do protocolo de Manchester presentes no paciente.
     """
     risco_morte: bool
     gravidade_alta: bool
     gravidade_moderada: bool
     gravidade_baixa: bool
+    fluxograma: str = 'geral'
+    discriminadores: FrozenSet[str] = frozenset()
 
-@dataclass
+@dataclass(slots=True)
 class Atendimento:
     """
     Representa um atendimento de um paciente no pronto-socorro.
@@ -103,29 +114,128 @@ class Atendimento:
     """
     paciente: Paciente
     risco: Risco
-    entrada: datetime = datetime.now()
+    entrada: datetime = field(default_factory=datetime.now)
 
     def __str__(self):
         return f"Atendimento:\nPaciente: {self.paciente}\nRisco: {self.risco.name}\nEntrada: {self.entrada.strftime('%d/%m/%Y %X')}"
 
 class FilaAtendimento:
     """
-    Gerencia a fila de atendimento dos pacientes, priorizando por nível de risco.
-    """
-    def __init__(self):
-        self.fila = []
+    Gerencia a fila de atendimento dos pacientes, priorizando por nível de risco e, dentro do mesmo
+    nível, pela ordem de chegada.
 
-    def inserir(self, atendimento: Atendimento):
-        heapq.heappush(self.fila, (atendimento.risco.value, atendimento))
-
-    def proximo(self):
-        if len(self.fila) == 0:
+    A estrutura de dados é delegada a um motor de fila (ver `main.fila`); por padrão, é usado um
+    balde FIFO por nível de risco, com inserção e remoção em O(1). A inserção retorna uma
+    `EntradaFila`, que permite reclassificar ou remover o atendimento enquanto ele aguarda.
+    """
+    def __init__(self, motor=None):
+        self.motor = motor if motor is not None else MotorFilaBaldes(len(Risco))
+        self.journal = None  # Ver `main.journal.JournalFila.recuperar`
+        self.feed = None  # Ver `main.eventos.FeedFila` e `ProntoSocorroService.feed_fila`
+
+    @classmethod
+    def por_prazo(cls, metas: Optional[Dict[Risco, timedelta]] = None) -> 'FilaAtendimento':
+        """
+        Cria uma fila ordenada pelo prazo de atendimento (entrada mais a meta de espera do risco).
+        As metas informadas substituem as de `METAS_MANCHESTER` apenas para os riscos presentes.
+        """
+        return cls(MotorFilaPrazo(_metas_em_segundos(metas), _instante_entrada))
+
+    def definir_metas(self, metas: Dict[Risco, timedelta]):
+        """
+        Altera as metas de espera de uma fila criada com `por_prazo`; os riscos ausentes voltam às
+        metas de `METAS_MANCHESTER`. A fila é reordenada apenas na próxima chamada.
+        """
+        if not isinstance(self.motor, MotorFilaPrazo):
+            raise ModoFilaError('A fila de atendimento não está ordenada por prazo')
+        self.motor.definir_metas(_metas_em_segundos(metas))
+
+    def inserir(self, atendimento: Atendimento) -> EntradaFila:
+        entrada = self.motor.inserir(atendimento.risco.value - 1, atendimento)
+        if self.journal is not None:
+            self.journal.registrar_insercao(entrada)
+        if self.feed is not None:
+            self._publicar('inserido', [atendimento])
+        return entrada
+
+    def inserir_lote(self, atendimentos: Iterable[Atendimento]) -> List[EntradaFila]:
+        """
+        Insere vários atendimentos de uma vez (ex.: vítimas de um acidente com múltiplas vítimas), em
+        O(n) e com um único registro no journal. Os atendimentos do lote entram na fila na ordem
+        informada.
+        """
+        entradas = self.motor.inserir_lote([(atendimento.risco.value - 1, atendimento) for atendimento in atendimentos])
+        if self.journal is not None and entradas:
+            self.journal.registrar_insercoes(entradas)
+        if self.feed is not None:
+            self._publicar('inserido', [entrada.item for entrada in entradas])
+        return entradas
+
+    def proximo(self) -> Atendimento:
+        if self.motor.tamanho() == 0:
             raise FilaVaziaError('Não tem nenhum paciente na fila de atendimento')
-        return heapq.heappop(self.fila)[1]
+        entrada = self.motor.proximo_entrada()
+        if self.journal is not None:
+            self.journal.registrar_chamada(entrada)
+        if self.feed is not None:
+            self._publicar('chamado', [entrada.item])
+        return entrada.item
+
+    def proximos(self, quantidade: int) -> List[Atendimento]:
+        """
+        Retira os próximos `quantidade` atendimentos (ou todos, se houver menos na fila), em ordem de
+        prioridade e de chegada, com um único registro no journal.
+        """
+        if quantidade < 1:
+            raise ValidacaoError('A quantidade de pacientes chamados deve ser de pelo menos um.')
+        if self.motor.tamanho() == 0:
+            raise FilaVaziaError('Não tem nenhum paciente na fila de atendimento')
+        entradas = self.motor.proximos_entradas(quantidade)
+        if self.journal is not None:
+            self.journal.registrar_chamadas(entradas)
+        atendimentos = [entrada.item for entrada in entradas]
+        if self.feed is not None:
+            self._publicar('chamado', atendimentos)
+        return atendimentos
+
+    def reclassificar(self, entrada: EntradaFila, novo_risco: Risco):
+        self._verificar_na_fila(entrada)
+        entrada.item.risco = novo_risco
+        self.motor.reclassificar(entrada, novo_risco.value - 1)
+        if self.journal is not None:
+            self.journal.registrar_reclassificacao(entrada)
+        if self.feed is not None:
+            self._publicar('reclassificado', [entrada.item])
+
+    def remover(self, entrada: EntradaFila) -> Atendimento:
+        self._verificar_na_fila(entrada)
+        self.motor.remover(entrada)
+        if self.journal is not None:
+            self.journal.registrar_remocao(entrada)
+        if self.feed is not None:
+            self._publicar('removido', [entrada.item])
+        return entrada.item
+
+    def _publicar(self, tipo: str, atendimentos: List[Atendimento]):
+        self.feed.publicar(tipo, atendimentos, tuple(self.motor.contagem))
+
+    def _verificar_na_fila(self, entrada: EntradaFila):
+        if not entrada.ativa:
+            raise AtendimentoForaDaFilaError('O atendimento não está mais na fila de atendimento')
 
     def possui_proximo(self):
-        return len(self.fila) > 0
+        return self.motor.tamanho() > 0
+
+    def tamanho(self, risco: Optional[Risco] = None) -> int:
+        if risco is None:
+            return self.motor.tamanho()
+        return self.motor.tamanho(risco.value - 1)
+
+
+def _metas_em_segundos(metas: Optional[Dict[Risco, timedelta]]) -> list:
+    metas = {**METAS_MANCHESTER, **(metas or {})}
+    return [metas[risco].total_seconds() for risco in Risco]
 
-    def tamanho(self):
-        return len(self.fila)
 
+def _instante_entrada(atendimento: Atendimento) -> float:
+    return atendimento.entrada.timestamp()
@@ -15,5 +15,13 @@ class CPFDuplicadoError(PSBaseError):
         self.message = message
 
 class PacienteNaoCadastradoError(PSBaseError):
+    def __init__(self, message: str):
+        self.message = message
+
+class AtendimentoForaDaFilaError(PSBaseError):
+    def __init__(self, message: str):
+        self.message = message
+
+class ModoFilaError(PSBaseError):
     def __init__(self, message: str):
         self.message = message
\ No newline at end of file
@@ -0,0 +1,187 @@
+import math
+import threading
+from array import array
+from bisect import bisect_right, insort
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+from main.domain import Risco
+from main.error import ValidacaoError
+
+QUANTIS = (0.5, 0.9, 0.99)
+
+# Janelas deslizantes padrão: última hora, último plantão (12 horas) e último dia
+JANELAS: Dict[str, timedelta] = {
+    'hora': timedelta(hours=1),
+    'plantao': timedelta(hours=12),
+    'dia': timedelta(days=1),
+}
+
+# Classes logarítmicas dos histogramas: a classe 0 reúne esperas abaixo de 1 segundo e cada classe
+# seguinte é 10% mais larga que a anterior, até 48 horas (esperas maiores caem na última classe)
+_RAZAO = 1.1
+_LOG_RAZAO = math.log(_RAZAO)
+CLASSES = 2 + math.ceil(math.log(48 * 3600) / _LOG_RAZAO)
+_EPOCA = datetime(1970, 1, 1)
+
+
+class EstimadorP2:
+    """
+    Estimador P² de um quantil (Jain e Chlamtac, 1985): mantém apenas cinco marcadores, cujas alturas
+    são ajustadas a cada observação por interpolação parabólica. Memória constante e atualização O(1),
+    sem guardar as observações.
+    """
+    def __init__(self, quantil: float):
+        self.quantil = quantil
+        self.alturas: List[float] = []
+        self.posicoes = [1, 2, 3, 4, 5]
+        # Posição desejada de cada marcador após N observações: 1 + (N - 1) * fração
+        self.fracoes = (0, quantil / 2, quantil, (1 + quantil) / 2, 1)
+
+    def observar(self, valor: float):
+        q = self.alturas
+        if len(q) < 5:
+            insort(q, valor)
+            return
+        if valor < q[0]:
+            q[0] = valor
+            k = 1
+        elif valor >= q[4]:
+            q[4] = valor
+            k = 4
+        else:
+            k = bisect_right(q, valor)
+        n = self.posicoes
+        for i in range(k, 5):
+            n[i] += 1
+        observacoes = n[4] - 1
+        fracoes = self.fracoes
+        for i in (1, 2, 3):
+            d = 1 + observacoes * fracoes[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                parabolica = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if q[i - 1] < parabolica < q[i + 1]:
+                    q[i] = parabolica
+                else:
+                    q[i] += d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                n[i] += d
+
+    def valor(self) -> Optional[float]:
+        q = self.alturas
+        if not q:
+            return None
+        if self.posicoes[4] <= 5:  # Até cinco observações, o quantil é exato
+            return q[min(int(self.quantil * len(q)), len(q) - 1)]
+        return q[2]
+
+
+class HistogramaJanela:
+    """
+    Histograma deslizante de tempos de espera. A janela é dividida em `fatias` intervalos de tempo
+    consecutivos, cada um com a contagem por classe logarítmica das esperas registradas nele; fatias
+    mais antigas que a janela são reaproveitadas. A memória é fixa (fatias x classes contadores) e a
+    janela efetiva varia entre `duracao` menos uma fatia e `duracao`.
+    """
+    def __init__(self, duracao: timedelta, fatias: int = 60):
+        self.largura = duracao.total_seconds() / fatias
+        self.contagens = [array('I', bytes(4 * CLASSES)) for _ in range(fatias)]
+        self.epocas = [-1] * fatias
+
+    def observar(self, classe: int, instante: float):
+        """
+        Conta uma espera da classe informada (ver `classe_espera`) no instante informado, em segundos.
+        """
+        epoca = int(instante // self.largura)
+        i = epoca % len(self.epocas)
+        if self.epocas[i] != epoca:
+            self.contagens[i] = array('I', bytes(4 * CLASSES))
+            self.epocas[i] = epoca
+        self.contagens[i][classe] += 1
+
+    def quantis(self, quantis: Sequence[float], instante: float) -> List[Optional[float]]:
+        atual = int(instante // self.largura)
+        total = [0] * CLASSES
+        for epoca, contagens in zip(self.epocas, self.contagens):
+            if atual - len(self.epocas) < epoca <= atual:
+                total = list(map(int.__add__, total, contagens))
+        observacoes = sum(total)
+        if not observacoes:
+            return [None] * len(quantis)
+        resultado = []
+        for quantil in quantis:
+            alvo = max(1, math.ceil(quantil * observacoes))
+            acumulado = 0
+            for classe, contagem in enumerate(total):
+                acumulado += contagem
+                if acumulado >= alvo:
+                    resultado.append(_valor_classe(classe))
+                    break
+        return resultado
+
+
+class TemposEspera:
+    """
+    Percentis do tempo de espera (da entrada até a chamada) por nível de risco, atualizados em O(1)
+    a cada paciente chamado e com memória limitada.
+
+    Desde o início, cada percentil é estimado pelo algoritmo P²; nas janelas deslizantes (por padrão,
+    última hora, plantão e dia), por histogramas com classes 10% mais largas a cada uma, portanto com
+    erro relativo de até ~5%.
+    """
+    def __init__(self, janelas: Dict[str, timedelta] = JANELAS, quantis: Sequence[float] = QUANTIS,
+                 fatias: int = 60):
+        self.quantis = tuple(quantis)
+        self.estimadores = {risco: [EstimadorP2(q) for q in self.quantis] for risco in Risco}
+        self.janelas = {nome: {risco: HistogramaJanela(duracao, fatias) for risco in Risco}
+                        for nome, duracao in janelas.items()}
+        self.chamados = {risco: 0 for risco in Risco}
+        self.ultimo_instante = 0.0
+        self.lock = threading.Lock()
+
+    def registrar(self, risco: Risco, espera: timedelta, instante: datetime):
+        segundos = max(espera.total_seconds(), 0.0)
+        instante = (instante - _EPOCA).total_seconds()
+        classe = classe_espera(segundos)
+        with self.lock:
+            self.chamados[risco] += 1
+            if instante > self.ultimo_instante:
+                self.ultimo_instante = instante
+            for estimador in self.estimadores[risco]:
+                estimador.observar(segundos)
+            for histogramas in self.janelas.values():
+                histogramas[risco].observar(classe, instante)
+
+    def percentis(self, janela: Optional[str] = None,
+                  instante: Optional[datetime] = None) -> Dict[Risco, Dict[float, Optional[timedelta]]]:
+        """
+        Retorna, para cada risco, o tempo de espera em cada quantil (None se nenhum paciente desse
+        risco foi chamado no período). Sem `janela`, considera todos os pacientes chamados; com o nome
+        de uma janela, apenas os chamados nela até `instante` (por padrão, a última chamada).
+        """
+        if janela is not None and janela not in self.janelas:
+            raise ValidacaoError(f"Janela desconhecida, use uma de: {', '.join(self.janelas)}.")
+        with self.lock:
+            if janela is None:
+                valores = {risco: [e.valor() for e in estimadores] for risco, estimadores in self.estimadores.items()}
+            else:
+                momento = self.ultimo_instante if instante is None else (instante - _EPOCA).total_seconds()
+                valores = {risco: histograma.quantis(self.quantis, momento)
+                           for risco, histograma in self.janelas[janela].items()}
+        return {risco: {q: None if v is None else timedelta(seconds=v) for q, v in zip(self.quantis, lista)}
+                for risco, lista in valores.items()}
+
+
+def classe_espera(segundos: float) -> int:
+    if segundos < 1:
+        return 0
+    return min(1 + int(math.log(segundos) / _LOG_RAZAO), CLASSES - 1)
+
+
+def _valor_classe(classe: int) -> float:
+    # Média geométrica dos limites da classe (ou metade do primeiro segundo, na classe 0)
+    if classe == 0:
+        return 0.5
+    return _RAZAO ** (classe - 0.5)
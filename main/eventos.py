@@ -0,0 +1,222 @@
+import asyncio
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, List, Optional, Set, Tuple
+
+from main.domain import Atendimento, Risco
+from main.error import ValidacaoError
+
+# Tipos de evento da fila de atendimento (publicados por `FilaAtendimento`)
+INSERIDO = 'inserido'
+CHAMADO = 'chamado'
+RECLASSIFICADO = 'reclassificado'
+REMOVIDO = 'removido'
+
+# Eventos guardados no buffer circular: uma assinatura atrasada em mais do que isso perde os mais antigos
+CAPACIDADE_FEED = 4096
+
+
+@dataclass(slots=True)
+class EventoFila:
+    """
+    Alteração da fila de atendimento.
+
+    Attributes:
+        sequencia: Número do evento, crescente e sem lacunas desde a criação do feed.
+        tipo: INSERIDO, CHAMADO, RECLASSIFICADO ou REMOVIDO.
+        atendimento: O atendimento alterado.
+        risco: O risco do atendimento no momento do evento (o novo risco, na reclassificação).
+        instante: Horário do evento.
+        tamanhos: Pacientes na fila por risco após a alteração, na ordem de `Risco`.
+    """
+    sequencia: int
+    tipo: str
+    atendimento: Atendimento
+    risco: Risco
+    instante: datetime
+    tamanhos: Tuple[int, ...]
+
+
+@dataclass
+class LeituraFeed:
+    """
+    Resultado de uma leitura do feed.
+
+    Attributes:
+        eventos: Eventos lidos, em ordem de sequência.
+        proxima: Sequência a partir da qual continuar a leitura.
+        perdidos: Eventos pedidos que já tinham saído do buffer (a assinatura atrasou demais e deve
+            reler o estado da fila).
+    """
+    eventos: List[EventoFila]
+    proxima: int
+    perdidos: int = 0
+
+
+class FeedFila:
+    """
+    Feed de alterações da fila de atendimento para painéis de sala de espera e dashboards, no lugar de
+    consultar o tamanho da fila periodicamente.
+
+    Os eventos ficam em um buffer circular de tamanho fixo, e cada assinatura guarda apenas a sequência
+    do próximo evento que vai ler. A publicação grava o evento no buffer e apenas acorda as assinaturas
+    (as síncronas por uma `threading.Condition`, as assíncronas agendando um `asyncio.Event` no laço de
+    eventos de cada uma), sem nunca esperar por elas: um painel lento não atrasa a triagem, apenas
+    perde os eventos mais antigos que `capacidade`, o que fica registrado em `perdidos`. Um painel que
+    reconecta continua de onde parou lendo a partir da última sequência recebida.
+    """
+    def __init__(self, capacidade: int = CAPACIDADE_FEED, relogio: Callable[[], datetime] = datetime.now):
+        if capacidade < 1:
+            raise ValueError('A capacidade do feed deve ser de pelo menos um evento.')
+        self.capacidade = capacidade
+        self.relogio = relogio
+        self.buffer: List[Optional[EventoFila]] = [None] * capacidade
+        self.proxima = 0  # Sequência do próximo evento publicado
+        self.condicao = threading.Condition(threading.Lock())
+        self.esperando = 0  # Assinaturas síncronas esperando na condição
+        self.assinaturas_async: Set['AssinaturaFilaAsync'] = set()
+
+    def publicar(self, tipo: str, atendimentos: Iterable[Atendimento], tamanhos: Tuple[int, ...]):
+        """
+        Publica um evento por atendimento; os eventos de um lote (ex.: `FilaAtendimento.inserir_lote`)
+        têm sequências consecutivas e os mesmos tamanhos, os da fila após o lote.
+        """
+        instante = self.relogio()
+        with self.condicao:
+            for atendimento in atendimentos:
+                self.buffer[self.proxima % self.capacidade] = EventoFila(
+                    self.proxima, tipo, atendimento, atendimento.risco, instante, tamanhos)
+                self.proxima += 1
+            if self.esperando:
+                self.condicao.notify_all()
+            assinaturas_async = list(self.assinaturas_async) if self.assinaturas_async else ()
+        for assinatura in assinaturas_async:
+            assinatura.notificar()
+
+    def ler(self, desde: int, limite: Optional[int] = None) -> LeituraFeed:
+        """
+        Retorna até `limite` eventos a partir da sequência `desde`, sem esperar por novos eventos.
+        """
+        with self.condicao:
+            return self._ler(desde, limite)
+
+    def _ler(self, desde: int, limite: Optional[int] = None) -> LeituraFeed:
+        if desde < 0:
+            raise ValidacaoError('Sequência de eventos inválida.')
+        inicio = max(desde, self.proxima - self.capacidade)
+        fim = self.proxima if limite is None else min(self.proxima, inicio + limite)
+        eventos = [self.buffer[sequencia % self.capacidade] for sequencia in range(inicio, fim)]
+        return LeituraFeed(eventos, max(fim, desde), max(inicio - desde, 0))
+
+    def assinar(self, desde: Optional[int] = None) -> 'AssinaturaFila':
+        """
+        Cria uma assinatura síncrona, que recebe os eventos a partir da sequência `desde` (por padrão, os
+        publicados daqui em diante).
+        """
+        return AssinaturaFila(self, self.proxima if desde is None else desde)
+
+    def assinar_async(self, desde: Optional[int] = None) -> 'AssinaturaFilaAsync':
+        """
+        Cria uma assinatura para uso em um laço de eventos asyncio; deve ser chamada dentro do laço.
+        """
+        assinatura = AssinaturaFilaAsync(self, self.proxima if desde is None else desde)
+        with self.condicao:
+            self.assinaturas_async.add(assinatura)
+        return assinatura
+
+
+class AssinaturaFila:
+    """
+    Assinatura síncrona do feed, para uma thread dedicada a um painel: `proximos` espera por novos
+    eventos e os retorna em blocos; iterar a assinatura retorna os eventos um a um até `cancelar`.
+    """
+    def __init__(self, feed: FeedFila, desde: int):
+        self.feed = feed
+        self.cursor = desde
+        self.perdidos = 0
+        self.ativa = True
+
+    def proximos(self, timeout: Optional[float] = None, limite: Optional[int] = None) -> List[EventoFila]:
+        """
+        Retorna os eventos ainda não lidos, esperando até `timeout` segundos por pelo menos um (sem
+        timeout, espera indefinidamente). Retorna uma lista vazia se o tempo acabar ou se a assinatura
+        for cancelada.
+        """
+        feed = self.feed
+        with feed.condicao:
+            feed.esperando += 1
+            try:
+                feed.condicao.wait_for(lambda: feed.proxima > self.cursor or not self.ativa, timeout)
+            finally:
+                feed.esperando -= 1
+            if not self.ativa:
+                return []
+            leitura = feed._ler(self.cursor, limite)
+        self.cursor = leitura.proxima
+        self.perdidos += leitura.perdidos
+        return leitura.eventos
+
+    def cancelar(self):
+        with self.feed.condicao:
+            self.ativa = False
+            self.feed.condicao.notify_all()
+
+    def __iter__(self) -> Iterator[EventoFila]:
+        while self.ativa:
+            yield from self.proximos()
+
+
+class AssinaturaFilaAsync:
+    """
+    Assinatura do feed para corrotinas: `await proximos()` espera por novos eventos sem bloquear o
+    laço de eventos, e `async for` retorna os eventos um a um até `cancelar`. Pode receber eventos
+    publicados por outras threads.
+    """
+    def __init__(self, feed: FeedFila, desde: int):
+        self.feed = feed
+        self.cursor = desde
+        self.perdidos = 0
+        self.ativa = True
+        self.laco = asyncio.get_running_loop()
+        self.sinal = asyncio.Event()
+        self.agendado = False  # Sinal já agendado no laço e ainda não consumido
+
+    def notificar(self):
+        # Chamado pela thread que publica: apenas agenda o sinal no laço da assinatura, uma vez por
+        # leitura. O evento é gravado no buffer antes da notificação, então uma assinatura que ainda
+        # não leu o buffer vai encontrá-lo mesmo sem um novo sinal
+        if self.agendado:
+            return
+        self.agendado = True
+        try:
+            self.laco.call_soon_threadsafe(self.sinal.set)
+        except RuntimeError:  # Laço de eventos encerrado
+            self.cancelar()
+
+    async def proximos(self, limite: Optional[int] = None) -> List[EventoFila]:
+        while self.ativa:
+            self.agendado = False
+            self.sinal.clear()
+            leitura = self.feed.ler(self.cursor, limite)
+            if leitura.eventos or leitura.perdidos:
+                self.cursor = leitura.proxima
+                self.perdidos += leitura.perdidos
+                return leitura.eventos
+            await self.sinal.wait()
+        return []
+
+    def cancelar(self):
+        self.ativa = False
+        with self.feed.condicao:
+            self.feed.assinaturas_async.discard(self)
+        if not self.laco.is_closed():
+            self.laco.call_soon_threadsafe(self.sinal.set)
+
+    def __aiter__(self):
+        return self._iterar()
+
+    async def _iterar(self):
+        while self.ativa:
+            for evento in await self.proximos():
+                yield evento
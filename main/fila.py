@@ -0,0 +1,344 @@
+import heapq
+from collections import deque
+from itertools import count
+from operator import attrgetter
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+# Número mínimo de entradas inativas antes de compactar as estruturas internas de um motor
+COMPACTACAO_MINIMA = 64
+# O `MotorFilaHeap` reconstrói o heap na inserção em lote quando o lote tem pelo menos 1/8 do
+# tamanho do heap; abaixo disso, inserir tupla a tupla é mais barato
+PROPORCAO_HEAPIFY = 8
+
+_sequencia_entrada = attrgetter('sequencia')
+
+
+def _restaurar_sequencia(motor, sequencia: int):
+    """
+    Ajusta o contador de chegada de um motor ao restaurar uma entrada com sequência conhecida. As
+    entradas restauradas devem ser inseridas em ordem crescente de sequência.
+    """
+    motor.sequencia = count(sequencia + 1)
+
+
+class EntradaFila:
+    """
+    Referência a um item inserido em um motor de fila, usada para reclassificá-lo ou removê-lo.
+
+    Attributes:
+        nivel: Nível de prioridade atual do item (0 é o mais prioritário).
+        sequencia: Ordem de chegada do item na fila; é preservada na reclassificação.
+        versao: Incrementada a cada reclassificação; -1 quando o item já saiu da fila.
+        item: O item armazenado.
+        realocada: Usado pelo `MotorFilaBaldes` para indicar que o item está no heap auxiliar.
+    """
+    __slots__ = ('nivel', 'sequencia', 'versao', 'item', 'realocada')
+
+    def __init__(self, nivel: int, sequencia: int, item: Any):
+        self.nivel = nivel
+        self.sequencia = sequencia
+        self.versao = 0
+        self.item = item
+        self.realocada = False
+
+    @property
+    def ativa(self) -> bool:
+        return self.versao >= 0
+
+
+class MotorFilaHeap:
+    """
+    Motor de fila de prioridade baseado em heap binário.
+
+    Cada item é armazenado como (nível, sequência, versão, entrada): a sequência de chegada desempata
+    itens do mesmo nível, garantindo a ordem FIFO sem nunca comparar os itens entre si. Inserção e
+    remoção custam O(log n). Reclassificações e remoções avulsas usam remoção preguiçosa: a tupla
+    antiga permanece no heap até ser descartada ou até a próxima compactação.
+    """
+    def __init__(self, niveis: int):
+        self.niveis = niveis
+        self.heap: List[tuple] = []
+        self.contagem = [0] * niveis
+        self.total = 0
+        self.inativas = 0
+        self.sequencia = count()
+
+    def _chave(self, entrada: EntradaFila) -> tuple:
+        return (entrada.nivel, entrada.sequencia, entrada.versao, entrada)
+
+    def inserir(self, nivel: int, item: Any, sequencia: Optional[int] = None) -> EntradaFila:
+        if sequencia is None:
+            sequencia = next(self.sequencia)
+        else:
+            _restaurar_sequencia(self, sequencia)
+        entrada = EntradaFila(nivel, sequencia, item)
+        heapq.heappush(self.heap, self._chave(entrada))
+        self.contagem[nivel] += 1
+        self.total += 1
+        return entrada
+
+    def inserir_lote(self, itens: Iterable[Tuple[int, Any]]) -> List[EntradaFila]:
+        """
+        Insere vários itens (nível, item), na ordem informada. Quando o lote é grande em relação ao
+        heap, as tuplas são acrescentadas e o heap é reconstruído de uma vez (O(n)); senão, cada
+        tupla é inserida em O(log n).
+        """
+        sequencia, chave, contagem = self.sequencia, self._chave, self.contagem
+        entradas = [EntradaFila(nivel, next(sequencia), item) for nivel, item in itens]
+        heap = self.heap
+        if len(entradas) * PROPORCAO_HEAPIFY >= len(heap):
+            heap.extend(map(chave, entradas))
+            heapq.heapify(heap)
+        else:
+            heappush = heapq.heappush
+            for entrada in entradas:
+                heappush(heap, chave(entrada))
+        for entrada in entradas:
+            contagem[entrada.nivel] += 1
+        self.total += len(entradas)
+        return entradas
+
+    def proximo(self) -> Any:
+        return self.proximo_entrada().item
+
+    def proximos_entradas(self, quantidade: int) -> List[EntradaFila]:
+        """
+        Retira até `quantidade` entradas, em ordem de prioridade e de chegada.
+        """
+        entradas = []
+        heap, heappop, contagem = self.heap, heapq.heappop, self.contagem
+        for _ in range(min(quantidade, self.total)):
+            while True:
+                *_, versao, entrada = heappop(heap)
+                if versao == entrada.versao:
+                    break
+                self.inativas -= 1
+            contagem[entrada.nivel] -= 1
+            entrada.versao = -1
+            entradas.append(entrada)
+        self.total -= len(entradas)
+        return entradas
+
+    def proximo_entrada(self) -> EntradaFila:
+        while True:
+            *_, versao, entrada = heapq.heappop(self.heap)
+            if versao == entrada.versao:
+                break
+            self.inativas -= 1
+        self._retirar(entrada)
+        return entrada
+
+    def remover(self, entrada: EntradaFila):
+        self._retirar(entrada)
+        self._descartar_tupla()
+
+    def reclassificar(self, entrada: EntradaFila, nivel: int):
+        self.contagem[entrada.nivel] -= 1
+        self.contagem[nivel] += 1
+        entrada.nivel = nivel
+        entrada.versao += 1
+        heapq.heappush(self.heap, self._chave(entrada))
+        self._descartar_tupla()
+
+    def tamanho(self, nivel: Optional[int] = None) -> int:
+        if nivel is None:
+            return self.total
+        return self.contagem[nivel]
+
+    def entradas(self) -> List[EntradaFila]:
+        """
+        Retorna as entradas ativas em ordem de chegada (sequência).
+        """
+        return sorted((t[-1] for t in self.heap if t[-2] == t[-1].versao), key=_sequencia_entrada)
+
+    def _retirar(self, entrada: EntradaFila):
+        self.contagem[entrada.nivel] -= 1
+        self.total -= 1
+        entrada.versao = -1
+
+    def _descartar_tupla(self):
+        self.inativas += 1
+        if self.inativas > COMPACTACAO_MINIMA and self.inativas > self.total:
+            self.heap = [t for t in self.heap if t[-2] == t[-1].versao]
+            heapq.heapify(self.heap)
+            self.inativas = 0
+
+
+class MotorFilaBaldes:
+    """
+    Motor de fila de prioridade com um balde FIFO (deque) por nível.
+
+    Como o número de níveis é pequeno e fixo, a inserção e a remoção custam O(1) e a ordem de
+    chegada dentro de cada nível é garantida pela própria deque. Um item reclassificado mantém a sua
+    sequência de chegada: se ela for anterior à do último item do novo nível, ele vai para um heap
+    auxiliar desse nível, consultado junto com o início da deque (O(log n) apenas nesse caso).
+
+    As deques guardam as próprias entradas, sem tuplas intermediárias: como cada deque é ordenada
+    pela sequência, uma entrada aparece no máximo uma vez em cada deque, e a cópia só é válida se
+    a entrada estiver ativa, no mesmo nível e fora do heap auxiliar.
+    """
+    def __init__(self, niveis: int):
+        self.niveis = niveis
+        self.baldes = [deque() for _ in range(niveis)]
+        self.realocados: List[List[tuple]] = [[] for _ in range(niveis)]
+        self.contagem = [0] * niveis
+        self.total = 0
+        self.inativas = 0
+        self.sequencia = count()
+
+    def inserir(self, nivel: int, item: Any, sequencia: Optional[int] = None) -> EntradaFila:
+        if sequencia is None:
+            sequencia = next(self.sequencia)
+        else:
+            _restaurar_sequencia(self, sequencia)
+        entrada = EntradaFila(nivel, sequencia, item)
+        self.baldes[nivel].append(entrada)
+        self.contagem[nivel] += 1
+        self.total += 1
+        return entrada
+
+    def inserir_lote(self, itens: Iterable[Tuple[int, Any]]) -> List[EntradaFila]:
+        """
+        Insere vários itens (nível, item), na ordem informada, em O(n): como as sequências novas são
+        maiores que as de todos os itens da fila, cada entrada vai para o fim do balde do seu nível.
+        """
+        entradas = [EntradaFila(nivel, next(self.sequencia), item) for nivel, item in itens]
+        for entrada in entradas:
+            self.baldes[entrada.nivel].append(entrada)
+            self.contagem[entrada.nivel] += 1
+        self.total += len(entradas)
+        return entradas
+
+    def proximo(self) -> Any:
+        return self.proximo_entrada().item
+
+    def proximos_entradas(self, quantidade: int) -> List[EntradaFila]:
+        """
+        Retira até `quantidade` entradas, em ordem de prioridade e de chegada, esgotando um nível
+        antes de passar ao seguinte.
+        """
+        entradas = []
+        for nivel in range(self.niveis):
+            retirar = min(quantidade - len(entradas), self.contagem[nivel])
+            for _ in range(retirar):
+                entrada = self._retirar_do_nivel(nivel)
+                entrada.versao = -1
+                entradas.append(entrada)
+            self.contagem[nivel] -= retirar
+            if len(entradas) == quantidade:
+                break
+        self.total -= len(entradas)
+        return entradas
+
+    def proximo_entrada(self) -> EntradaFila:
+        for nivel in range(self.niveis):
+            if self.contagem[nivel]:
+                entrada = self._retirar_do_nivel(nivel)
+                self.contagem[nivel] -= 1
+                self.total -= 1
+                entrada.versao = -1
+                return entrada
+        raise IndexError('fila vazia')
+
+    def remover(self, entrada: EntradaFila):
+        self.contagem[entrada.nivel] -= 1
+        self.total -= 1
+        entrada.versao = -1
+        self._descartar_tupla()
+
+    def reclassificar(self, entrada: EntradaFila, nivel: int):
+        self.contagem[entrada.nivel] -= 1
+        self.contagem[nivel] += 1
+        entrada.nivel = nivel
+        entrada.versao += 1
+        balde = self.baldes[nivel]
+        entrada.realocada = bool(balde) and balde[-1].sequencia >= entrada.sequencia
+        if entrada.realocada:
+            heapq.heappush(self.realocados[nivel], (entrada.sequencia, entrada.versao, entrada))
+        else:
+            balde.append(entrada)
+        self._descartar_tupla()
+
+    def tamanho(self, nivel: Optional[int] = None) -> int:
+        if nivel is None:
+            return self.total
+        return self.contagem[nivel]
+
+    def entradas(self) -> List[EntradaFila]:
+        """
+        Retorna as entradas ativas em ordem de chegada (sequência).
+        """
+        ativas = [e for nivel in range(self.niveis) for e in self.baldes[nivel] if self._valida_no_balde(e, nivel)]
+        ativas.extend(t[2] for realocados in self.realocados for t in realocados if t[1] == t[2].versao)
+        return sorted(ativas, key=_sequencia_entrada)
+
+    def _retirar_do_nivel(self, nivel: int) -> EntradaFila:
+        balde = self.baldes[nivel]
+        realocados = self.realocados[nivel]
+        while balde and not self._valida_no_balde(balde[0], nivel):
+            balde.popleft()
+            self.inativas -= 1
+        while realocados and realocados[0][1] != realocados[0][2].versao:
+            heapq.heappop(realocados)
+            self.inativas -= 1
+        if realocados and (not balde or realocados[0][0] < balde[0].sequencia):
+            entrada = heapq.heappop(realocados)[2]
+            entrada.realocada = False
+            return entrada
+        return balde.popleft()
+
+    @staticmethod
+    def _valida_no_balde(entrada: EntradaFila, nivel: int) -> bool:
+        return entrada.versao >= 0 and entrada.nivel == nivel and not entrada.realocada
+
+    def _descartar_tupla(self):
+        self.inativas += 1
+        if self.inativas > COMPACTACAO_MINIMA and self.inativas > self.total:
+            for nivel in range(self.niveis):
+                self.baldes[nivel] = deque(e for e in self.baldes[nivel] if self._valida_no_balde(e, nivel))
+                self.realocados[nivel] = [t for t in self.realocados[nivel] if t[1] == t[2].versao]
+                heapq.heapify(self.realocados[nivel])
+            self.inativas = 0
+
+
+class MotorFilaPrazo(MotorFilaHeap):
+    """
+    Motor de fila que ordena os itens pelo prazo máximo de espera (instante de chegada mais a meta
+    do nível), evitando que itens de baixa prioridade esperem indefinidamente.
+
+    O prazo de cada item é fixo, então o heap não precisa ser reordenado com o passar do tempo.
+    Quando as metas mudam, o heap é apenas marcado como desatualizado e reconstruído uma única vez
+    na próxima retirada (O(n) amortizado sobre as operações seguintes).
+
+    Attributes:
+        metas: Tempo máximo de espera de cada nível, em segundos.
+        instante: Função que retorna o instante de chegada de um item, em segundos.
+    """
+    def __init__(self, metas: List[float], instante: Callable[[Any], float]):
+        super().__init__(len(metas))
+        self.metas = list(metas)
+        self.instante = instante
+        self.desatualizado = False
+
+    def _chave(self, entrada: EntradaFila) -> tuple:
+        prazo = self.instante(entrada.item) + self.metas[entrada.nivel]
+        return (prazo, entrada.nivel, entrada.sequencia, entrada.versao, entrada)
+
+    def definir_metas(self, metas: List[float]):
+        self.metas = list(metas)
+        self.desatualizado = True
+
+    def proximo_entrada(self) -> EntradaFila:
+        self._reordenar()
+        return super().proximo_entrada()
+
+    def proximos_entradas(self, quantidade: int) -> List[EntradaFila]:
+        self._reordenar()
+        return super().proximos_entradas(quantidade)
+
+    def _reordenar(self):
+        if self.desatualizado:
+            self.heap = [self._chave(t[-1]) for t in self.heap if t[-2] == t[-1].versao]
+            heapq.heapify(self.heap)
+            self.inativas = 0
+            self.desatualizado = False
@@ -0,0 +1,139 @@
+import csv
+import json
+import os
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from main.domain import Paciente
+from main.validacao import validar_colunas
+
+CAMPOS = ('nome', 'cpf', 'email', 'nascimento')
+
+# Uma linha lida do arquivo: (número da linha, campos do paciente)
+Linha = Tuple[int, dict]
+
+
+@dataclass
+class ResultadoImportacao:
+    """
+    Resumo de uma importação de pacientes.
+
+    Attributes:
+        lidos: Número de registros lidos do arquivo.
+        importados: Número de pacientes inseridos no repositório.
+        rejeitados: Número de registros rejeitados (gravados no relatório, se informado).
+    """
+    lidos: int = 0
+    importados: int = 0
+    rejeitados: int = 0
+
+
+def ler_csv(caminho: str) -> Iterator[Linha]:
+    with open(caminho, newline='', encoding='utf-8') as arquivo:
+        for numero, registro in enumerate(csv.DictReader(arquivo), start=2):
+            yield numero, registro
+
+
+def ler_jsonl(caminho: str) -> Iterator[Linha]:
+    with open(caminho, encoding='utf-8') as arquivo:
+        for numero, texto in enumerate(arquivo, start=1):
+            if not texto.strip():
+                continue
+            try:
+                registro = json.loads(texto)
+            except json.JSONDecodeError:
+                registro = None
+            yield numero, registro if isinstance(registro, dict) else {'_erro': 'JSON inválido.'}
+
+
+def ler_arquivo(caminho: str) -> Iterator[Linha]:
+    """
+    Lê os registros de um arquivo CSV (com cabeçalho) ou JSONL, conforme a extensão.
+    """
+    if os.path.splitext(caminho)[1].lower() in ('.jsonl', '.ndjson'):
+        return ler_jsonl(caminho)
+    return ler_csv(caminho)
+
+
+def em_lotes(linhas: Iterable[Linha], tamanho: int) -> Iterator[List[Linha]]:
+    linhas = iter(linhas)
+    while lote := list(islice(linhas, tamanho)):
+        yield lote
+
+
+def validar_lote(lote: List[Linha], pacientes) -> Tuple[List[Paciente], List[Tuple[Linha, str]]]:
+    """
+    Valida um lote de registros em colunas (ver `main.validacao.validar_colunas`) e descarta CPFs
+    repetidos dentro do lote ou já cadastrados no repositório (consultados de uma só vez com
+    `pacientes.existentes`). Retorna os pacientes válidos e os registros rejeitados com o motivo.
+    """
+    completos: List[Linha] = []
+    rejeitados: List[Tuple[Linha, str]] = []
+    for linha in lote:
+        registro = linha[1]
+        if '_erro' in registro:
+            rejeitados.append((linha, registro['_erro']))
+            continue
+        ausentes = [campo for campo in CAMPOS if not isinstance(registro.get(campo), str)]
+        if ausentes:
+            rejeitados.append((linha, f"Campos ausentes: {', '.join(ausentes)}."))
+        else:
+            completos.append(linha)
+
+    nomes, cpfs, emails, nascimentos = ([registro[campo] for _, registro in completos] for campo in CAMPOS)
+    cpfs, motivos = validar_colunas(nomes, cpfs, emails, nascimentos)
+    existentes = pacientes.existentes(cpf for cpf, motivo in zip(cpfs, motivos) if motivo is None)
+    unicos: Dict[str, Paciente] = {}
+    for i, linha in enumerate(completos):
+        if motivos[i] is not None:
+            rejeitados.append((linha, motivos[i]))
+        elif cpfs[i] in existentes or cpfs[i] in unicos:
+            rejeitados.append((linha, 'CPF já cadastrado no sistema.'))
+        else:
+            unicos[cpfs[i]] = Paciente.de_dados_validados(nomes[i], cpfs[i], emails[i], nascimentos[i])
+    rejeitados.sort(key=lambda rejeitado: rejeitado[0][0])
+    return list(unicos.values()), rejeitados
+
+
+def importar_lote(lote: List[Linha], pacientes) -> Tuple[int, List[Tuple[Linha, str]]]:
+    """
+    Valida e insere um lote de registros; retorna o número de pacientes importados e os rejeitados.
+    """
+    validos, rejeitados = validar_lote(lote, pacientes)
+    pacientes.inserir_lote(validos)
+    return len(validos), rejeitados
+
+
+def importar_pacientes(pacientes, linhas: Iterable[Linha], relatorio: Optional[str] = None,
+                       tamanho_lote: int = 1000) -> ResultadoImportacao:
+    """
+    Importa pacientes em lotes a partir de um fluxo de registros (ver `ler_arquivo`).
+
+    O fluxo é consumido sob demanda, um lote por vez: a memória usada depende apenas do tamanho do
+    lote, e não do tamanho do arquivo. Cada lote é validado, deduplicado e inserido de uma só vez
+    com `pacientes.inserir_lote` (repositórios particionados fazem isso em cada partição, em paralelo,
+    com `pacientes.importar_lote`). Os registros rejeitados são gravados no relatório CSV (número da
+    linha, motivo e campos originais), se informado.
+    """
+    resultado = ResultadoImportacao()
+    arquivo_relatorio = open(relatorio, 'w', newline='', encoding='utf-8') if relatorio else None
+    try:
+        escritor = csv.writer(arquivo_relatorio) if arquivo_relatorio else None
+        if escritor:
+            escritor.writerow(('linha', 'motivo') + CAMPOS)
+        for lote in em_lotes(linhas, tamanho_lote):
+            if hasattr(pacientes, 'importar_lote'):
+                importados, rejeitados = pacientes.importar_lote(lote)
+            else:
+                importados, rejeitados = importar_lote(lote, pacientes)
+            resultado.lidos += len(lote)
+            resultado.importados += importados
+            resultado.rejeitados += len(rejeitados)
+            if escritor:
+                for (numero, registro), motivo in rejeitados:
+                    escritor.writerow((numero, motivo) + tuple(registro.get(campo, '') for campo in CAMPOS))
+    finally:
+        if arquivo_relatorio:
+            arquivo_relatorio.close()
+    return resultado
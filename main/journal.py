@@ -0,0 +1,185 @@
+import json
+import os
+import time
+from typing import List, Optional
+
+from main.domain import FilaAtendimento, EntradaFila, Risco
+from main.serializacao import atendimento_para_dict, atendimento_de_dict
+
+# Tipos de evento gravados no journal
+INSERCAO = 'i'
+CHAMADA = 'c'
+RECLASSIFICACAO = 'r'
+REMOCAO = 'x'
+# Lotes de inserções e de chamadas, gravados em uma única linha: na recuperação, o lote é aplicado
+# por inteiro ou, se a linha ficou incompleta, descartado por inteiro
+INSERCAO_LOTE = 'I'
+CHAMADA_LOTE = 'C'
+
+
+class JournalFila:
+    """
+    Journal (write-ahead log) da fila de atendimento, para reconstruí-la após uma falha.
+
+    Cada alteração da fila é acrescentada a um arquivo de log como uma linha JSON. Para não pagar um
+    fsync por evento, as gravações são agrupadas: o log é sincronizado com o disco a cada
+    `eventos_por_sync` eventos ou quando `intervalo_sync` segundos se passaram desde o último fsync.
+    Em caso de falha, perdem-se no máximo os eventos dessa janela.
+
+    A cada `eventos_por_snapshot` eventos é gravado um snapshot compacto com as entradas ativas da
+    fila (em ordem de chegada), e o log recomeça vazio em uma nova geração. Assim, a recuperação lê
+    no máximo um snapshot e `eventos_por_snapshot` eventos, independentemente do tempo de operação.
+
+    Arquivos no diretório: `fila.snapshot` e `fila-<geração>.log`.
+    """
+    def __init__(self, diretorio: str, eventos_por_sync: int = 256, intervalo_sync: float = 0.05,
+                 eventos_por_snapshot: int = 1_000_000):
+        self.diretorio = diretorio
+        self.eventos_por_sync = eventos_por_sync
+        self.intervalo_sync = intervalo_sync
+        self.eventos_por_snapshot = eventos_por_snapshot
+        self.fila: Optional[FilaAtendimento] = None
+        self.geracao = 0
+        self.arquivo = None
+        self.pendentes = 0
+        self.eventos = 0
+        self.ultimo_sync = time.monotonic()
+        os.makedirs(diretorio, exist_ok=True)
+
+    def recuperar(self, fila: FilaAtendimento, pacientes=None) -> FilaAtendimento:
+        """
+        Reconstrói na fila informada (vazia) o estado gravado no snapshot e no log, e passa a
+        registrar no journal as alterações dessa fila. Se `pacientes` for informado, os atendimentos
+        restaurados referenciam os pacientes do repositório.
+        """
+        ativas = {}
+        caminho_snapshot = os.path.join(self.diretorio, 'fila.snapshot')
+        if os.path.exists(caminho_snapshot):
+            with open(caminho_snapshot, encoding='utf-8') as arquivo:
+                snapshot = json.load(arquivo)
+            self.geracao = snapshot['geracao']
+            for sequencia, nivel, atendimento in snapshot['entradas']:
+                ativas[sequencia] = [nivel, atendimento]
+
+        caminho_log = self._caminho_log(self.geracao)
+        if os.path.exists(caminho_log):
+            validos = 0  # Bytes do log até o fim da última linha válida
+            with open(caminho_log, 'rb') as arquivo:
+                for linha in arquivo:
+                    try:
+                        if not linha.endswith(b'\n'):
+                            raise ValueError
+                        evento = json.loads(linha)
+                    except ValueError:
+                        break  # Última linha incompleta, gravada durante a falha
+                    _aplicar(ativas, evento)
+                    self.eventos += 1
+                    validos += len(linha)
+            # Descarta a linha incompleta, senão o próximo evento seria gravado em continuação a ela
+            if validos < os.path.getsize(caminho_log):
+                with open(caminho_log, 'r+b') as arquivo:
+                    arquivo.truncate(validos)
+                    os.fsync(arquivo.fileno())
+
+        for sequencia in sorted(ativas):
+            nivel, dados = ativas[sequencia]
+            atendimento = atendimento_de_dict(dados)
+            if pacientes is not None:
+                atendimento.paciente = pacientes.buscar(atendimento.paciente.cpf) or atendimento.paciente
+            atendimento.risco = Risco(nivel + 1)
+            fila.motor.inserir(nivel, atendimento, sequencia)
+
+        self.fila = fila
+        self.arquivo = open(caminho_log, 'a', encoding='utf-8')
+        fila.journal = self
+        return fila
+
+    def registrar_insercao(self, entrada: EntradaFila):
+        self._gravar([INSERCAO, entrada.sequencia, entrada.nivel, atendimento_para_dict(entrada.item)])
+
+    def registrar_chamada(self, entrada: EntradaFila):
+        self._gravar([CHAMADA, entrada.sequencia])
+
+    def registrar_insercoes(self, entradas: List[EntradaFila]):
+        self._gravar([INSERCAO_LOTE, [[e.sequencia, e.nivel, atendimento_para_dict(e.item)] for e in entradas]])
+
+    def registrar_chamadas(self, entradas: List[EntradaFila]):
+        self._gravar([CHAMADA_LOTE, [e.sequencia for e in entradas]])
+
+    def registrar_reclassificacao(self, entrada: EntradaFila):
+        self._gravar([RECLASSIFICACAO, entrada.sequencia, entrada.nivel])
+
+    def registrar_remocao(self, entrada: EntradaFila):
+        self._gravar([REMOCAO, entrada.sequencia])
+
+    def _gravar(self, evento: list):
+        self.arquivo.write(json.dumps(evento, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self.pendentes += 1
+        self.eventos += 1
+        if self.pendentes >= self.eventos_por_sync or time.monotonic() - self.ultimo_sync >= self.intervalo_sync:
+            self.sincronizar()
+        if self.eventos >= self.eventos_por_snapshot:
+            self.snapshot()
+
+    def sincronizar(self):
+        self.arquivo.flush()
+        os.fsync(self.arquivo.fileno())
+        self.pendentes = 0
+        self.ultimo_sync = time.monotonic()
+
+    def snapshot(self):
+        """
+        Grava as entradas ativas da fila em um novo snapshot e inicia uma nova geração do log. O
+        snapshot é gravado em um arquivo temporário e renomeado, portanto uma falha durante a
+        gravação mantém o snapshot e o log anteriores válidos.
+        """
+        nova_geracao = self.geracao + 1
+        entradas = [[e.sequencia, e.nivel, atendimento_para_dict(e.item)] for e in self.fila.motor.entradas()]
+        caminho = os.path.join(self.diretorio, 'fila.snapshot')
+        with open(caminho + '.tmp', 'w', encoding='utf-8') as arquivo:
+            json.dump({'geracao': nova_geracao, 'entradas': entradas}, arquivo, ensure_ascii=False,
+                      separators=(',', ':'))
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.replace(caminho + '.tmp', caminho)
+        self._sincronizar_diretorio()
+
+        self.arquivo.close()
+        os.remove(self._caminho_log(self.geracao))
+        self.geracao = nova_geracao
+        self.arquivo = open(self._caminho_log(self.geracao), 'a', encoding='utf-8')
+        self.pendentes = 0
+        self.eventos = 0
+
+    def fechar(self):
+        if self.arquivo is not None:
+            self.sincronizar()
+            self.arquivo.close()
+            self.arquivo = None
+
+    def _sincronizar_diretorio(self):
+        # Grava no disco a entrada do diretório, para que a troca do snapshot sobreviva a uma falha
+        descritor = os.open(self.diretorio, os.O_RDONLY)
+        try:
+            os.fsync(descritor)
+        finally:
+            os.close(descritor)
+
+    def _caminho_log(self, geracao: int) -> str:
+        return os.path.join(self.diretorio, f'fila-{geracao}.log')
+
+
+def _aplicar(ativas: dict, evento: list):
+    tipo, sequencia = evento[0], evento[1]
+    if tipo == INSERCAO_LOTE:
+        for sequencia, nivel, atendimento in evento[1]:
+            ativas[sequencia] = [nivel, atendimento]
+    elif tipo == CHAMADA_LOTE:
+        for sequencia in evento[1]:
+            ativas.pop(sequencia, None)
+    elif tipo == INSERCAO:
+        ativas[sequencia] = [evento[2], evento[3]]
+    elif tipo == RECLASSIFICACAO:
+        ativas[sequencia][0] = evento[2]
+    else:
+        ativas.pop(sequencia, None)
@@ -0,0 +1,166 @@
+"""
+Modo em lote: executa um roteiro de operações do `ProntoSocorroService`, uma por linha, sem menus nem
+`input()`. Útil para reproduzir sessões, migrar dados e gerar carga.
+
+Cada linha é uma requisição do protocolo (ver `main.protocolo.Protocolo`), em JSON:
+
+    {"op": "enfileirar", "cpf": "11111111111", "risco": "AMARELO"}
+
+ou na forma abreviada "operação chave=valor ...", com aspas simples ou duplas para valores com espaços:
+
+    registrar_paciente nome="Maria Souza" cpf=11111111111 email=maria@teste.com nascimento=21/03/2002
+    triagem gravidade_alta=sim fluxograma=dor_toracica discriminadores=dor_precordial,dispneia
+
+Linhas em branco e iniciadas por # são ignoradas.
+
+Uso: python main.py [--backend ...] lote [ROTEIRO] [--formato texto|json|silencioso] [--parar-no-erro]
+"""
+import json
+import re
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, TextIO
+
+from main.protocolo import Protocolo
+from main.service import ProntoSocorroService
+
+FORMATOS = ('texto', 'json', 'silencioso')
+# Respostas acumuladas antes de cada escrita na saída
+TAMANHO_BUFFER = 1000
+
+# Parâmetros da forma abreviada que não são textos
+CAMPOS_BOOLEANOS = frozenset({'risco_morte', 'gravidade_alta', 'gravidade_moderada', 'gravidade_baixa'})
+CAMPOS_LISTA = frozenset({'discriminadores'})
+CAMPOS_INTEIROS = frozenset({'limite', 'quantidade', 'desde'})
+# Operação da forma abreviada e cada parâmetro chave=valor, com o valor opcionalmente entre aspas
+_OPERACAO = re.compile(r"\S+")
+_PARAMETRO = re.compile(r"""\s+([^\s="']+)=(?:"([^"]*)"|'([^']*)'|([^\s"']*))(?=\s|$)""")
+VERDADEIROS = frozenset({'sim', 's', 'true', '1'})
+FALSOS = frozenset({'não', 'nao', 'n', 'false', '0', ''})
+
+
+@dataclass
+class ResultadoLote:
+    """
+    Resumo da execução de um roteiro.
+
+    Attributes:
+        operacoes: Operações executadas.
+        erros: Operações que falharam (inclusive linhas inválidas).
+        duracao: Duração da execução, em segundos.
+    """
+    operacoes: int = 0
+    erros: int = 0
+    duracao: float = 0.0
+
+    @property
+    def operacoes_por_segundo(self) -> float:
+        return self.operacoes / self.duracao if self.duracao else 0.0
+
+
+def ler_linha(linha: str) -> Optional[dict]:
+    """
+    Converte uma linha do roteiro em uma requisição do protocolo; retorna None para linhas em branco e
+    comentários. Lança ValueError se a linha for inválida.
+    """
+    linha = linha.strip()
+    if not linha or linha.startswith('#'):
+        return None
+    if linha.startswith('{'):
+        try:
+            return json.loads(linha)
+        except json.JSONDecodeError:
+            raise ValueError('JSON inválido.') from None
+    operacao = _OPERACAO.match(linha)
+    requisicao = {'op': operacao.group()}
+    posicao = operacao.end()
+    while posicao < len(linha):
+        parametro = _PARAMETRO.match(linha, posicao)
+        if parametro is None:
+            raise ValueError(f'Parâmetro inválido: {linha[posicao:].split()[0]}')
+        chave, aspas_duplas, aspas_simples, valor = parametro.groups()
+        requisicao[chave] = _converter(chave, next(v for v in (aspas_duplas, aspas_simples, valor) if v is not None))
+        posicao = parametro.end()
+    return requisicao
+
+
+def _converter(chave: str, valor: str):
+    if chave in CAMPOS_BOOLEANOS:
+        if valor.lower() in VERDADEIROS:
+            return True
+        if valor.lower() in FALSOS:
+            return False
+        raise ValueError(f'Valor inválido para {chave}: {valor}')
+    if chave in CAMPOS_LISTA:
+        return [item for item in valor.split(',') if item]
+    if chave in CAMPOS_INTEIROS:
+        return int(valor)
+    return valor
+
+
+class ExecutorLote:
+    """
+    Executa roteiros pelo `Protocolo`, escrevendo as respostas na saída em blocos.
+
+    Formatos da saída:
+        texto: uma linha por operação, "ok operação: resultado" ou "erro na linha N (operação): mensagem".
+        json: as respostas do protocolo, uma por linha, como no servidor de rede.
+        silencioso: apenas as operações que falharam.
+    """
+    def __init__(self, ps_service: ProntoSocorroService, saida: TextIO, formato: str = 'texto',
+                 parar_no_erro: bool = False):
+        if formato not in FORMATOS:
+            raise ValueError(f'Formato de saída inválido: {formato}')
+        self.protocolo = Protocolo(ps_service)
+        self.saida = saida
+        self.formato = formato
+        self.parar_no_erro = parar_no_erro
+
+    def executar(self, linhas: Iterable[str]) -> ResultadoLote:
+        resultado = ResultadoLote()
+        buffer: List[str] = []
+        inicio = time.perf_counter()
+        try:
+            for numero, linha in enumerate(linhas, 1):
+                try:
+                    requisicao = ler_linha(linha)
+                except ValueError as e:
+                    requisicao, resposta = {}, {'ok': False, 'erro': f'Linha inválida: {e}'}
+                else:
+                    if requisicao is None:
+                        continue
+                    try:
+                        resposta = self.protocolo.executar(requisicao)
+                    except Exception as e:
+                        # Um erro inesperado em uma linha não interrompe o roteiro
+                        resposta = {'ok': False, 'erro': f'Erro inesperado: {e!r}'}
+                resultado.operacoes += 1
+                if not resposta['ok']:
+                    resultado.erros += 1
+                saida = self._formatar(numero, requisicao, resposta)
+                if saida is not None:
+                    buffer.append(saida)
+                    if len(buffer) >= TAMANHO_BUFFER:
+                        self._escrever(buffer)
+                if not resposta['ok'] and self.parar_no_erro:
+                    break
+        finally:
+            # As respostas já executadas são escritas mesmo se a leitura do roteiro falhar
+            self._escrever(buffer)
+        resultado.duracao = time.perf_counter() - inicio
+        return resultado
+
+    def _formatar(self, numero: int, requisicao: dict, resposta: dict) -> Optional[str]:
+        if self.formato == 'json':
+            return json.dumps(resposta, ensure_ascii=False)
+        operacao = requisicao.get('op', '?') if isinstance(requisicao, dict) else '?'
+        if not resposta['ok']:
+            return f"erro na linha {numero} ({operacao}): {resposta['erro']}"
+        if self.formato == 'silencioso':
+            return None
+        return f"ok {operacao}: {json.dumps(resposta['resultado'], ensure_ascii=False)}"
+
+    def _escrever(self, buffer: List[str]):
+        if buffer:
+            self.saida.write('\n'.join(buffer) + '\n')
+            buffer.clear()
@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Dict, Optional, Tuple
+
+from main.cache import EstatisticasCache
+from main.domain import FilaAtendimento, Risco
+from main.error import PSBaseError
+
+# Limites superiores (em segundos) dos intervalos dos histogramas de latência
+INTERVALOS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 0.1, 1.0)
+
+# Operações do ProntoSocorroService medidas por `instrumentar`
+OPERACOES = ('registrar_paciente', 'atualizar_paciente', 'buscar_pacientes_por_nome', 'importar_pacientes', 'classificar_risco', 'registrar_atendimento',
+             'inserir_fila_atendimento', 'inserir_fila_lote', 'reclassificar', 'remover_da_fila', 'chamar_proximo',
+             'chamar_proximos', 'buscar_historico', 'pagina_historico')
+
+
+class Histograma:
+    """
+    Histograma de latências com intervalos fixos, no formato dos histogramas do Prometheus.
+    """
+    def __init__(self, intervalos: Tuple[float, ...] = INTERVALOS):
+        self.intervalos = intervalos
+        self.contagens = [0] * (len(intervalos) + 1)  # O último intervalo é o +Inf
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        self.contagens[bisect_left(self.intervalos, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+
+class Metricas:
+    """
+    Métricas de operação do pronto-socorro: um histograma de latência por operação do serviço, um
+    contador de erros por operação e tipo de erro e, no momento da exportação, a quantidade de
+    pacientes aguardando na fila por nível de risco.
+
+    As métricas são coletadas apenas em serviços instrumentados (ver `instrumentar`); sem
+    instrumentação, o serviço não tem nenhum custo adicional. As atualizações são protegidas por um
+    lock, para uso com o serviço concorrente.
+    """
+    def __init__(self, intervalos: Tuple[float, ...] = INTERVALOS):
+        self.intervalos = intervalos
+        self.latencias: Dict[str, Histograma] = {}
+        self.erros: Dict[Tuple[str, str], int] = {}
+        self.lock = threading.Lock()
+
+    def histograma(self, operacao: str) -> Histograma:
+        with self.lock:
+            histograma = self.latencias.get(operacao)
+            if histograma is None:
+                histograma = self.latencias[operacao] = Histograma(self.intervalos)
+            return histograma
+
+    def observar(self, operacao: str, segundos: float):
+        histograma = self.histograma(operacao)
+        with self.lock:
+            histograma.observar(segundos)
+
+    def contar_erro(self, operacao: str, erro: str):
+        with self.lock:
+            self.erros[operacao, erro] = self.erros.get((operacao, erro), 0) + 1
+
+    def exportar(self, fila: Optional[FilaAtendimento] = None, cache: Optional[EstatisticasCache] = None) -> str:
+        """
+        Retorna as métricas no formato de texto do Prometheus. Se a fila for informada, inclui a
+        quantidade de pacientes aguardando em cada nível de risco; se as estatísticas do cache de
+        pacientes forem informadas, os seus contadores.
+        """
+        linhas = ['# HELP ps_operacao_duracao_segundos Duração das operações do serviço do pronto-socorro.',
+                  '# TYPE ps_operacao_duracao_segundos histogram']
+        with self.lock:
+            for operacao, histograma in sorted(self.latencias.items()):
+                acumulado = 0
+                for limite, contagem in zip(self.intervalos + (float('inf'),), histograma.contagens):
+                    acumulado += contagem
+                    le = '+Inf' if limite == float('inf') else repr(limite)
+                    linhas.append(f'ps_operacao_duracao_segundos_bucket{{operacao="{operacao}",le="{le}"}} {acumulado}')
+                linhas.append(f'ps_operacao_duracao_segundos_sum{{operacao="{operacao}"}} {histograma.soma!r}')
+                linhas.append(f'ps_operacao_duracao_segundos_count{{operacao="{operacao}"}} {histograma.total}')
+            linhas += ['# HELP ps_erros_total Operações do serviço que terminaram em erro.',
+                       '# TYPE ps_erros_total counter']
+            for (operacao, erro), total in sorted(self.erros.items()):
+                linhas.append(f'ps_erros_total{{operacao="{operacao}",erro="{erro}"}} {total}')
+        if fila is not None:
+            linhas += ['# HELP ps_fila_pacientes Pacientes aguardando na fila de atendimento.',
+                       '# TYPE ps_fila_pacientes gauge']
+            for risco in Risco:
+                linhas.append(f'ps_fila_pacientes{{risco="{risco.name}"}} {fila.tamanho(risco)}')
+        if cache is not None:
+            linhas += ['# HELP ps_cache_pacientes_total Buscas e remoções do cache de pacientes.',
+                       '# TYPE ps_cache_pacientes_total counter']
+            for evento in ('acertos', 'falhas', 'descartes', 'invalidacoes'):
+                linhas.append(f'ps_cache_pacientes_total{{evento="{evento}"}} {getattr(cache, evento)}')
+        return '\n'.join(linhas) + '\n'
+
+    def gravar(self, caminho: str, fila: Optional[FilaAtendimento] = None, cache: Optional[EstatisticasCache] = None):
+        """
+        Grava as métricas em um arquivo de texto (por exemplo, para o textfile collector do node
+        exporter). O arquivo é substituído atomicamente, para que nunca seja lido pela metade.
+        """
+        with open(caminho + '.tmp', 'w', encoding='utf-8') as arquivo:
+            arquivo.write(self.exportar(fila, cache))
+        os.replace(caminho + '.tmp', caminho)
+
+
+def instrumentar(ps_service, metricas: Optional[Metricas] = None) -> Metricas:
+    """
+    Passa a medir as operações de um `ProntoSocorroService`: cada operação de `OPERACOES` é
+    substituída, apenas nesta instância, por uma versão que registra a sua duração e os erros de
+    negócio. Retorna as métricas, também acessíveis em `ps_service.metricas`.
+    """
+    metricas = metricas if metricas is not None else Metricas()
+    for operacao in OPERACOES:
+        setattr(ps_service, operacao, _medida(metricas, operacao, getattr(ps_service, operacao)))
+    ps_service.metricas = metricas
+    return metricas
+
+
+def _medida(metricas: Metricas, operacao: str, funcao):
+    relogio = time.perf_counter
+    histograma = metricas.histograma(operacao)
+    lock = metricas.lock
+
+    @wraps(funcao)
+    def medida(*args, **kwargs):
+        inicio = relogio()
+        try:
+            return funcao(*args, **kwargs)
+        except PSBaseError as e:
+            metricas.contar_erro(operacao, type(e).__name__)
+            raise
+        finally:
+            duracao = relogio() - inicio
+            with lock:
+                histograma.observar(duracao)
+    return medida
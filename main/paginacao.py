@@ -0,0 +1,43 @@
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from main.domain import Atendimento
+from main.error import ValidacaoError
+
+TAMANHO_PAGINA = 20
+
+
+@dataclass
+class PaginaHistorico:
+    """
+    Uma página do histórico de atendimentos de um paciente.
+
+    Attributes:
+        atendimentos: Atendimentos da página, na ordem pedida.
+        cursor: Token para buscar a página seguinte, ou None se esta for a última.
+    """
+    atendimentos: List[Atendimento]
+    cursor: Optional[str] = None
+
+
+def criar_cursor(entrada: int, chave: int) -> str:
+    """
+    Cria o token de continuação a partir do último atendimento de uma página: a sua entrada (em
+    microssegundos desde 01/01/1970) e a chave que desempata entradas iguais (a linha ou o id).
+    """
+    return f"{entrada}.{chave}"
+
+
+def ler_cursor(cursor: str) -> Tuple[int, int]:
+    entrada, separador, chave = cursor.partition('.')
+    try:
+        if not separador:
+            raise ValueError(cursor)
+        return int(entrada), int(chave)
+    except ValueError:
+        raise ValidacaoError("Cursor de paginação inválido.")
+
+
+def validar_tamanho_pagina(tamanho: int):
+    if tamanho < 1:
+        raise ValidacaoError("O tamanho da página deve ser de pelo menos um atendimento.")
@@ -0,0 +1,263 @@
+import heapq
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, wait
+from datetime import datetime
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from main.analitico import Serie, largura_periodo, somar_contagens, somar_series
+from main.domain import Paciente, Atendimento, Risco, normalizar_cpf
+from main.error import PacienteNaoCadastradoError
+from main.importacao import Linha, importar_lote
+from main.paginacao import PaginaHistorico, TAMANHO_PAGINA
+from main.repository import PacienteRepository, AtendimentoRepository
+
+# Estado de cada processo de partição, criado por `_iniciar_particao`
+_pacientes: Optional[PacienteRepository] = None
+_atendimentos: Optional[AtendimentoRepository] = None
+
+
+class Particoes:
+    """
+    Conjunto de processos, cada um dono de uma partição dos dados: os pacientes cujo CPF pertence à
+    partição (pelo hash do CPF) e os atendimentos desses pacientes, em repositórios em memória.
+
+    Cada partição é um `ProcessPoolExecutor` de um único processo, para que o seu estado permaneça no
+    mesmo processo. As consultas de um CPF são encaminhadas à partição dona; as operações em lote são
+    divididas entre as partições, executadas em paralelo e os resultados combinados.
+    """
+    def __init__(self, quantidade: Optional[int] = None, indexar_email: bool = False,
+                 indexar_nascimento: bool = False, indexar_nome: bool = False):
+        quantidade = quantidade or os.cpu_count() or 1
+        self.executores = [ProcessPoolExecutor(1, initializer=_iniciar_particao,
+                                               initargs=(indexar_email, indexar_nascimento, indexar_nome))
+                           for _ in range(quantidade)]
+
+    def __len__(self) -> int:
+        return len(self.executores)
+
+    def indice(self, cpf: str) -> int:
+        return hash(cpf) % len(self.executores)
+
+    def executar(self, cpf: str, funcao: Callable, *args):
+        """
+        Executa `funcao(*args)` na partição dona do CPF (normalizado) e retorna o resultado.
+        """
+        return self.executores[self.indice(cpf)].submit(funcao, *args).result()
+
+    def distribuir(self, itens: Iterable, cpf: Callable, funcao: Callable, *args) -> list:
+        """
+        Agrupa os itens pela partição dona do CPF de cada um, executa `funcao(*args, grupo)` em paralelo
+        nas partições envolvidas e retorna a lista dos resultados. Se alguma partição falhar, a exceção
+        é propagada depois que as demais terminarem.
+        """
+        grupos = defaultdict(list)
+        for item in itens:
+            grupos[self.indice(cpf(item))].append(item)
+        return _resultados([self.executores[i].submit(funcao, *args, grupo) for i, grupo in grupos.items()])
+
+    def todas(self, funcao: Callable, *args) -> list:
+        """
+        Executa `funcao(*args)` em paralelo em todas as partições e retorna a lista dos resultados.
+        """
+        return _resultados([executor.submit(funcao, *args) for executor in self.executores])
+
+    def fechar(self):
+        for executor in self.executores:
+            executor.shutdown()
+
+
+class PacienteRepositoryParticionado:
+    """
+    Repositório de pacientes particionado entre processos (ver `Particoes`), com a mesma interface do
+    `PacienteRepository`. As buscas por e-mail e nascimento consultam todas as partições e retornam os
+    pacientes agrupados por partição.
+    """
+    def __init__(self, particoes: Particoes):
+        self.particoes = particoes
+
+    def inserir(self, paciente: Paciente):
+        self.particoes.executar(paciente.cpf, _executar_pacientes, 'inserir', paciente)
+
+    def inserir_lote(self, pacientes: Iterable[Paciente]):
+        self.particoes.distribuir(pacientes, _cpf_paciente, _executar_pacientes, 'inserir_lote')
+
+    def importar_lote(self, lote: List[Linha]) -> Tuple[int, List[Tuple[Linha, str]]]:
+        """
+        Valida e insere um lote de registros importados (ver `main.importacao`) dentro das partições,
+        em paralelo. Registros com o mesmo CPF caem na mesma partição, então a deduplicação continua
+        valendo para o lote inteiro.
+        """
+        resultados = self.particoes.distribuir(lote, _cpf_linha, _importar_lote)
+        rejeitados = [rejeitado for _, parte in resultados for rejeitado in parte]
+        rejeitados.sort(key=lambda rejeitado: rejeitado[0][0])
+        return sum(importados for importados, _ in resultados), rejeitados
+
+    def atualizar(self, paciente: Paciente):
+        self.particoes.executar(paciente.cpf, _executar_pacientes, 'atualizar', paciente)
+
+    def buscar(self, cpf: str) -> Optional[Paciente]:
+        cpf = normalizar_cpf(cpf)
+        return self.particoes.executar(cpf, _executar_pacientes, 'buscar', cpf)
+
+    def existentes(self, cpfs: Iterable[str]) -> Set[str]:
+        return set().union(*self.particoes.distribuir(cpfs, str, _executar_pacientes, 'existentes'))
+
+    def buscar_por_email(self, email: str) -> List[Paciente]:
+        return _concatenar(self.particoes.todas(_executar_pacientes, 'buscar_por_email', email))
+
+    def buscar_por_nascimento(self, nascimento: str) -> List[Paciente]:
+        return _concatenar(self.particoes.todas(_executar_pacientes, 'buscar_por_nascimento', nascimento))
+
+    def buscar_por_nome(self, nome: str, limite: int = 10) -> List[Tuple[Paciente, float]]:
+        """
+        Busca aproximada por nome em todas as partições, em paralelo; retorna os `limite` pacientes
+        mais semelhantes entre os melhores de cada partição.
+        """
+        resultados = _concatenar(self.particoes.todas(_executar_pacientes, 'buscar_por_nome', nome, limite))
+        return heapq.nlargest(limite, resultados, key=itemgetter(1))
+
+    def tamanho(self) -> int:
+        return sum(self.particoes.todas(_executar_pacientes, 'tamanho'))
+
+
+class AtendimentoRepositoryParticionado:
+    """
+    Repositório de atendimentos particionado entre processos, com a mesma interface do
+    `AtendimentoRepository`. Os atendimentos de um paciente ficam na partição do seu CPF; o histórico
+    retorna cópias dos atendimentos, como o repositório SQLite. Os relatórios por período consultam o
+    índice temporal de todas as partições em paralelo e somam os resultados.
+
+    Cada atendimento aberto é lembrado pela sua linha no repositório da partição, retornada por
+    `abrir`, e encerrado por ela: atendimentos do mesmo paciente com a mesma entrada não se confundem.
+    """
+    def __init__(self, paciente_repository: PacienteRepositoryParticionado):
+        self.paciente_repository = paciente_repository
+        self.particoes = paciente_repository.particoes
+        self.linhas_abertas: Dict[int, int] = {}  # id(atendimento) -> linha na partição do paciente
+
+    def inserir(self, atendimento: Atendimento):
+        self.particoes.executar(atendimento.paciente.cpf, _inserir_atendimentos, [_linha_atendimento(atendimento)])
+
+    def inserir_lote(self, atendimentos: Iterable[Atendimento]):
+        self.particoes.distribuir(map(_linha_atendimento, atendimentos), itemgetter(0), _inserir_atendimentos)
+
+    def abrir(self, atendimento: Atendimento):
+        for _, linha in self.particoes.executar(atendimento.paciente.cpf, _abrir_atendimentos,
+                                                [(*_linha_atendimento(atendimento), 0)]):
+            self.linhas_abertas[id(atendimento)] = linha
+
+    def abrir_lote(self, atendimentos: Iterable[Atendimento]):
+        atendimentos = list(atendimentos)
+        itens = [(*_linha_atendimento(atendimento), i) for i, atendimento in enumerate(atendimentos)]
+        for abertos in self.particoes.distribuir(itens, itemgetter(0), _abrir_atendimentos):
+            for i, linha in abertos:
+                self.linhas_abertas[id(atendimentos[i])] = linha
+
+    def encerrar(self, atendimento: Atendimento):
+        linha = self.linhas_abertas.pop(id(atendimento), None)
+        if linha is not None:
+            self.particoes.executar(atendimento.paciente.cpf, _encerrar_atendimento, linha, atendimento.risco.value)
+
+    def historico_atendimentos(self, cpf: str, inicio: Optional[datetime] = None,
+                               fim: Optional[datetime] = None) -> List[Atendimento]:
+        cpf = normalizar_cpf(cpf)
+        return self.particoes.executar(cpf, _executar_atendimentos, 'historico_atendimentos', cpf, inicio, fim)
+
+    def pagina_historico(self, cpf: str, tamanho: int = TAMANHO_PAGINA, cursor: Optional[str] = None,
+                         recentes_primeiro: bool = False, inicio: Optional[datetime] = None,
+                         fim: Optional[datetime] = None) -> PaginaHistorico:
+        cpf = normalizar_cpf(cpf)
+        return self.particoes.executar(cpf, _executar_atendimentos, 'pagina_historico', cpf, tamanho, cursor,
+                                       recentes_primeiro, inicio, fim)
+
+    def tamanho(self) -> int:
+        return sum(self.particoes.todas(_executar_atendimentos, 'tamanho'))
+
+    def contagem_por_risco(self, inicio: Optional[datetime] = None,
+                           fim: Optional[datetime] = None) -> Dict[Risco, int]:
+        return somar_contagens(self.particoes.todas(_executar_atendimentos, 'contagem_por_risco', inicio, fim))
+
+    def serie_por_risco(self, granularidade: str = 'hora', inicio: Optional[datetime] = None,
+                        fim: Optional[datetime] = None) -> Serie:
+        largura_periodo(granularidade)
+        return somar_series(self.particoes.todas(_executar_atendimentos, 'serie_por_risco', granularidade, inicio, fim))
+
+
+def criar_repositorios_particionados(particoes: Optional[int] = None, **kwargs):
+    """
+    Cria os repositórios de pacientes e atendimentos sobre um mesmo conjunto de `Particoes`. Os
+    argumentos adicionais são repassados a `Particoes`.
+    """
+    pacientes = PacienteRepositoryParticionado(Particoes(particoes, **kwargs))
+    return pacientes, AtendimentoRepositoryParticionado(pacientes)
+
+
+def _resultados(futuros: list) -> list:
+    wait(futuros)
+    return [futuro.result() for futuro in futuros]
+
+
+def _concatenar(listas: List[list]) -> list:
+    return [item for lista in listas for item in lista]
+
+
+def _cpf_paciente(paciente: Paciente) -> str:
+    return paciente.cpf
+
+
+def _cpf_linha(linha: Linha) -> str:
+    cpf = linha[1].get('cpf')
+    return normalizar_cpf(cpf) if isinstance(cpf, str) else ''
+
+
+def _linha_atendimento(atendimento: Atendimento) -> tuple:
+    return (atendimento.paciente.cpf, atendimento.risco.value, atendimento.entrada)
+
+
+# Funções executadas nos processos das partições
+
+def _iniciar_particao(indexar_email: bool, indexar_nascimento: bool, indexar_nome: bool):
+    global _pacientes, _atendimentos
+    _pacientes = PacienteRepository(indexar_email, indexar_nascimento, indexar_nome)
+    _atendimentos = AtendimentoRepository(_pacientes)
+
+
+def _executar_pacientes(metodo: str, *args):
+    return getattr(_pacientes, metodo)(*args)
+
+
+def _executar_atendimentos(metodo: str, *args):
+    return getattr(_atendimentos, metodo)(*args)
+
+
+def _importar_lote(lote: List[Linha]) -> Tuple[int, List[Tuple[Linha, str]]]:
+    return importar_lote(lote, _pacientes)
+
+
+def _inserir_atendimentos(linhas: List[tuple]):
+    pacientes = [_pacientes.buscar(cpf) for cpf, _, _ in linhas]
+    if None in pacientes:
+        raise PacienteNaoCadastradoError('Paciente não cadastrado')
+    for paciente, (cpf, risco, entrada) in zip(pacientes, linhas):
+        _atendimentos.inserir(Atendimento(paciente, Risco(risco), entrada))
+
+
+def _abrir_atendimentos(linhas: List[tuple]) -> List[Tuple[int, int]]:
+    # Cada item traz a sua posição no lote; retorna as posições dos atendimentos abertos e as suas linhas
+    abertos = []
+    for cpf, risco, entrada, posicao in linhas:
+        paciente = _pacientes.buscar(cpf)
+        if paciente is not None:
+            linha = _atendimentos.abrir(Atendimento(paciente, Risco(risco), entrada))
+            if linha is not None:
+                abertos.append((posicao, linha))
+    return abertos
+
+
+def _encerrar_atendimento(linha: int, risco: int):
+    atendimento = _atendimentos.abertos.get(linha)
+    if atendimento is not None:
+        atendimento.risco = Risco(risco)
+        _atendimentos.encerrar(atendimento)
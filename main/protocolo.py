@@ -0,0 +1,111 @@
+from typing import Callable, Dict
+
+from main.domain import FichaAnalise, Risco
+from main.error import PSBaseError, PacienteNaoCadastradoError
+from main.serializacao import paciente_para_dict, atendimento_para_dict, evento_para_dict
+from main.service import ProntoSocorroService
+
+# Parâmetros das requisições que devem ser textos
+CAMPOS_TEXTO = ('nome', 'cpf', 'email', 'nascimento', 'risco', 'fluxograma')
+
+
+class Protocolo:
+    """
+    Traduz requisições em forma de dicionário (ex.: objetos JSON) em operações do
+    `ProntoSocorroService` e monta as respostas correspondentes.
+
+    Cada requisição tem o campo "op" com o nome da operação e os seus parâmetros. A resposta é
+    {"ok": true, "resultado": ...} ou {"ok": false, "erro": "mensagem"}; se a requisição tiver um
+    campo "id", ele é devolvido na resposta.
+    """
+    def __init__(self, ps_service: ProntoSocorroService):
+        self.ps_service = ps_service
+        self.operacoes: Dict[str, Callable[[dict], object]] = {
+            'registrar_paciente': self.registrar_paciente,
+            'triagem': self.triagem,
+            'enfileirar': self.enfileirar,
+            'chamar_proximo': self.chamar_proximo,
+            'chamar_proximos': self.chamar_proximos,
+            'historico': self.historico,
+            'atualizar_paciente': self.atualizar_paciente,
+            'buscar_por_nome': self.buscar_por_nome,
+            'eventos_fila': self.eventos_fila,
+        }
+
+    def executar(self, requisicao: dict) -> dict:
+        resposta = {}
+        if isinstance(requisicao, dict) and 'id' in requisicao:
+            resposta['id'] = requisicao['id']
+        operacao = self.operacoes.get(requisicao.get('op')) if isinstance(requisicao, dict) else None
+        if operacao is None:
+            resposta.update(ok=False, erro='Operação desconhecida.')
+            return resposta
+        for campo in CAMPOS_TEXTO:
+            if campo in requisicao and not isinstance(requisicao[campo], str):
+                resposta.update(ok=False, erro=f'Requisição inválida: o campo {campo} deve ser um texto.')
+                return resposta
+        try:
+            resposta['resultado'] = operacao(requisicao)
+            resposta['ok'] = True
+        except PSBaseError as e:
+            resposta.update(ok=False, erro=e.message)
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            resposta.update(ok=False, erro=f'Requisição inválida: {e}')
+        return resposta
+
+    def registrar_paciente(self, req: dict) -> dict:
+        paciente = self.ps_service.registrar_paciente(req['nome'], req['cpf'], req['email'], req['nascimento'])
+        return paciente_para_dict(paciente)
+
+    def atualizar_paciente(self, req: dict) -> dict:
+        paciente = self.ps_service.atualizar_paciente(req['nome'], req['cpf'], req['email'], req['nascimento'])
+        return paciente_para_dict(paciente)
+
+    def buscar_por_nome(self, req: dict) -> list:
+        resultados = self.ps_service.buscar_pacientes_por_nome(req['nome'], int(req.get('limite', 10)))
+        return [dict(paciente_para_dict(paciente), semelhanca=round(valor, 4)) for paciente, valor in resultados]
+
+    def triagem(self, req: dict) -> str:
+        return self.ps_service.classificar_risco(_ficha(req)).name
+
+    def enfileirar(self, req: dict) -> dict:
+        """
+        Registra um atendimento e o insere na fila. O risco pode ser informado diretamente (campo
+        "risco") ou obtido pela triagem a partir dos campos da ficha de análise.
+        """
+        paciente = self._paciente(req['cpf'])
+        risco = Risco[req['risco']] if 'risco' in req else self.ps_service.classificar_risco(_ficha(req))
+        atendimento = self.ps_service.registrar_atendimento(paciente, risco)
+        self.ps_service.inserir_fila_atendimento(atendimento)
+        return atendimento_para_dict(atendimento)
+
+    def chamar_proximo(self, req: dict) -> dict:
+        return atendimento_para_dict(self.ps_service.chamar_proximo())
+
+    def chamar_proximos(self, req: dict) -> list:
+        return [atendimento_para_dict(atendimento) for atendimento in self.ps_service.chamar_proximos(int(req['quantidade']))]
+
+    def historico(self, req: dict) -> list:
+        historico = self.ps_service.buscar_historico(self._paciente(req['cpf']))
+        return [atendimento_para_dict(atendimento) for atendimento in historico]
+
+    def eventos_fila(self, req: dict) -> dict:
+        """
+        Eventos da fila a partir da sequência "desde" (padrão: 0), até "limite" eventos (padrão: 100),
+        para painéis que acompanham a fila pelo protocolo; ver `main.eventos.FeedFila.ler`.
+        """
+        leitura = self.ps_service.feed_fila().ler(int(req.get('desde', 0)), int(req.get('limite', 100)))
+        return {'eventos': [evento_para_dict(evento) for evento in leitura.eventos], 'proxima': leitura.proxima,
+                'perdidos': leitura.perdidos}
+
+    def _paciente(self, cpf: str):
+        paciente = self.ps_service.pacientes.buscar(cpf)
+        if paciente is None:
+            raise PacienteNaoCadastradoError('Paciente não cadastrado')
+        return paciente
+
+
+def _ficha(req: dict) -> FichaAnalise:
+    return FichaAnalise(bool(req.get('risco_morte')), bool(req.get('gravidade_alta')),
+                        bool(req.get('gravidade_moderada')), bool(req.get('gravidade_baixa')),
+                        req.get('fluxograma', 'geral'), frozenset(req.get('discriminadores', ())))
@@ -1,45 +1,301 @@
-from typing import List
+from array import array
+from bisect import bisect_left, bisect_right, insort_right
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
-from main.domain import Paciente, Atendimento
+from main.analitico import IndiceTemporal, Serie
+from main.busca import IndiceNomes, ordenar_por_semelhanca
+from main.domain import Paciente, Atendimento, Risco, normalizar_cpf
+from main.paginacao import PaginaHistorico, criar_cursor, ler_cursor, validar_tamanho_pagina, TAMANHO_PAGINA
 
 from main.error import CPFDuplicadoError, PacienteNaoCadastradoError
 
+_EPOCA = datetime(1970, 1, 1)
+_MICROSSEGUNDO = timedelta(microseconds=1)
+
 class PacienteRepository:
     """
     Gerencia o armazenamento e recuperação de pacientes no sistema (apenas em memória).
+
+    Os pacientes são indexados pelo CPF normalizado, de modo que a busca e a verificação de CPF
+    duplicado (regra 5) custam O(1). Opcionalmente, mantém índices secundários por e-mail, por
+    data de nascimento e um índice de trigramas para a busca aproximada por nome.
     """
-    def __init__(self):
-        self.pacientes: List[Paciente] = []
+    def __init__(self, indexar_email: bool = False, indexar_nascimento: bool = False, indexar_nome: bool = False):
+        self.pacientes: Dict[str, Paciente] = {}
+        self.por_email: Optional[Dict[str, List[Paciente]]] = {} if indexar_email else None
+        self.por_nascimento: Optional[Dict[str, List[Paciente]]] = {} if indexar_nascimento else None
+        self.por_nome: Optional[IndiceNomes] = IndiceNomes() if indexar_nome else None
 
     def inserir(self, paciente: Paciente):
-        self.pacientes.append(paciente)
+        if paciente.cpf in self.pacientes:
+            raise CPFDuplicadoError('CPF já cadastrado no sistema.')
+        self.pacientes[paciente.cpf] = paciente
+        self._indexar(paciente)
+
+    def atualizar(self, paciente: Paciente):
+        """
+        Substitui os dados do paciente cadastrado com o mesmo CPF.
+        """
+        anterior = self.pacientes.get(paciente.cpf)
+        if anterior is None:
+            raise PacienteNaoCadastradoError('Paciente não cadastrado')
+        self.pacientes[paciente.cpf] = paciente
+        self._desindexar(anterior)
+        self._indexar(paciente)
+
+    def _indexar(self, paciente: Paciente):
+        if self.por_email is not None:
+            self.por_email.setdefault(paciente.email.lower(), []).append(paciente)
+        if self.por_nascimento is not None:
+            self.por_nascimento.setdefault(paciente.nascimento, []).append(paciente)
+        if self.por_nome is not None:
+            self.por_nome.adicionar(int(paciente.cpf), paciente.nome)
+
+    def _desindexar(self, paciente: Paciente):
+        for indice, chave in ((self.por_email, paciente.email.lower()), (self.por_nascimento, paciente.nascimento)):
+            if indice is not None:
+                pacientes = indice[chave]
+                pacientes.remove(paciente)
+                if not pacientes:
+                    del indice[chave]
+        if self.por_nome is not None:
+            self.por_nome.remover(int(paciente.cpf), paciente.nome)
+
+    def inserir_lote(self, pacientes: Iterable[Paciente]):
+        for paciente in pacientes:
+            self.inserir(paciente)
+
+    def buscar(self, cpf: str) -> Optional[Paciente]:
+        return self.pacientes.get(normalizar_cpf(cpf))
+
+    def existentes(self, cpfs: Iterable[str]) -> Set[str]:
+        """
+        Retorna, entre os CPFs (normalizados) informados, os que já estão cadastrados.
+        """
+        return {cpf for cpf in cpfs if cpf in self.pacientes}
+
+    def buscar_por_email(self, email: str) -> List[Paciente]:
+        email = email.lower()
+        if self.por_email is None:
+            return [p for p in self.pacientes.values() if p.email.lower() == email]
+        return list(self.por_email.get(email, []))
+
+    def buscar_por_nascimento(self, nascimento: str) -> List[Paciente]:
+        if self.por_nascimento is None:
+            return [p for p in self.pacientes.values() if p.nascimento == nascimento]
+        return list(self.por_nascimento.get(nascimento, []))
+
+    def buscar_por_nome(self, nome: str, limite: int = 10) -> List[Tuple[Paciente, float]]:
+        """
+        Busca aproximada por nome, sem diferenciar acentos e maiúsculas e tolerante a erros de
+        digitação: retorna até `limite` pacientes com a semelhança do nome com a consulta (de 0 a 1),
+        dos mais semelhantes aos menos. Ver `main.busca`.
+        """
+        if self.por_nome is None:
+            return ordenar_por_semelhanca(nome, ((p, p.nome) for p in self.pacientes.values()), limite)
+        return [(self.pacientes[f"{chave:011d}"], valor) for chave, valor in self.por_nome.buscar(nome, limite)]
+
+    def tamanho(self) -> int:
+        return len(self.pacientes)
+
+class ArquivoAtendimentos:
+    """
+    Armazenamento colunar e compacto de atendimentos, em arrays de tipos primitivos.
+
+    Cada atendimento ocupa uma linha com o CPF como inteiro, o código do risco em um byte e a entrada
+    em microssegundos desde 01/01/1970 (sem fuso horário), cerca de 17 bytes por atendimento em vez
+    de um objeto `Atendimento` com o seu `datetime`.
+    """
+    def __init__(self):
+        self.cpfs = array('Q')
+        self.riscos = array('B')
+        self.entradas = array('q')
+
+    def acrescentar(self, atendimento: Atendimento) -> int:
+        self.cpfs.append(int(atendimento.paciente.cpf))
+        self.riscos.append(atendimento.risco.value)
+        self.entradas.append(_microssegundos(atendimento.entrada))
+        return len(self.cpfs) - 1
+
+    def atendimento(self, linha: int, paciente: Paciente) -> Atendimento:
+        return Atendimento(paciente, Risco(self.riscos[linha]), _EPOCA + timedelta(microseconds=self.entradas[linha]))
+
+    def tamanho(self) -> int:
+        return len(self.cpfs)
 
-    def buscar(self, cpf: str):
-        for p in self.pacientes:
-            if p.cpf == cpf:
-                return p
-        return None
 
 class AtendimentoRepository:
     """
     Gerencia o armazenamento e recuperação de atendimentos no sistema (apenas em memória).
+
+    Todos os atendimentos são gravados em um `ArquivoAtendimentos` colunar. Enquanto está aberto (da
+    entrada na fila, em `abrir`, até `encerrar`), o objeto `Atendimento` também é mantido; fora desse
+    intervalo resta apenas a sua linha compacta, e o objeto é recriado sob demanda nas consultas de
+    histórico.
+
+    Um índice por CPF guarda as linhas de cada paciente em ordem cronológica de entrada. Assim, o
+    histórico de um paciente custa O(log k + resultado), onde k é o número de atendimentos do
+    paciente, inclusive nas consultas por período. Um `IndiceTemporal` sobre as entradas atende os
+    relatórios por período e risco de todos os atendimentos.
     """
     def __init__(self, paciente_repository: PacienteRepository):
         self.paciente_repository = paciente_repository
-        self.atendimentos: List[Atendimento] = []
+        self.arquivo = ArquivoAtendimentos()
+        self.abertos: Dict[int, Atendimento] = {}
+        self.linhas_abertas: Dict[int, int] = {}  # id(atendimento) -> linha
+        self.ja_abertas = bytearray()  # 1 nas linhas que já entraram na fila
+        self.por_paciente: Dict[int, array] = {}
+        self.indice_temporal = IndiceTemporal()
 
     def inserir(self, atendimento: Atendimento):
-        if self.paciente_repository.buscar(atendimento.paciente.cpf) == None:
+        if self.paciente_repository.buscar(atendimento.paciente.cpf) is None:
             raise PacienteNaoCadastradoError('Paciente não cadastrado')
+        linha = self._armazenar(atendimento)
+        self._indexar(atendimento, linha)
+
+    def abrir(self, atendimento: Atendimento) -> Optional[int]:
+        """
+        Abre um atendimento registrado que está entrando na fila: o objeto passa a ser mantido até
+        `encerrar`. Retorna a linha do atendimento no arquivo, ou None se ele não foi registrado.
+
+        A linha é a do primeiro atendimento registrado do paciente com a mesma entrada que ainda não
+        foi aberto, de preferência com o mesmo risco (que pode ter mudado desde o registro); em geral,
+        a última linha do paciente.
+        """
+        historico = self.por_paciente.get(int(atendimento.paciente.cpf), ())
+        entradas, entrada = self.arquivo.entradas, _microssegundos(atendimento.entrada)
+        escolhida, mesmo_risco = None, False
+        i = len(historico) - 1
+        if i >= 0 and entradas[historico[i]] != entrada:  # Caso comum: o último registrado do paciente
+            i = bisect_right(historico, entrada, key=entradas.__getitem__) - 1
+        while i >= 0 and entradas[historico[i]] == entrada:
+            linha = historico[i]
+            if not self.ja_abertas[linha]:
+                if self.arquivo.riscos[linha] == atendimento.risco.value:
+                    escolhida, mesmo_risco = linha, True
+                elif not mesmo_risco:
+                    escolhida = linha
+            i -= 1
+        if escolhida is None:
+            return None
+        self.ja_abertas[escolhida] = 1
+        self.abertos[escolhida] = atendimento
+        self.linhas_abertas[id(atendimento)] = escolhida
+        return escolhida
+
+    def abrir_lote(self, atendimentos: Iterable[Atendimento]):
+        for atendimento in atendimentos:
+            self.abrir(atendimento)
+
+    def encerrar(self, atendimento: Atendimento):
+        """
+        Encerra um atendimento aberto (chamado ou retirado da fila): o risco final é gravado na
+        linha do arquivo e o objeto deixa de ser mantido em memória. Atendimentos que não foram
+        abertos são ignorados.
+        """
+        linha = self.linhas_abertas.pop(id(atendimento), None)
+        if linha is not None:
+            anterior = self.arquivo.riscos[linha]
+            if anterior != atendimento.risco.value:
+                self.indice_temporal.reclassificar(self.arquivo.entradas[linha], anterior, atendimento.risco.value)
+                self.arquivo.riscos[linha] = atendimento.risco.value
+            del self.abertos[linha]
+
+    def tamanho(self) -> int:
+        return self.arquivo.tamanho()
+
+    def contagem_por_risco(self, inicio: Optional[datetime] = None,
+                           fim: Optional[datetime] = None) -> Dict[Risco, int]:
+        """
+        Retorna a quantidade de atendimentos de cada risco com entrada entre `inicio` e `fim`
+        (inclusive), pelo risco final dos atendimentos encerrados.
+        """
+        return self.indice_temporal.contar(inicio, fim)
+
+    def serie_por_risco(self, granularidade: str = 'hora', inicio: Optional[datetime] = None,
+                        fim: Optional[datetime] = None) -> Serie:
+        """
+        Retorna a quantidade de atendimentos de cada risco por hora ou por dia; ver
+        `IndiceTemporal.serie`.
+        """
+        return self.indice_temporal.serie(granularidade, inicio, fim)
+
+    def _armazenar(self, atendimento: Atendimento) -> int:
+        linha = self.arquivo.acrescentar(atendimento)
+        self.indice_temporal.adicionar(atendimento.risco.value, self.arquivo.entradas[linha])
+        self.ja_abertas.append(0)
+        return linha
+
+    def _indexar(self, atendimento: Atendimento, linha: int):
+        historico = self.por_paciente.get(int(atendimento.paciente.cpf))
+        if historico is None:
+            self.por_paciente[int(atendimento.paciente.cpf)] = array('Q', (linha,))
+        elif self.arquivo.entradas[historico[-1]] <= self.arquivo.entradas[linha]:
+            historico.append(linha)  # Caso comum: atendimentos chegam em ordem cronológica
         else:
-            self.atendimentos.append(atendimento)
+            insort_right(historico, linha, key=self.arquivo.entradas.__getitem__)
+
+    def historico_atendimentos(self, cpf: str, inicio: Optional[datetime] = None,
+                               fim: Optional[datetime] = None) -> List[Atendimento]:
+        """
+        Retorna os atendimentos do paciente em ordem cronológica, opcionalmente restritos às
+        entradas entre `inicio` e `fim` (inclusive).
+        """
+        paciente = self.paciente_repository.buscar(cpf)
+        if paciente is None:
+            raise PacienteNaoCadastradoError('Paciente não cadastrado')
+        return self._historico_periodo(paciente, inicio, fim)
 
-    def historico_atendimentos(self, cpf: str):
-        historico = []
-        if self.paciente_repository.buscar(cpf) == None:
+    def _historico_periodo(self, paciente: Paciente, inicio: Optional[datetime],
+                           fim: Optional[datetime]) -> List[Atendimento]:
+        historico = self.por_paciente.get(int(paciente.cpf), ())
+        entrada = self.arquivo.entradas.__getitem__
+        i = 0 if inicio is None else bisect_left(historico, _microssegundos(inicio), key=entrada)
+        j = len(historico) if fim is None else bisect_right(historico, _microssegundos(fim), key=entrada)
+        return [self.abertos.get(linha) or self.arquivo.atendimento(linha, paciente) for linha in historico[i:j]]
+
+    def pagina_historico(self, cpf: str, tamanho: int = TAMANHO_PAGINA, cursor: Optional[str] = None,
+                         recentes_primeiro: bool = False, inicio: Optional[datetime] = None,
+                         fim: Optional[datetime] = None) -> PaginaHistorico:
+        """
+        Retorna uma página com até `tamanho` atendimentos do paciente, em ordem cronológica ou dos
+        mais recentes para os mais antigos, opcionalmente restritos às entradas entre `inicio` e `fim`
+        (inclusive). A página seguinte começa após o `cursor` retornado pela anterior.
+
+        Apenas os atendimentos da página são recriados. O cursor guarda a entrada e a linha do último
+        atendimento retornado, então a paginação continua correta mesmo que novos atendimentos sejam
+        registrados entre uma página e outra.
+        """
+        validar_tamanho_pagina(tamanho)
+        paciente = self.paciente_repository.buscar(cpf)
+        if paciente is None:
             raise PacienteNaoCadastradoError('Paciente não cadastrado')
+        return self._pagina_historico(paciente, tamanho, cursor, recentes_primeiro, inicio, fim)
+
+    def _pagina_historico(self, paciente: Paciente, tamanho: int, cursor: Optional[str], recentes_primeiro: bool,
+                          inicio: Optional[datetime], fim: Optional[datetime]) -> PaginaHistorico:
+        # O histórico está ordenado por (entrada, linha): entradas iguais ficam na ordem de inclusão
+        historico = self.por_paciente.get(int(paciente.cpf), ())
+        entradas = self.arquivo.entradas
+        i = 0 if inicio is None else bisect_left(historico, _microssegundos(inicio), key=entradas.__getitem__)
+        j = len(historico) if fim is None else bisect_right(historico, _microssegundos(fim), key=entradas.__getitem__)
+        if cursor is not None:
+            ultimo = ler_cursor(cursor)
+            ordem = lambda linha: (entradas[linha], linha)
+            if recentes_primeiro:
+                j = min(j, bisect_left(historico, ultimo, key=ordem))
+            else:
+                i = max(i, bisect_right(historico, ultimo, key=ordem))
+        if recentes_primeiro:
+            linhas = historico[max(i, j - tamanho):j][::-1]
+            restantes = j - tamanho > i
         else:
-            for i in range(0, len(self.atendimentos) - 1):
-                if self.atendimentos[i].paciente.cpf == cpf:
-                    historico.append(self.atendimentos[i])
-            return historico
\ No newline at end of file
+            linhas = historico[i:min(j, i + tamanho)]
+            restantes = i + tamanho < j
+        atendimentos = [self.abertos.get(linha) or self.arquivo.atendimento(linha, paciente) for linha in linhas]
+        return PaginaHistorico(atendimentos, criar_cursor(entradas[linhas[-1]], linhas[-1]) if restantes else None)
+
+
+def _microssegundos(entrada: datetime) -> int:
+    return (entrada - _EPOCA) // _MICROSSEGUNDO
@@ -0,0 +1,420 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from main.analitico import Serie, largura_periodo
+from main.busca import VocabularioTrigramas, buscar_nome, palavras_nome
+from main.domain import Paciente, Atendimento, Risco, normalizar_cpf
+from main.paginacao import PaginaHistorico, criar_cursor, ler_cursor, validar_tamanho_pagina, TAMANHO_PAGINA
+
+from main.error import CPFDuplicadoError, PacienteNaoCadastradoError
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS pacientes (
+    cpf        TEXT PRIMARY KEY,
+    nome       TEXT NOT NULL,
+    email      TEXT NOT NULL,
+    nascimento TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pacientes_email ON pacientes (email COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS pacientes_nascimento ON pacientes (nascimento);
+CREATE TABLE IF NOT EXISTS pacientes_palavras (
+    palavra TEXT NOT NULL,
+    cpf     TEXT NOT NULL REFERENCES pacientes (cpf),
+    PRIMARY KEY (palavra, cpf)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS atendimentos (
+    id      INTEGER PRIMARY KEY,
+    cpf     TEXT NOT NULL REFERENCES pacientes (cpf),
+    risco   INTEGER NOT NULL,
+    entrada TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS atendimentos_cpf_entrada ON atendimentos (cpf, entrada);
+CREATE INDEX IF NOT EXISTS atendimentos_entrada ON atendimentos (entrada, risco);
+CREATE TABLE IF NOT EXISTS atendimentos_por_hora (
+    hora  TEXT NOT NULL,
+    risco INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    PRIMARY KEY (hora, risco)
+) WITHOUT ROWID;
+INSERT INTO atendimentos_por_hora (hora, risco, total)
+    SELECT substr(entrada, 1, 13), risco, COUNT(*) FROM atendimentos
+    WHERE NOT EXISTS (SELECT 1 FROM atendimentos_por_hora) GROUP BY 1, 2;
+CREATE TRIGGER IF NOT EXISTS atendimentos_por_hora_inserir AFTER INSERT ON atendimentos BEGIN
+    INSERT INTO atendimentos_por_hora (hora, risco, total) VALUES (substr(NEW.entrada, 1, 13), NEW.risco, 1)
+        ON CONFLICT (hora, risco) DO UPDATE SET total = total + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS atendimentos_por_hora_reclassificar AFTER UPDATE OF risco ON atendimentos
+WHEN OLD.risco != NEW.risco BEGIN
+    UPDATE atendimentos_por_hora SET total = total - 1 WHERE hora = substr(OLD.entrada, 1, 13) AND risco = OLD.risco;
+    INSERT INTO atendimentos_por_hora (hora, risco, total) VALUES (substr(NEW.entrada, 1, 13), NEW.risco, 1)
+        ON CONFLICT (hora, risco) DO UPDATE SET total = total + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS atendimentos_por_hora_excluir AFTER DELETE ON atendimentos BEGIN
+    UPDATE atendimentos_por_hora SET total = total - 1 WHERE hora = substr(OLD.entrada, 1, 13) AND risco = OLD.risco;
+END;
+"""
+
+# Tamanho do prefixo da entrada (texto ISO) que identifica cada período dos relatórios
+_PREFIXOS = {'hora': 13, 'dia': 10}
+_HORA = timedelta(hours=1)
+_EPOCA = datetime(1970, 1, 1)
+_MICROSSEGUNDO = timedelta(microseconds=1)
+
+
+class PoolConexoes:
+    """
+    Pequeno pool de conexões SQLite para um mesmo arquivo de banco de dados.
+
+    Cada conexão é configurada em modo WAL (leitores não bloqueiam o escritor) com sincronização
+    NORMAL, e mantém em cache os comandos SQL já compilados; como todos os comandos do repositório são
+    constantes e parametrizados, eles são preparados uma única vez por conexão.
+    """
+    def __init__(self, caminho: str, tamanho: int = 4):
+        self.caminho = caminho
+        self.conexoes: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(tamanho):
+            self.conexoes.put(self._conectar())
+        with self.conexao() as conexao:
+            conexao.executescript(ESQUEMA)
+
+    def _conectar(self) -> sqlite3.Connection:
+        conexao = sqlite3.connect(self.caminho, check_same_thread=False, isolation_level=None,
+                                  cached_statements=256)
+        conexao.execute('PRAGMA journal_mode=WAL')
+        conexao.execute('PRAGMA synchronous=NORMAL')
+        conexao.execute('PRAGMA foreign_keys=ON')
+        return conexao
+
+    @contextmanager
+    def conexao(self) -> Iterator[sqlite3.Connection]:
+        conexao = self.conexoes.get()
+        try:
+            yield conexao
+        finally:
+            self.conexoes.put(conexao)
+
+    @contextmanager
+    def transacao(self) -> Iterator[sqlite3.Connection]:
+        """
+        Executa um bloco de escritas em uma única transação (um único fsync ao final).
+        """
+        with self.conexao() as conexao:
+            conexao.execute('BEGIN IMMEDIATE')
+            try:
+                yield conexao
+            except BaseException:
+                conexao.execute('ROLLBACK')
+                raise
+            conexao.execute('COMMIT')
+
+    def fechar(self):
+        while not self.conexoes.empty():
+            self.conexoes.get().close()
+
+
+class PacienteRepositorySQLite:
+    """
+    Gerencia o armazenamento e recuperação de pacientes em um banco de dados SQLite, com a mesma
+    interface do `PacienteRepository` em memória.
+
+    Para a busca aproximada por nome, a tabela `pacientes_palavras` guarda as palavras normalizadas
+    do nome de cada paciente (chave primária palavra, CPF), e o vocabulário de palavras distintas é
+    carregado em um `VocabularioTrigramas` na primeira busca. Pacientes incluídos por outros processos
+    depois dessa carga são encontrados apenas pelas palavras já conhecidas.
+    """
+    def __init__(self, pool: PoolConexoes):
+        self.pool = pool
+        self.vocabulario: Optional[VocabularioTrigramas] = None
+        self.lock_vocabulario = threading.Lock()
+        self._indexar_nomes_existentes()
+
+    def _indexar_nomes_existentes(self):
+        # Bancos criados antes da tabela de palavras: indexa os nomes dos pacientes já cadastrados
+        with self.pool.conexao() as conexao:
+            pendente = conexao.execute('SELECT EXISTS (SELECT 1 FROM pacientes) '
+                                       'AND NOT EXISTS (SELECT 1 FROM pacientes_palavras)').fetchone()[0]
+        if pendente:
+            with self.pool.transacao() as conexao:
+                pacientes = conexao.execute('SELECT nome, cpf FROM pacientes').fetchall()
+                conexao.executemany('INSERT INTO pacientes_palavras (palavra, cpf) VALUES (?, ?)',
+                                    (linha for nome, cpf in pacientes for linha in _linhas_palavras(nome, cpf)))
+
+    def inserir(self, paciente: Paciente):
+        try:
+            with self.pool.transacao() as conexao:
+                conexao.execute('INSERT INTO pacientes (cpf, nome, email, nascimento) VALUES (?, ?, ?, ?)',
+                                _linha_paciente(paciente))
+                conexao.executemany('INSERT INTO pacientes_palavras (palavra, cpf) VALUES (?, ?)',
+                                    _linhas_palavras(paciente.nome, paciente.cpf))
+        except sqlite3.IntegrityError:
+            raise CPFDuplicadoError('CPF já cadastrado no sistema.')
+        self._atualizar_vocabulario([paciente])
+
+    def inserir_lote(self, pacientes: Iterable[Paciente]):
+        """
+        Insere vários pacientes em uma única transação. Se algum CPF já estiver cadastrado, nenhum
+        paciente do lote é inserido.
+        """
+        pacientes = list(pacientes)
+        try:
+            with self.pool.transacao() as conexao:
+                conexao.executemany('INSERT INTO pacientes (cpf, nome, email, nascimento) VALUES (?, ?, ?, ?)',
+                                    map(_linha_paciente, pacientes))
+                conexao.executemany('INSERT INTO pacientes_palavras (palavra, cpf) VALUES (?, ?)',
+                                    (linha for p in pacientes for linha in _linhas_palavras(p.nome, p.cpf)))
+        except sqlite3.IntegrityError:
+            raise CPFDuplicadoError('CPF já cadastrado no sistema.')
+        self._atualizar_vocabulario(pacientes)
+
+    def atualizar(self, paciente: Paciente):
+        with self.pool.transacao() as conexao:
+            cursor = conexao.execute('UPDATE pacientes SET nome = ?, email = ?, nascimento = ? WHERE cpf = ?',
+                                     (paciente.nome, paciente.email, paciente.nascimento, paciente.cpf))
+            if cursor.rowcount:
+                conexao.execute('DELETE FROM pacientes_palavras WHERE cpf = ?', (paciente.cpf,))
+                conexao.executemany('INSERT INTO pacientes_palavras (palavra, cpf) VALUES (?, ?)',
+                                    _linhas_palavras(paciente.nome, paciente.cpf))
+        if cursor.rowcount == 0:
+            raise PacienteNaoCadastradoError('Paciente não cadastrado')
+        self._atualizar_vocabulario([paciente])
+
+    def buscar_por_nome(self, nome: str, limite: int = 10) -> List[Tuple[Paciente, float]]:
+        """
+        Busca aproximada por nome; ver `PacienteRepository.buscar_por_nome`. As palavras semelhantes às
+        da consulta são encontradas no vocabulário em memória, e os pacientes de cada combinação de
+        palavras pela intersecção das suas linhas em `pacientes_palavras`, com LIMIT.
+        """
+        resultado = buscar_nome(nome, self._vocabulario(), self._intersecao, limite)
+        return [(self.buscar(f"{chave:011d}"), valor) for chave, valor in resultado]
+
+    def _intersecao(self, palavras: Sequence[str], quantidade: int, vistos: Set[int]) -> List[int]:
+        consulta = ' INTERSECT '.join(['SELECT cpf FROM pacientes_palavras WHERE palavra = ?'] * len(palavras))
+        with self.pool.conexao() as conexao:
+            linhas = conexao.execute(f'{consulta} ORDER BY cpf LIMIT ?', (*palavras, quantidade + len(vistos)))
+            chaves = [int(cpf) for cpf, in linhas]
+        return [chave for chave in chaves if chave not in vistos][:quantidade]
+
+    def _vocabulario(self) -> VocabularioTrigramas:
+        with self.lock_vocabulario:
+            if self.vocabulario is None:
+                vocabulario = VocabularioTrigramas()
+                with self.pool.conexao() as conexao:
+                    for palavra, in conexao.execute('SELECT DISTINCT palavra FROM pacientes_palavras'):
+                        vocabulario.adicionar(palavra)
+                self.vocabulario = vocabulario
+            return self.vocabulario
+
+    def _atualizar_vocabulario(self, pacientes: List[Paciente]):
+        with self.lock_vocabulario:
+            if self.vocabulario is not None:
+                for paciente in pacientes:
+                    for palavra in palavras_nome(paciente.nome):
+                        self.vocabulario.adicionar(palavra)
+
+    def buscar(self, cpf: str) -> Optional[Paciente]:
+        with self.pool.conexao() as conexao:
+            linha = conexao.execute('SELECT nome, cpf, email, nascimento FROM pacientes WHERE cpf = ?',
+                                    (normalizar_cpf(cpf),)).fetchone()
+        return Paciente.de_dados_validados(*linha) if linha else None
+
+    def existentes(self, cpfs: Iterable[str]) -> Set[str]:
+        """
+        Retorna, entre os CPFs (normalizados) informados, os que já estão cadastrados, consultando-os
+        em blocos de até 500 por comando.
+        """
+        cpfs = list(cpfs)
+        encontrados: Set[str] = set()
+        with self.pool.conexao() as conexao:
+            for i in range(0, len(cpfs), 500):
+                bloco = cpfs[i:i + 500]
+                consulta = f"SELECT cpf FROM pacientes WHERE cpf IN ({','.join('?' * len(bloco))})"
+                encontrados.update(cpf for cpf, in conexao.execute(consulta, bloco))
+        return encontrados
+
+    def buscar_por_email(self, email: str) -> List[Paciente]:
+        with self.pool.conexao() as conexao:
+            linhas = conexao.execute('SELECT nome, cpf, email, nascimento FROM pacientes '
+                                     'WHERE email = ? COLLATE NOCASE ORDER BY rowid', (email,)).fetchall()
+        return [Paciente.de_dados_validados(*linha) for linha in linhas]
+
+    def buscar_por_nascimento(self, nascimento: str) -> List[Paciente]:
+        with self.pool.conexao() as conexao:
+            linhas = conexao.execute('SELECT nome, cpf, email, nascimento FROM pacientes '
+                                     'WHERE nascimento = ? ORDER BY rowid', (nascimento,)).fetchall()
+        return [Paciente.de_dados_validados(*linha) for linha in linhas]
+
+    def tamanho(self) -> int:
+        with self.pool.conexao() as conexao:
+            return conexao.execute('SELECT COUNT(*) FROM pacientes').fetchone()[0]
+
+
+class AtendimentoRepositorySQLite:
+    """
+    Gerencia o armazenamento e recuperação de atendimentos em um banco de dados SQLite, com a mesma
+    interface do `AtendimentoRepository` em memória. O índice (cpf, entrada) atende o histórico de um
+    paciente, inclusive por período, sem percorrer a tabela.
+
+    Para os relatórios por período, gatilhos mantêm a tabela `atendimentos_por_hora` com a quantidade
+    de atendimentos de cada risco em cada hora. As horas inteiras de um intervalo são somadas nessa
+    tabela; apenas as horas incompletas das bordas são contadas nos atendimentos, pelo índice de entrada.
+    """
+    def __init__(self, paciente_repository: PacienteRepositorySQLite):
+        self.paciente_repository = paciente_repository
+        self.pool = paciente_repository.pool
+
+    def inserir(self, atendimento: Atendimento):
+        try:
+            with self.pool.transacao() as conexao:
+                conexao.execute('INSERT INTO atendimentos (cpf, risco, entrada) VALUES (?, ?, ?)',
+                                _linha_atendimento(atendimento))
+        except sqlite3.IntegrityError:
+            raise PacienteNaoCadastradoError('Paciente não cadastrado')
+
+    def inserir_lote(self, atendimentos: Iterable[Atendimento]):
+        try:
+            with self.pool.transacao() as conexao:
+                conexao.executemany('INSERT INTO atendimentos (cpf, risco, entrada) VALUES (?, ?, ?)',
+                                    map(_linha_atendimento, atendimentos))
+        except sqlite3.IntegrityError:
+            raise PacienteNaoCadastradoError('Paciente não cadastrado')
+
+    def abrir(self, atendimento: Atendimento):
+        """
+        Nada a fazer: o atendimento é localizado pelo CPF e pela entrada ao ser encerrado.
+        """
+
+    def abrir_lote(self, atendimentos: Iterable[Atendimento]):
+        pass
+
+    def encerrar(self, atendimento: Atendimento):
+        """
+        Grava o risco final de um atendimento encerrado (que pode ter sido reclassificado na fila).
+        """
+        with self.pool.transacao() as conexao:
+            conexao.execute('UPDATE atendimentos SET risco = ? WHERE cpf = ? AND entrada = ?',
+                            (atendimento.risco.value, atendimento.paciente.cpf, _texto_entrada(atendimento.entrada)))
+
+    def historico_atendimentos(self, cpf: str, inicio: Optional[datetime] = None,
+                               fim: Optional[datetime] = None) -> List[Atendimento]:
+        """
+        Retorna os atendimentos do paciente em ordem cronológica, opcionalmente restritos às
+        entradas entre `inicio` e `fim` (inclusive).
+        """
+        paciente = self.paciente_repository.buscar(cpf)
+        if paciente is None:
+            raise PacienteNaoCadastradoError('Paciente não cadastrado')
+        with self.pool.conexao() as conexao:
+            linhas = conexao.execute(
+                'SELECT risco, entrada FROM atendimentos WHERE cpf = ? AND entrada >= ? AND entrada <= ? '
+                'ORDER BY entrada, id',
+                (paciente.cpf, _texto_entrada(inicio) if inicio else '', _texto_entrada(fim) if fim else '~'),
+            ).fetchall()
+        return [Atendimento(paciente, Risco(risco), datetime.fromisoformat(entrada)) for risco, entrada in linhas]
+
+    def pagina_historico(self, cpf: str, tamanho: int = TAMANHO_PAGINA, cursor: Optional[str] = None,
+                         recentes_primeiro: bool = False, inicio: Optional[datetime] = None,
+                         fim: Optional[datetime] = None) -> PaginaHistorico:
+        """
+        Retorna uma página com até `tamanho` atendimentos do paciente; ver
+        `AtendimentoRepository.pagina_historico`. A página é lida pelo índice (cpf, entrada) a partir
+        do cursor, com LIMIT, sem contar nem pular os atendimentos das páginas anteriores.
+        """
+        validar_tamanho_pagina(tamanho)
+        paciente = self.paciente_repository.buscar(cpf)
+        if paciente is None:
+            raise PacienteNaoCadastradoError('Paciente não cadastrado')
+        parametros = [paciente.cpf, _texto_entrada(inicio) if inicio else '', _texto_entrada(fim) if fim else '~']
+        if cursor is None:
+            continuacao = ''
+        else:
+            entrada, id_ = ler_cursor(cursor)
+            continuacao = 'AND (entrada, id) < (?, ?) ' if recentes_primeiro else 'AND (entrada, id) > (?, ?) '
+            parametros += [_texto_entrada(_EPOCA + timedelta(microseconds=entrada)), id_]
+        ordem = 'DESC' if recentes_primeiro else 'ASC'
+        with self.pool.conexao() as conexao:
+            linhas = conexao.execute(
+                f'SELECT id, risco, entrada FROM atendimentos WHERE cpf = ? AND entrada >= ? AND entrada <= ? '
+                f'{continuacao}ORDER BY entrada {ordem}, id {ordem} LIMIT ?',
+                parametros + [tamanho + 1],
+            ).fetchall()
+        atendimentos = [Atendimento(paciente, Risco(risco), datetime.fromisoformat(entrada))
+                        for _, risco, entrada in linhas[:tamanho]]
+        if len(linhas) <= tamanho:
+            return PaginaHistorico(atendimentos)
+        ultimo = atendimentos[-1]
+        return PaginaHistorico(atendimentos, criar_cursor((ultimo.entrada - _EPOCA) // _MICROSSEGUNDO, linhas[tamanho - 1][0]))
+
+    def contagem_por_risco(self, inicio: Optional[datetime] = None,
+                           fim: Optional[datetime] = None) -> Dict[Risco, int]:
+        """
+        Retorna a quantidade de atendimentos de cada risco com entrada entre `inicio` e `fim`
+        (inclusive), pelo risco final dos atendimentos encerrados.
+        """
+        contagens = self._agrupar(0, inicio, fim).get('', {})
+        return {risco: contagens.get(risco, 0) for risco in Risco}
+
+    def serie_por_risco(self, granularidade: str = 'hora', inicio: Optional[datetime] = None,
+                        fim: Optional[datetime] = None) -> Serie:
+        """
+        Retorna, em ordem cronológica, os períodos (horas ou dias) com algum atendimento entre `inicio`
+        e `fim` (inclusive) e a quantidade de atendimentos de cada risco em cada um.
+        """
+        largura_periodo(granularidade)
+        periodos = self._agrupar(_PREFIXOS[granularidade], inicio, fim)
+        return [(datetime.fromisoformat(periodo), {risco: periodos[periodo].get(risco, 0) for risco in Risco})
+                for periodo in sorted(periodos) if any(periodos[periodo].values())]
+
+    def _agrupar(self, prefixo: int, inicio: Optional[datetime],
+                 fim: Optional[datetime]) -> Dict[str, Dict[Risco, int]]:
+        # Horas inteiras do intervalo: de `primeira` (inclusive) a `ultima` (exclusive)
+        primeira = None if inicio is None else _truncar_hora(inicio - _MICROSSEGUNDO) + _HORA
+        ultima = None if fim is None else _truncar_hora(fim + _MICROSSEGUNDO)
+        consultas: List[Tuple[str, tuple]] = []
+        if primeira is not None and ultima is not None and primeira >= ultima:
+            consultas.append((_CONTAR_ATENDIMENTOS, (prefixo, _texto_entrada(inicio), _texto_entrada(fim))))
+        else:
+            consultas.append((_SOMAR_HORAS, (prefixo, _texto_entrada(primeira)[:13] if primeira else '',
+                                             _texto_entrada(ultima)[:13] if ultima else '~')))
+            if primeira is not None and inicio < primeira:
+                consultas.append((_CONTAR_ATENDIMENTOS, (prefixo, _texto_entrada(inicio),
+                                                         _texto_entrada(primeira - _MICROSSEGUNDO))))
+            if ultima is not None and ultima <= fim:
+                consultas.append((_CONTAR_ATENDIMENTOS, (prefixo, _texto_entrada(ultima), _texto_entrada(fim))))
+        periodos: Dict[str, Dict[Risco, int]] = {}
+        with self.pool.conexao() as conexao:
+            for consulta, parametros in consultas:
+                for periodo, risco, total in conexao.execute(consulta, parametros):
+                    contagens = periodos.setdefault(periodo, {})
+                    contagens[Risco(risco)] = contagens.get(Risco(risco), 0) + total
+        return periodos
+
+
+_SOMAR_HORAS = ('SELECT substr(hora, 1, ?1), risco, SUM(total) FROM atendimentos_por_hora '
+                'WHERE hora >= ?2 AND hora < ?3 GROUP BY 1, 2')
+_CONTAR_ATENDIMENTOS = ('SELECT substr(entrada, 1, ?1), risco, COUNT(*) FROM atendimentos '
+                        'WHERE entrada >= ?2 AND entrada <= ?3 GROUP BY 1, 2')
+
+
+def _truncar_hora(instante: datetime) -> datetime:
+    return instante.replace(minute=0, second=0, microsecond=0)
+
+
+def _linha_paciente(paciente: Paciente) -> tuple:
+    return (paciente.cpf, paciente.nome, paciente.email, paciente.nascimento)
+
+
+def _linhas_palavras(nome: str, cpf: str) -> List[tuple]:
+    return [(palavra, cpf) for palavra in palavras_nome(nome)]
+
+
+def _linha_atendimento(atendimento: Atendimento) -> tuple:
+    return (atendimento.paciente.cpf, atendimento.risco.value, _texto_entrada(atendimento.entrada))
+
+
+def _texto_entrada(entrada: datetime) -> str:
+    # Largura fixa, para que a ordem do texto seja a ordem cronológica
+    return entrada.isoformat(timespec='microseconds')
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from main.domain import Paciente, Atendimento, Risco
+
+
+def paciente_para_dict(paciente: Paciente) -> dict:
+    return {
+        'nome': paciente.nome,
+        'cpf': paciente.cpf,
+        'email': paciente.email,
+        'nascimento': paciente.nascimento,
+    }
+
+
+def paciente_de_dict(dados: dict) -> Paciente:
+    return Paciente(dados['nome'], dados['cpf'], dados['email'], dados['nascimento'])
+
+
+def atendimento_para_dict(atendimento: Atendimento) -> dict:
+    return {
+        'paciente': paciente_para_dict(atendimento.paciente),
+        'risco': atendimento.risco.name,
+        'entrada': atendimento.entrada.isoformat(),
+    }
+
+
+def atendimento_de_dict(dados: dict) -> Atendimento:
+    return Atendimento(paciente_de_dict(dados['paciente']), Risco[dados['risco']],
+                       datetime.fromisoformat(dados['entrada']))
+
+
+def evento_para_dict(evento) -> dict:
+    return {
+        'sequencia': evento.sequencia,
+        'tipo': evento.tipo,
+        'atendimento': atendimento_para_dict(evento.atendimento),
+        'risco': evento.risco.name,
+        'instante': evento.instante.isoformat(),
+        'tamanhos': dict(zip((risco.name for risco in Risco), evento.tamanhos)),
+    }
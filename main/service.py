@@ -1,46 +1,186 @@
-from typing import List
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from main.domain import *
+from main.analitico import Serie
+from main.cache import EstatisticasCache, PacienteRepositoryCache
+from main.espera import TemposEspera
+from main.eventos import AssinaturaFila, AssinaturaFilaAsync, CAPACIDADE_FEED, FeedFila
+from main.triagem import MotorTriagem
+from main.paginacao import PaginaHistorico, TAMANHO_PAGINA
 from main.repository import PacienteRepository, AtendimentoRepository
 
+if TYPE_CHECKING:
+    from main.importacao import ResultadoImportacao
+
 
 class ProntoSocorroService:
     """
     Serviço principal do pronto-socorro, responsável por coordenar as operações do sistema.
+
+    O `relogio` informa o horário de entrada dos atendimentos e de chamada dos pacientes (por padrão,
+    o horário atual); os tempos de espera de cada paciente chamado alimentam `tempos_espera`.
     """
-    def __init__(self, pacientes: PacienteRepository, atendimentos: AtendimentoRepository):
+    def __init__(self, pacientes: PacienteRepository, atendimentos: AtendimentoRepository,
+                 fila_atendimento: Optional[FilaAtendimento] = None,
+                 relogio: Callable[[], datetime] = datetime.now, triagem: Optional[MotorTriagem] = None):
         self.pacientes = pacientes
         self.atendimentos = atendimentos
-        self.fila_atendimento = FilaAtendimento()
+        self.fila_atendimento = fila_atendimento if fila_atendimento is not None else FilaAtendimento()
+        self.relogio = relogio
+        self.triagem = triagem if triagem is not None else MotorTriagem()
+        self.tempos_espera = TemposEspera()
+        self.metricas = None  # Ver `main.metricas.instrumentar`
 
     def registrar_paciente(self, nome, cpf, email, nascimento):
         paciente = Paciente(nome, cpf, email, nascimento)
         self.pacientes.inserir(paciente)
         return paciente
 
+    def atualizar_paciente(self, nome, cpf, email, nascimento) -> Paciente:
+        """
+        Atualiza o nome, o e-mail e a data de nascimento do paciente cadastrado com o CPF informado.
+        """
+        paciente = Paciente(nome, cpf, email, nascimento)
+        self.pacientes.atualizar(paciente)
+        return paciente
+
+    def buscar_pacientes_por_nome(self, nome: str, limite: int = 10) -> List[Tuple[Paciente, float]]:
+        """
+        Busca aproximada de pacientes pelo nome, sem diferenciar acentos e maiúsculas e tolerante a
+        erros de digitação. Retorna até `limite` pacientes com a semelhança do nome (de 0 a 1), dos mais
+        semelhantes aos menos; ver `main.busca`.
+        """
+        return self.pacientes.buscar_por_nome(nome, limite)
+
+    def importar_pacientes(self, caminho: str, relatorio: Optional[str] = None,
+                           tamanho_lote: int = 1000) -> 'ResultadoImportacao':
+        """
+        Importa pacientes de um arquivo CSV ou JSONL em lotes; ver `main.importacao`.
+        """
+        from main.importacao import importar_pacientes, ler_arquivo
+        return importar_pacientes(self.pacientes, ler_arquivo(caminho), relatorio, tamanho_lote)
+
     def classificar_risco(self, ficha: FichaAnalise) -> Risco:
-        if ficha.risco_morte:
-            return Risco.VERMELHO
-        if ficha.gravidade_alta:
-            return Risco.AMARELO
-        if ficha.gravidade_moderada:
-            return Risco.LARANJA
-        if ficha.gravidade_baixa:
-            return Risco.VERDE
-        else:
-            return Risco.AZUL
+        return self.triagem.classificar(ficha)
+
+    def classificar_lote(self, fichas: Iterable[FichaAnalise]) -> List[Risco]:
+        """
+        Classifica o risco de várias fichas de uma vez; ver `main.triagem.MotorTriagem`.
+        """
+        return self.triagem.classificar_lote(fichas)
 
     def registrar_atendimento(self, paciente: Paciente, risco: Risco) -> Atendimento:
-        atendimento = Atendimento(paciente, risco)
+        atendimento = Atendimento(paciente, risco, self.relogio())
         self.atendimentos.inserir(atendimento)
         return atendimento
 
-    def inserir_fila_atendimento(self, atendimento: Atendimento) -> bool:
-        self.fila_atendimento.inserir(atendimento)
-        return True
+    def inserir_fila_atendimento(self, atendimento: Atendimento) -> EntradaFila:
+        self.atendimentos.abrir(atendimento)
+        return self.fila_atendimento.inserir(atendimento)
+
+    def inserir_fila_lote(self, atendimentos: Iterable[Atendimento]) -> List[EntradaFila]:
+        """
+        Insere vários atendimentos na fila de uma vez, na ordem informada; ver `FilaAtendimento.inserir_lote`.
+        """
+        atendimentos = list(atendimentos)
+        self.atendimentos.abrir_lote(atendimentos)
+        return self.fila_atendimento.inserir_lote(atendimentos)
+
+    def reclassificar(self, entrada: EntradaFila, novo_risco: Risco):
+        self.fila_atendimento.reclassificar(entrada, novo_risco)
+
+    def remover_da_fila(self, entrada: EntradaFila) -> Atendimento:
+        atendimento = self.fila_atendimento.remover(entrada)
+        self.atendimentos.encerrar(atendimento)
+        return atendimento
 
     def chamar_proximo(self) -> Atendimento:
-        return self.fila_atendimento.proximo()
+        atendimento = self.fila_atendimento.proximo()
+        agora = self.relogio()
+        self.tempos_espera.registrar(atendimento.risco, agora - atendimento.entrada, agora)
+        self.atendimentos.encerrar(atendimento)
+        return atendimento
+
+    def chamar_proximos(self, quantidade: int) -> List[Atendimento]:
+        """
+        Chama os próximos `quantidade` pacientes da fila de uma só vez (ex.: na troca de plantão),
+        em ordem de prioridade e de chegada; retorna menos pacientes se a fila tiver menos.
+        """
+        atendimentos = self.fila_atendimento.proximos(quantidade)
+        agora = self.relogio()
+        for atendimento in atendimentos:
+            self.tempos_espera.registrar(atendimento.risco, agora - atendimento.entrada, agora)
+            self.atendimentos.encerrar(atendimento)
+        return atendimentos
+
+    def feed_fila(self, capacidade: int = CAPACIDADE_FEED) -> FeedFila:
+        """
+        Retorna o feed de alterações da fila de atendimento (inserções, chamadas, reclassificações e
+        remoções), criando-o na primeira chamada com a capacidade informada; ver `main.eventos`. Sem
+        feed, a fila não publica eventos e não tem nenhum custo adicional.
+        """
+        if self.fila_atendimento.feed is None:
+            self.fila_atendimento.feed = FeedFila(capacidade, self.relogio)
+        return self.fila_atendimento.feed
+
+    def assinar_fila(self, desde: Optional[int] = None) -> AssinaturaFila:
+        return self.feed_fila().assinar(desde)
+
+    def assinar_fila_async(self, desde: Optional[int] = None) -> AssinaturaFilaAsync:
+        return self.feed_fila().assinar_async(desde)
+
+    def percentis_espera(self, janela: Optional[str] = None) -> Dict[Risco, Dict[float, Optional[timedelta]]]:
+        """
+        Percentis (p50, p90 e p99) do tempo de espera dos pacientes chamados, por risco: desde o
+        início ou na janela informada ('hora', 'plantao' ou 'dia') até agora. Ver `main.espera`.
+        """
+        instante = self.relogio() if janela is not None else None
+        return self.tempos_espera.percentis(janela, instante)
+
+    def estatisticas_cache(self) -> Optional[EstatisticasCache]:
+        """
+        Estatísticas do cache de pacientes (ver `main.cache`), ou None se o repositório não tem cache.
+        """
+        return self.pacientes.estatisticas if isinstance(self.pacientes, PacienteRepositoryCache) else None
+
+    def contar_atendimentos(self, inicio: Optional[datetime] = None,
+                            fim: Optional[datetime] = None) -> Dict[Risco, int]:
+        """
+        Quantidade de atendimentos de cada risco com entrada entre `inicio` e `fim` (inclusive).
+        """
+        return self.atendimentos.contagem_por_risco(inicio, fim)
+
+    def relatorio_atendimentos(self, granularidade: str = 'hora', inicio: Optional[datetime] = None,
+                               fim: Optional[datetime] = None) -> Serie:
+        """
+        Quantidade de atendimentos de cada risco por hora ou por dia ('hora' ou 'dia'), apenas nos
+        períodos com algum atendimento entre `inicio` e `fim` (inclusive). Ver `main.analitico`.
+        """
+        return self.atendimentos.serie_por_risco(granularidade, inicio, fim)
+
+    def buscar_historico(self, paciente: Paciente, inicio: Optional[datetime] = None,
+                         fim: Optional[datetime] = None) -> List[Atendimento]:
+        return self.atendimentos.historico_atendimentos(paciente.cpf, inicio, fim)
+
+    def pagina_historico(self, paciente: Paciente, tamanho: int = TAMANHO_PAGINA, cursor: Optional[str] = None,
+                         recentes_primeiro: bool = False, inicio: Optional[datetime] = None,
+                         fim: Optional[datetime] = None) -> PaginaHistorico:
+        """
+        Retorna uma página do histórico do paciente; a página seguinte é pedida com o `cursor` da
+        anterior. Ver `AtendimentoRepository.pagina_historico`.
+        """
+        return self.atendimentos.pagina_historico(paciente.cpf, tamanho, cursor, recentes_primeiro, inicio, fim)
 
-    def buscar_historico(self, paciente: Paciente) -> List[Atendimento]:
-        return self.atendimentos.historico_atendimentos(paciente.cpf)
\ No newline at end of file
+    def iterar_historico(self, paciente: Paciente, recentes_primeiro: bool = False, inicio: Optional[datetime] = None,
+                         fim: Optional[datetime] = None, tamanho_pagina: int = 100) -> Iterator[Atendimento]:
+        """
+        Percorre o histórico do paciente sob demanda, buscando uma página de cada vez no repositório.
+        """
+        cursor = None
+        while True:
+            pagina = self.pagina_historico(paciente, tamanho_pagina, cursor, recentes_primeiro, inicio, fim)
+            yield from pagina.atendimentos
+            cursor = pagina.cursor
+            if cursor is None:
+                return
@@ -0,0 +1,111 @@
+"""
+Servidor asyncio que expõe as operações do `ProntoSocorroService` por um protocolo de linhas JSON.
+
+Uso: python -m main.servidor [--host 127.0.0.1] [--porta 8765] [--unix CAMINHO]
+"""
+import argparse
+import asyncio
+import json
+from typing import Optional
+
+from main.protocolo import Protocolo
+from main.service import ProntoSocorroService
+
+# Tamanho máximo de uma linha de requisição, em bytes
+TAMANHO_MAXIMO_LINHA = 64 * 1024
+
+
+class ServidorPS:
+    """
+    Servidor de linhas JSON para o pronto-socorro: cada linha recebida é uma requisição (ver
+    `main.protocolo.Protocolo`) e cada resposta é enviada em uma linha, na mesma ordem.
+
+    As operações do serviço são rápidas e executadas no próprio laço de eventos, portanto nunca
+    concorrem entre si. A contrapressão é feita por conexão: o servidor só lê a próxima requisição
+    depois que a resposta anterior foi escoada para o cliente (`drain`), e o número de conexões
+    simultâneas é limitado por um semáforo; conexões excedentes aguardam a sua vez.
+    """
+    def __init__(self, ps_service: ProntoSocorroService, max_conexoes: int = 10_000):
+        self.protocolo = Protocolo(ps_service)
+        self.vagas = asyncio.Semaphore(max_conexoes)
+        self.servidor: Optional[asyncio.AbstractServer] = None
+        self.conexoes = 0
+
+    async def iniciar(self, host: str = '127.0.0.1', porta: int = 8765, caminho_unix: Optional[str] = None):
+        if caminho_unix is not None:
+            self.servidor = await asyncio.start_unix_server(self.atender, caminho_unix, limit=TAMANHO_MAXIMO_LINHA)
+        else:
+            self.servidor = await asyncio.start_server(self.atender, host, porta, limit=TAMANHO_MAXIMO_LINHA,
+                                                       backlog=4096)
+        return self.servidor
+
+    async def encerrar(self):
+        if self.servidor is not None:
+            self.servidor.close()
+            await self.servidor.wait_closed()
+
+    async def atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        async with self.vagas:
+            self.conexoes += 1
+            try:
+                await self._processar(reader, writer)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                pass
+            finally:
+                self.conexoes -= 1
+                writer.close()
+
+    async def _processar(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        while True:
+            try:
+                linha = await reader.readline()
+            except ValueError:
+                # Linha maior que o limite: responde com erro e encerra a conexão
+                writer.write(_codificar({'ok': False, 'erro': 'Requisição muito grande.'}))
+                await writer.drain()
+                return
+            if not linha:
+                return
+            if not linha.strip():
+                continue
+            try:
+                resposta = self.protocolo.executar(json.loads(linha))
+            except json.JSONDecodeError:
+                resposta = {'ok': False, 'erro': 'JSON inválido.'}
+            except UnicodeDecodeError:
+                resposta = {'ok': False, 'erro': 'Requisição não está em UTF-8.'}
+            writer.write(_codificar(resposta))
+            await writer.drain()
+
+
+def _codificar(resposta: dict) -> bytes:
+    return json.dumps(resposta, ensure_ascii=False).encode() + b'\n'
+
+
+async def servir(ps_service: ProntoSocorroService, host: str = '127.0.0.1', porta: int = 8765,
+                 caminho_unix: Optional[str] = None):
+    servidor = ServidorPS(ps_service)
+    await servidor.iniciar(host, porta, caminho_unix)
+    async with servidor.servidor:
+        await servidor.servidor.serve_forever()
+
+
+def main():
+    from main.repository import PacienteRepository, AtendimentoRepository
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--unix', help='caminho de um socket Unix, no lugar de TCP')
+    args = parser.parse_args()
+
+    paciente_repo = PacienteRepository()
+    ps_service = ProntoSocorroService(paciente_repo, AtendimentoRepository(paciente_repo))
+    try:
+        asyncio.run(servir(ps_service, args.host, args.porta, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+"""
+Simulação de eventos discretos de um plantão do pronto-socorro, para planejamento de capacidade.
+
+Uso: python -m main.simulacao [--horas 12] [--medicos 4] [--chegadas 10 | --chegadas-por-hora T0 ... T23]
+                              [--motor baldes|heap|prazo] [--semente 42]
+"""
+import argparse
+import heapq
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+from main.domain import FilaAtendimento, Risco, METAS_MANCHESTER
+from main.error import ValidacaoError
+from main.fila import MotorFilaHeap
+from main.repository import PacienteRepository, AtendimentoRepository
+from main.service import ProntoSocorroService
+from main.validacao import gerar_cpf
+
+# Proporção de pacientes em cada nível de risco
+MIX_RISCO: Dict[Risco, float] = {
+    Risco.VERMELHO: 0.01,
+    Risco.LARANJA: 0.09,
+    Risco.AMARELO: 0.30,
+    Risco.VERDE: 0.45,
+    Risco.AZUL: 0.15,
+}
+
+# Duração média de um atendimento médico (minutos) em cada nível de risco
+ATENDIMENTO_MEDIO: Dict[Risco, float] = {
+    Risco.VERMELHO: 60,
+    Risco.LARANJA: 40,
+    Risco.AMARELO: 25,
+    Risco.VERDE: 15,
+    Risco.AZUL: 10,
+}
+
+MOTORES = ('baldes', 'heap', 'prazo')
+
+# Tipos de evento
+_CHEGADA = 0
+_FIM_ATENDIMENTO = 1
+
+
+class RelogioVirtual:
+    """
+    Relógio da simulação: o horário avança apenas quando o simulador processa um evento.
+    """
+    def __init__(self, inicio: datetime):
+        self.inicio = inicio
+        self.segundos = 0.0
+
+    def __call__(self) -> datetime:
+        return self.inicio + timedelta(seconds=self.segundos)
+
+
+def duracao_lognormal(medias: Dict[Risco, float] = ATENDIMENTO_MEDIO, sigma: float = 0.5):
+    """
+    Duração de atendimento (em minutos) com distribuição lognormal, com a média informada por risco.
+    """
+    mus = {risco: math.log(media) - sigma ** 2 / 2 for risco, media in medias.items()}
+
+    def duracao(rnd: random.Random, risco: Risco) -> float:
+        return rnd.lognormvariate(mus[risco], sigma)
+    return duracao
+
+
+@dataclass
+class ResultadoSimulacao:
+    """
+    Estatísticas de uma simulação.
+
+    Attributes:
+        chegadas: Atendimentos registrados durante a simulação.
+        atendidos: Pacientes chamados por um médico.
+        aguardando: Pacientes ainda na fila ao final.
+        eventos: Eventos processados (chegadas e fins de atendimento).
+        segundos: Tempo real gasto na simulação.
+        fila_media: Tamanho médio da fila, ponderado pelo tempo.
+        fila_maxima: Maior tamanho da fila.
+        ocupacao: Fração do tempo em que os médicos estiveram atendendo.
+        espera_media: Espera média (da entrada até a chamada) por risco.
+        dentro_da_meta: Fração dos pacientes de cada risco chamados dentro da meta de Manchester.
+        percentis: p50, p90 e p99 da espera por risco (ver `ProntoSocorroService.percentis_espera`).
+    """
+    chegadas: int = 0
+    atendidos: int = 0
+    aguardando: int = 0
+    eventos: int = 0
+    segundos: float = 0.0
+    fila_media: float = 0.0
+    fila_maxima: int = 0
+    ocupacao: float = 0.0
+    espera_media: Dict[Risco, Optional[timedelta]] = field(default_factory=dict)
+    dentro_da_meta: Dict[Risco, Optional[float]] = field(default_factory=dict)
+    percentis: Dict[Risco, Dict[float, Optional[timedelta]]] = field(default_factory=dict)
+
+    @property
+    def eventos_por_minuto(self) -> float:
+        return self.eventos / self.segundos * 60 if self.segundos else 0.0
+
+
+class Simulacao:
+    """
+    Simulação de eventos discretos que conduz um `ProntoSocorroService` real em um relógio virtual.
+
+    Pacientes chegam segundo um processo de Poisson, com taxa constante (chegadas por hora) ou variável
+    ao longo do dia (24 taxas, uma por hora, por amostragem com rejeição), e recebem um risco conforme
+    `mix_risco`. Cada chegada é registrada e inserida na fila do serviço; `medicos` médicos chamam o
+    próximo paciente da fila sempre que ficam livres, e o atendimento dura o tempo sorteado por
+    `duracao_atendimento` (em minutos). A fila usada é a do serviço, portanto a simulação também serve
+    de teste de carga para os motores de fila.
+    """
+    def __init__(self, medicos: int = 4, chegadas_por_hora: Union[float, Sequence[float]] = 10.0,
+                 mix_risco: Dict[Risco, float] = MIX_RISCO,
+                 duracao_atendimento: Optional[Callable[[random.Random, Risco], float]] = None,
+                 motor: str = 'baldes', semente: int = 42, inicio: datetime = datetime(2024, 1, 1, 7),
+                 pacientes: int = 1000):
+        self.medicos = medicos
+        self.taxas = [float(chegadas_por_hora)] * 24 if isinstance(chegadas_por_hora, (int, float)) \
+            else [float(taxa) for taxa in chegadas_por_hora]
+        if len(self.taxas) != 24:
+            raise ValidacaoError('Informe uma taxa de chegadas ou 24 taxas, uma por hora do dia.')
+        self.riscos = list(mix_risco)
+        self.pesos = list(mix_risco.values())
+        self.duracao_atendimento = duracao_atendimento or duracao_lognormal()
+        self.rnd = random.Random(semente)
+        self.relogio = RelogioVirtual(inicio)
+
+        paciente_repo = PacienteRepository()
+        self.ps_service = ProntoSocorroService(paciente_repo, AtendimentoRepository(paciente_repo),
+                                               _criar_fila(motor), relogio=self.relogio)
+        self.pacientes = [self.ps_service.registrar_paciente("Paciente Simulado", gerar_cpf(i + 1),
+                                                             f"paciente{i + 1}@simulacao.com", "01/01/1980")
+                          for i in range(pacientes)]
+
+    def executar(self, duracao: timedelta) -> ResultadoSimulacao:
+        """
+        Simula o intervalo informado (a partir do horário atual do relógio virtual) e retorna as
+        estatísticas. Chegadas e fins de atendimento posteriores ao fim do intervalo são descartados.
+        """
+        rnd, relogio, ps_service = self.rnd, self.relogio, self.ps_service
+        fila = ps_service.fila_atendimento
+        fim = relogio.segundos + duracao.total_seconds()
+        taxa_maxima = max(self.taxas) / 3600
+        hora_inicial = relogio.inicio.hour + relogio.inicio.minute / 60
+
+        resultado = ResultadoSimulacao()
+        soma_espera = {risco: 0.0 for risco in Risco}
+        chamados = {risco: 0 for risco in Risco}
+        na_meta = {risco: 0 for risco in Risco}
+        livres = self.medicos
+        ocupado = 0.0
+        area_fila = 0.0
+        tamanho_fila = fila.tamanho()
+        anterior = relogio.segundos
+        eventos: List[tuple] = []
+        sequencia = 0
+
+        def chamar(agora: float):
+            nonlocal livres, ocupado, sequencia, tamanho_fila
+            atendimento = ps_service.chamar_proximo()
+            tamanho_fila -= 1
+            livres -= 1
+            espera = relogio() - atendimento.entrada
+            soma_espera[atendimento.risco] += espera.total_seconds()
+            chamados[atendimento.risco] += 1
+            if espera <= METAS_MANCHESTER[atendimento.risco]:
+                na_meta[atendimento.risco] += 1
+            duracao_atendimento = self.duracao_atendimento(rnd, atendimento.risco) * 60
+            ocupado += min(duracao_atendimento, fim - agora)
+            sequencia += 1
+            heapq.heappush(eventos, (agora + duracao_atendimento, sequencia, _FIM_ATENDIMENTO))
+
+        if taxa_maxima > 0:
+            heapq.heappush(eventos, (anterior + rnd.expovariate(taxa_maxima), 0, _CHEGADA))
+        inicio_real = time.perf_counter()
+        while eventos and eventos[0][0] <= fim:
+            agora, _, tipo = heapq.heappop(eventos)
+            area_fila += tamanho_fila * (agora - anterior)
+            anterior = relogio.segundos = agora
+            if tipo == _CHEGADA:
+                sequencia += 1
+                heapq.heappush(eventos, (agora + rnd.expovariate(taxa_maxima), sequencia, _CHEGADA))
+                hora = int(hora_inicial + agora / 3600) % 24
+                if rnd.random() * taxa_maxima * 3600 >= self.taxas[hora]:
+                    continue  # Chegada rejeitada: a taxa desta hora é menor que a máxima
+                resultado.eventos += 1
+                risco = rnd.choices(self.riscos, self.pesos)[0]
+                atendimento = ps_service.registrar_atendimento(rnd.choice(self.pacientes), risco)
+                ps_service.inserir_fila_atendimento(atendimento)
+                resultado.chegadas += 1
+                tamanho_fila += 1
+                resultado.fila_maxima = max(resultado.fila_maxima, tamanho_fila)
+                if livres:
+                    chamar(agora)
+            else:
+                resultado.eventos += 1
+                livres += 1
+                if tamanho_fila:
+                    chamar(agora)
+        area_fila += tamanho_fila * (fim - anterior)
+        relogio.segundos = fim
+        resultado.segundos = time.perf_counter() - inicio_real
+
+        total = duracao.total_seconds()
+        resultado.atendidos = sum(chamados.values())
+        resultado.aguardando = tamanho_fila
+        resultado.fila_media = area_fila / total if total else 0.0
+        resultado.ocupacao = ocupado / (total * self.medicos) if total and self.medicos else 0.0
+        resultado.espera_media = {risco: timedelta(seconds=soma_espera[risco] / chamados[risco])
+                                  if chamados[risco] else None for risco in Risco}
+        resultado.dentro_da_meta = {risco: na_meta[risco] / chamados[risco] if chamados[risco] else None
+                                    for risco in Risco}
+        resultado.percentis = ps_service.percentis_espera()
+        return resultado
+
+
+def _criar_fila(motor: str) -> FilaAtendimento:
+    if motor == 'heap':
+        return FilaAtendimento(MotorFilaHeap(len(Risco)))
+    if motor == 'prazo':
+        return FilaAtendimento.por_prazo()
+    if motor == 'baldes':
+        return FilaAtendimento()
+    raise ValidacaoError(f"Motor de fila desconhecido: {motor}.")
+
+
+def _minutos(valor: Optional[timedelta]) -> str:
+    return '-' if valor is None else f"{valor.total_seconds() / 60:.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--horas', type=float, default=12, help='duração simulada (padrão: 12 horas)')
+    parser.add_argument('--medicos', type=int, default=4)
+    parser.add_argument('--chegadas', type=float, default=10, help='chegadas por hora (padrão: 10)')
+    parser.add_argument('--chegadas-por-hora', type=float, nargs=24, metavar='TAXA',
+                        help='24 taxas de chegada, uma para cada hora do dia (substitui --chegadas)')
+    parser.add_argument('--motor', choices=MOTORES, default='baldes', help='motor da fila de atendimento')
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    simulacao = Simulacao(args.medicos, args.chegadas_por_hora or args.chegadas, motor=args.motor, semente=args.semente)
+    resultado = simulacao.executar(timedelta(hours=args.horas))
+
+    print(f"Chegadas: {resultado.chegadas}  Atendidos: {resultado.atendidos}  Aguardando: {resultado.aguardando}")
+    print(f"Fila: média {resultado.fila_media:.1f}, máxima {resultado.fila_maxima}  "
+          f"Ocupação dos médicos: {resultado.ocupacao:.0%}")
+    print(f"\n{'Risco':<10}{'média':>8}{'p50':>8}{'p90':>8}{'p99':>8}{'na meta':>10}  (espera em minutos)")
+    for risco in Risco:
+        percentis = resultado.percentis[risco]
+        meta = resultado.dentro_da_meta[risco]
+        print(f"{risco.name:<10}{_minutos(resultado.espera_media[risco]):>8}"
+              + "".join(f"{_minutos(valor):>8}" for valor in percentis.values())
+              + f"{'-' if meta is None else f'{meta:.0%}':>10}")
+    print(f"\n{resultado.eventos:,} eventos em {resultado.segundos:.2f} s "
+          f"({resultado.eventos_por_minuto:,.0f} eventos/minuto)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+from main.domain import FichaAnalise, Risco
+from main.error import ValidacaoError
+
+# Tabela de regras: para cada nível de risco, os discriminadores que levam a ele
+Regras = Mapping[Risco, Tuple[str, ...]]
+
+# Discriminadores gerais do protocolo de Manchester, válidos em todos os fluxogramas. Os quatro
+# campos booleanos da `FichaAnalise` correspondem a risco_morte e gravidade_alta/moderada/baixa.
+DISCRIMINADORES_GERAIS: Regras = {
+    Risco.VERMELHO: ('risco_morte', 'obstrucao_vias_aereas', 'respiracao_inadequada', 'hemorragia_exsanguinante',
+                     'choque', 'crianca_nao_responsiva', 'convulsao_atual'),
+    Risco.LARANJA: ('gravidade_alta', 'dor_intensa', 'hemorragia_maior_incontrolavel', 'alteracao_consciencia',
+                    'muito_quente'),
+    Risco.AMARELO: ('gravidade_moderada', 'dor_moderada', 'hemorragia_menor_incontrolavel',
+                    'historia_inconsciencia', 'quente'),
+    Risco.VERDE: ('gravidade_baixa', 'dor_leve', 'febril', 'evento_recente'),
+}
+
+# Discriminadores específicos de cada fluxograma (queixa principal), somados aos gerais
+FLUXOGRAMAS: Dict[str, Regras] = {
+    'geral': {},
+    'dor_toracica': {
+        Risco.LARANJA: ('dor_precordial', 'pulso_anormal', 'dispneia_aguda'),
+        Risco.AMARELO: ('dor_pleuritica', 'vomitos_persistentes', 'historia_cardiaca_significativa'),
+    },
+    'dispneia': {
+        Risco.VERMELHO: ('exaustao',),
+        Risco.LARANJA: ('saturacao_muito_baixa', 'incapaz_falar_frases', 'pulso_anormal'),
+        Risco.AMARELO: ('saturacao_baixa', 'historia_respiratoria_significativa', 'incapaz_falar_frases_longas'),
+        Risco.VERDE: ('tosse_produtiva',),
+    },
+    'cefaleia': {
+        Risco.LARANJA: ('sinais_meningismo', 'perda_visual_aguda', 'deficit_neurologico_agudo', 'purpura'),
+        Risco.AMARELO: ('deficit_neurologico_novo', 'inicio_subito', 'vomitos_persistentes'),
+    },
+    'dor_abdominal': {
+        Risco.LARANJA: ('dor_irradiada_dorso', 'sinais_peritonite'),
+        Risco.AMARELO: ('hematemese', 'melena', 'dor_irradiada_ombro', 'vomitos_persistentes'),
+        Risco.VERDE: ('vomitos',),
+    },
+    'trauma_maior': {
+        Risco.LARANJA: ('mecanismo_trauma_significativo', 'perfuracao_penetrante'),
+        Risco.AMARELO: ('deformidade_grosseira', 'fratura_exposta'),
+        Risco.VERDE: ('deformidade', 'edema'),
+    },
+    'convulsao': {
+        Risco.LARANJA: ('sinais_meningismo', 'hipoglicemia', 'purpura'),
+        Risco.AMARELO: ('historia_overdose', 'deficit_neurologico_novo'),
+    },
+}
+
+CAMPOS_FICHA = ('risco_morte', 'gravidade_alta', 'gravidade_moderada', 'gravidade_baixa')
+_RISCOS = (None,) + tuple(Risco)  # Risco pelo valor
+_BITS_POR_TABELA = 8
+
+
+class MotorTriagem:
+    """
+    Classificação de risco guiada por tabelas de regras (discriminadores do protocolo de Manchester).
+
+    O paciente recebe o risco mais grave entre os discriminadores presentes, considerando os gerais e
+    os do fluxograma da queixa principal, ou AZUL se não houver nenhum. As tabelas são compiladas uma
+    única vez: cada discriminador recebe um bit, a ficha vira uma máscara de bits e, para cada
+    fluxograma, o risco de cada fatia de 8 bits da máscara é pré-calculado em uma tabela de 256
+    posições. Classificar uma ficha custa uma consulta por fatia com algum bit presente.
+    """
+    def __init__(self, gerais: Regras = DISCRIMINADORES_GERAIS, fluxogramas: Mapping[str, Regras] = FLUXOGRAMAS):
+        # Os campos booleanos da ficha ocupam os primeiros bits: sem outros discriminadores, a máscara
+        # cabe em uma única fatia
+        nomes = [nome for regras in (gerais, *fluxogramas.values()) for nomes in regras.values() for nome in nomes]
+        self.bits: Dict[str, int] = {nome: 1 << i for i, nome in enumerate(dict.fromkeys(CAMPOS_FICHA + tuple(nomes)))}
+        self.tabelas: Dict[str, List[List[int]]] = {
+            fluxograma: self._compilar(gerais, regras) for fluxograma, regras in fluxogramas.items()}
+        self._bits_ficha = tuple(self.bits[nome] for nome in CAMPOS_FICHA)
+
+    def _compilar(self, gerais: Regras, regras: Regras) -> List[List[int]]:
+        # Nível de risco (valor) de cada bit; bits de outros fluxogramas não alteram o risco
+        niveis = [Risco.AZUL.value] * len(self.bits)
+        for tabela in (gerais, regras):
+            for risco, nomes in tabela.items():
+                for nome in nomes:
+                    bit = self.bits[nome].bit_length() - 1
+                    niveis[bit] = min(niveis[bit], risco.value)
+        tabelas = []
+        for inicio in range(0, len(niveis), _BITS_POR_TABELA):
+            fatia = niveis[inicio:inicio + _BITS_POR_TABELA]
+            tabelas.append([min((nivel for i, nivel in enumerate(fatia) if valor >> i & 1), default=Risco.AZUL.value)
+                            for valor in range(1 << _BITS_POR_TABELA)])
+        return tabelas
+
+    def mascara(self, ficha: FichaAnalise) -> int:
+        """
+        Converte os campos booleanos e os discriminadores da ficha em uma máscara de bits.
+        """
+        vermelho, laranja, amarelo, verde = self._bits_ficha
+        mascara = ((vermelho if ficha.risco_morte else 0) | (laranja if ficha.gravidade_alta else 0)
+                   | (amarelo if ficha.gravidade_moderada else 0) | (verde if ficha.gravidade_baixa else 0))
+        if ficha.discriminadores:
+            mascara |= self._mascara_discriminadores(ficha.discriminadores)
+        return mascara
+
+    def classificar(self, ficha: FichaAnalise) -> Risco:
+        return _RISCOS[_nivel(self._tabelas(ficha.fluxograma), self.mascara(ficha))]
+
+    def classificar_lote(self, fichas: Iterable[FichaAnalise]) -> List[Risco]:
+        """
+        Classifica várias fichas de uma vez, na ordem em que foram informadas.
+        """
+        vermelho, laranja, amarelo, verde = self._bits_ficha
+        mascara_discriminadores, tabelas_fluxograma = self._mascara_discriminadores, self._tabelas
+        fluxograma_anterior, tabelas = None, None
+        riscos = []
+        for ficha in fichas:
+            mascara = ((vermelho if ficha.risco_morte else 0) | (laranja if ficha.gravidade_alta else 0)
+                       | (amarelo if ficha.gravidade_moderada else 0) | (verde if ficha.gravidade_baixa else 0))
+            if ficha.discriminadores:
+                mascara |= mascara_discriminadores(ficha.discriminadores)
+            if ficha.fluxograma != fluxograma_anterior:
+                fluxograma_anterior, tabelas = ficha.fluxograma, tabelas_fluxograma(ficha.fluxograma)
+            riscos.append(_RISCOS[tabelas[0][mascara] if mascara < 0x100 else _nivel(tabelas, mascara)])
+        return riscos
+
+    def _mascara_discriminadores(self, discriminadores: Iterable[str]) -> int:
+        mascara = 0
+        bits = self.bits
+        for nome in discriminadores:
+            bit = bits.get(nome)
+            if bit is None:
+                raise ValidacaoError(f"Discriminador desconhecido: {nome}.")
+            mascara |= bit
+        return mascara
+
+    def _tabelas(self, fluxograma: str) -> List[List[int]]:
+        tabelas = self.tabelas.get(fluxograma)
+        if tabelas is None:
+            raise ValidacaoError(f"Fluxograma desconhecido: {fluxograma}.")
+        return tabelas
+
+
+def _nivel(tabelas: List[List[int]], mascara: int) -> int:
+    # Risco mais grave (menor valor) entre as fatias de 8 bits da máscara
+    nivel = Risco.AZUL.value
+    for tabela in tabelas:
+        if not mascara:
+            break
+        fatia = tabela[mascara & 0xFF]
+        if fatia < nivel:
+            nivel = fatia
+        mascara >>= _BITS_POR_TABELA
+    return nivel
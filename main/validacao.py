@@ -0,0 +1,185 @@
+import re
+from datetime import date
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from main.error import ValidacaoError
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele, os dígitos verificadores são calculados linha a linha
+    np = None
+
+# Expressões compiladas uma única vez e compartilhadas pela validação de um paciente e pela de lotes
+PONTUACAO_CPF = re.compile(r"[.\-\s]")
+FORMATO_CPF = re.compile(r"[0-9]{11}")
+FORMATO_NOME = re.compile(r"^[a-zA-ZÀ-ú\s]+$")
+FORMATO_EMAIL = re.compile(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
+FORMATO_NASCIMENTO = re.compile(r"([0-9]{2})/([0-9]{2})/([0-9]{4})")
+
+NOME_OBRIGATORIO = "O nome do paciente é obrigatório."
+NOME_INVALIDO = "O nome do paciente contém caracteres inválidos."
+CPF_INVALIDO = "CPF inválido, deve conter 11 dígitos numéricos."
+CPF_DIGITOS_INVALIDOS = "CPF inválido, os dígitos verificadores não conferem."
+EMAIL_INVALIDO = "E-mail inválido."
+NASCIMENTO_INVALIDO = "Data de nascimento inválida, use o formato DD/MM/YYYY."
+NASCIMENTO_FUTURO = "A data de nascimento não pode ser futura."
+
+# Pesos do primeiro e do segundo dígito verificador, aplicados aos 9 e aos 10 primeiros dígitos
+PESOS_DV1 = tuple(range(10, 1, -1))
+PESOS_DV2 = tuple(range(11, 1, -1))
+
+
+def _tabela_trecho(pesos) -> Dict[str, int]:
+    # Para cada trecho de 3 dígitos: soma ponderada pelos pesos do DV1 + (soma simples dos dígitos << 16).
+    # Os pesos do DV2 sobre os 9 primeiros dígitos são os do DV1 mais um, logo a soma do DV2 é a do
+    # DV1 mais a soma simples.
+    tabela = {}
+    for numero in range(1000):
+        trecho = f"{numero:03d}"
+        digitos = [int(d) for d in trecho]
+        tabela[trecho] = sum(d * peso for d, peso in zip(digitos, pesos)) + (sum(digitos) << 16)
+    return tabela
+
+
+_TRECHO_1, _TRECHO_2, _TRECHO_3 = (_tabela_trecho(PESOS_DV1[i:i + 3]) for i in (0, 3, 6))
+# Dígito verificador esperado para cada soma ponderada possível
+_DIGITO_VERIFICADOR = tuple(0 if soma % 11 < 2 else 11 - soma % 11 for soma in range(sum(PESOS_DV2) * 9 + 1))
+
+
+def normalizar_cpf(cpf: str) -> str:
+    """
+    Remove a pontuação usual de um CPF (pontos, hífen e espaços), mantendo os demais caracteres.
+    """
+    return PONTUACAO_CPF.sub("", cpf)
+
+
+def digitos_cpf_validos(cpf: str) -> bool:
+    """
+    Confere os dois dígitos verificadores de um CPF já normalizado, com 11 dígitos numéricos.
+    As somas ponderadas são obtidas de tabelas pré-calculadas para cada trecho de 3 dígitos.
+    """
+    somas = _TRECHO_1[cpf[:3]] + _TRECHO_2[cpf[3:6]] + _TRECHO_3[cpf[6:9]]
+    soma_dv1 = somas & 0xFFFF
+    dv1 = ord(cpf[9]) - 48
+    return (_DIGITO_VERIFICADOR[soma_dv1] == dv1
+            and _DIGITO_VERIFICADOR[soma_dv1 + (somas >> 16) + 2 * dv1] == ord(cpf[10]) - 48)
+
+
+def gerar_cpf(numero: int) -> str:
+    """
+    Gera um CPF válido (com dígitos verificadores corretos) a partir de um número de até 9 dígitos.
+    """
+    base = f"{numero:09d}"
+    somas = _TRECHO_1[base[:3]] + _TRECHO_2[base[3:6]] + _TRECHO_3[base[6:9]]
+    dv1 = _DIGITO_VERIFICADOR[somas & 0xFFFF]
+    dv2 = _DIGITO_VERIFICADOR[(somas & 0xFFFF) + (somas >> 16) + 2 * dv1]
+    return f"{base}{dv1}{dv2}"
+
+
+def validar_nome(nome: str) -> str:
+    motivo = _motivo_nome(nome)
+    if motivo:
+        raise ValidacaoError(motivo)
+    return nome.strip()
+
+
+def validar_cpf(cpf: str) -> str:
+    cpf = normalizar_cpf(cpf)
+    if not FORMATO_CPF.fullmatch(cpf):
+        raise ValidacaoError(CPF_INVALIDO)
+    if not digitos_cpf_validos(cpf):
+        raise ValidacaoError(CPF_DIGITOS_INVALIDOS)
+    return cpf
+
+
+def validar_email(email: str) -> str:
+    if not FORMATO_EMAIL.match(email):
+        raise ValidacaoError(EMAIL_INVALIDO)
+    return email
+
+
+def validar_nascimento(nascimento: str) -> str:
+    motivo = _motivo_nascimento(nascimento, date.today())
+    if motivo:
+        raise ValidacaoError(motivo)
+    return nascimento
+
+
+def _motivo_nome(nome: str) -> Optional[str]:
+    if not nome or not nome.strip():
+        return NOME_OBRIGATORIO
+    if not FORMATO_NOME.match(nome):
+        return NOME_INVALIDO
+    return None
+
+
+@lru_cache(maxsize=65536)
+def _motivo_nascimento(nascimento: str, hoje: date) -> Optional[str]:
+    # Há poucas datas de nascimento distintas em um cadastro, por isso o resultado é memorizado
+    formato = FORMATO_NASCIMENTO.fullmatch(nascimento)
+    if not formato:
+        return NASCIMENTO_INVALIDO
+    dia, mes, ano = map(int, formato.groups())
+    try:
+        data = date(ano, mes, dia)
+    except ValueError:
+        return NASCIMENTO_INVALIDO
+    return NASCIMENTO_FUTURO if data > hoje else None
+
+
+def validar_colunas(nomes: Sequence[str], cpfs: Sequence[str], emails: Sequence[str],
+                    nascimentos: Sequence[str]) -> Tuple[List[str], List[Optional[str]]]:
+    """
+    Valida um lote de pacientes dado em colunas (listas ou arrays NumPy de mesmo tamanho), com os
+    mesmos critérios e mensagens da validação de um `Paciente`.
+
+    Retorna os CPFs normalizados e, para cada linha, o motivo da rejeição (a mensagem da primeira
+    validação que falhou, na ordem nome, CPF, e-mail e nascimento) ou None se a linha for válida.
+
+    As expressões regulares são pré-compiladas, a validação das datas é memorizada e os dígitos
+    verificadores de todos os CPFs bem formados são conferidos de uma só vez, com NumPy quando
+    disponível.
+    """
+    cpfs = [normalizar_cpf(cpf) for cpf in cpfs]
+    motivos: List[Optional[str]] = [_motivo_nome(nome) for nome in nomes]
+
+    bem_formados = []
+    for i, cpf in enumerate(cpfs):
+        if motivos[i] is None:
+            if FORMATO_CPF.fullmatch(cpf):
+                bem_formados.append(i)
+            else:
+                motivos[i] = CPF_INVALIDO
+    for i, valido in zip(bem_formados, verificar_digitos_cpf([cpfs[i] for i in bem_formados])):
+        if not valido:
+            motivos[i] = CPF_DIGITOS_INVALIDOS
+
+    hoje = date.today()
+    for i, (email, nascimento) in enumerate(zip(emails, nascimentos)):
+        if motivos[i] is None:
+            if not FORMATO_EMAIL.match(email):
+                motivos[i] = EMAIL_INVALIDO
+            else:
+                motivos[i] = _motivo_nascimento(nascimento, hoje)
+    return cpfs, motivos
+
+
+def verificar_digitos_cpf(cpfs: Sequence[str]) -> List[bool]:
+    """
+    Confere os dígitos verificadores de vários CPFs normalizados (11 dígitos numéricos cada).
+    Com NumPy, os dígitos formam uma matriz n x 11 e as somas ponderadas são dois produtos matriciais;
+    sem ele, cada CPF é conferido pelas tabelas de `digitos_cpf_validos`.
+    """
+    if np is None or not cpfs:
+        return list(map(digitos_cpf_validos, cpfs))
+    digitos = np.frombuffer(''.join(cpfs).encode('ascii'), dtype=np.uint8).reshape(-1, 11).astype(np.int32) - 48
+    dv1 = _digitos_verificadores(digitos[:, :9] @ np.array(PESOS_DV1, dtype=np.int32))
+    dv2 = _digitos_verificadores(digitos[:, :10] @ np.array(PESOS_DV2, dtype=np.int32))
+    return ((digitos[:, 9] == dv1) & (digitos[:, 10] == dv2)).tolist()
+
+
+def _digitos_verificadores(somas):
+    restos = somas % 11
+    return np.where(restos < 2, 0, 11 - restos)
+
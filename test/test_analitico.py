@@ -0,0 +1,124 @@
+import os
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from main.concorrencia import PacienteRepositoryConcorrente, AtendimentoRepositoryConcorrente
+from main.domain import Paciente, Atendimento, Risco
+from main.error import ValidacaoError
+from main.particionado import criar_repositorios_particionados
+from main.repository import PacienteRepository, AtendimentoRepository
+from main.repository_sqlite import PoolConexoes, PacienteRepositorySQLite, AtendimentoRepositorySQLite
+from main.service import ProntoSocorroService
+from main.validacao import gerar_cpf
+
+INICIO = datetime(2024, 3, 1, 6, 30)
+
+
+def contar(atendimentos, inicio, fim):
+    contagens = {risco: 0 for risco in Risco}
+    for atendimento in atendimentos:
+        if inicio <= atendimento.entrada <= fim:
+            contagens[atendimento.risco] += 1
+    return contagens
+
+
+def serie(atendimentos, granularidade, inicio, fim):
+    periodos = {}
+    for atendimento in atendimentos:
+        if inicio <= atendimento.entrada <= fim:
+            periodo = atendimento.entrada.replace(minute=0, second=0, microsecond=0)
+            if granularidade == 'dia':
+                periodo = periodo.replace(hour=0)
+            contagens = periodos.setdefault(periodo, {risco: 0 for risco in Risco})
+            contagens[atendimento.risco] += 1
+    return sorted(periodos.items())
+
+
+class TestRelatoriosPorPeriodo(unittest.TestCase):
+
+    def popular(self, paciente_repo, atendimento_repo):
+        """Registra 400 atendimentos em três dias, parte fora de ordem e parte aberta e reclassificada ao encerrar"""
+        rnd = random.Random(11)
+        pacientes = [Paciente("Paciente", gerar_cpf(i), f"p{i}@teste.com", "01/01/2000") for i in range(1, 21)]
+        paciente_repo.inserir_lote(pacientes)
+        atendimentos = []
+        for i in range(400):
+            entrada = INICIO + timedelta(minutes=10 * i + (rnd.randrange(-120, 0) if i % 7 == 0 else 0),
+                                         microseconds=rnd.randrange(10 ** 6))
+            atendimento = Atendimento(rnd.choice(pacientes), rnd.choice(list(Risco)), entrada)
+            atendimento_repo.inserir(atendimento)
+            if i % 3 == 0:
+                atendimento_repo.abrir(atendimento)
+                atendimento.risco = rnd.choice(list(Risco))
+                atendimento_repo.encerrar(atendimento)
+            atendimentos.append(atendimento)
+        return atendimentos
+
+    def conferir(self, atendimento_repo, atendimentos):
+        rnd = random.Random(5)
+        limites = [(None, None)]
+        for _ in range(20):
+            inicio = INICIO + timedelta(minutes=rnd.randrange(-60, 4000), seconds=rnd.randrange(60))
+            limites.append((inicio, inicio + timedelta(minutes=rnd.choice([0, 30, 60, 90, 600, 2000]))))
+        limites.append((INICIO.replace(minute=0) + timedelta(hours=2), INICIO.replace(minute=0) + timedelta(hours=5)))
+        for inicio, fim in limites:
+            minimo, maximo = inicio or datetime.min, fim or datetime.max
+            self.assertEqual(atendimento_repo.contagem_por_risco(inicio, fim), contar(atendimentos, minimo, maximo))
+            for granularidade in ('hora', 'dia'):
+                self.assertEqual(atendimento_repo.serie_por_risco(granularidade, inicio, fim),
+                                 serie(atendimentos, granularidade, minimo, maximo))
+
+    def test_memoria(self):
+        """RTB: Contagens e séries por hora e por dia conferem com a contagem atendimento a atendimento"""
+        paciente_repo = PacienteRepository()
+        atendimento_repo = AtendimentoRepository(paciente_repo)
+        self.conferir(atendimento_repo, self.popular(paciente_repo, atendimento_repo))
+
+    def test_concorrente(self):
+        """RT1: O repositório concorrente mantém o mesmo índice temporal"""
+        paciente_repo = PacienteRepositoryConcorrente()
+        atendimento_repo = AtendimentoRepositoryConcorrente(paciente_repo)
+        self.conferir(atendimento_repo, self.popular(paciente_repo, atendimento_repo))
+
+    def test_sqlite(self):
+        """RT2: No SQLite, os agregados por hora são mantidos por gatilhos e recriados em bancos antigos"""
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = os.path.join(diretorio, 'ps.db')
+            pool = PoolConexoes(caminho, tamanho=1)
+            paciente_repo = PacienteRepositorySQLite(pool)
+            atendimento_repo = AtendimentoRepositorySQLite(paciente_repo)
+            atendimentos = self.popular(paciente_repo, atendimento_repo)
+            self.conferir(atendimento_repo, atendimentos)
+
+            with pool.conexao() as conexao:
+                conexao.execute('DROP TABLE atendimentos_por_hora')
+            pool.fechar()
+            pool = PoolConexoes(caminho, tamanho=1)
+            self.conferir(AtendimentoRepositorySQLite(PacienteRepositorySQLite(pool)), atendimentos)
+            pool.fechar()
+
+    def test_particionado(self):
+        """RT3: O backend particionado soma os relatórios de todas as partições"""
+        paciente_repo, atendimento_repo = criar_repositorios_particionados(2)
+        try:
+            self.conferir(atendimento_repo, self.popular(paciente_repo, atendimento_repo))
+        finally:
+            paciente_repo.particoes.fechar()
+
+    def test_servico(self):
+        """RT4: O serviço expõe os relatórios e rejeita granularidades desconhecidas"""
+        paciente_repo = PacienteRepository()
+        ps_service = ProntoSocorroService(paciente_repo, AtendimentoRepository(paciente_repo),
+                                          relogio=lambda: datetime(2024, 3, 1, 10, 15))
+        paciente = ps_service.registrar_paciente("Maria", gerar_cpf(1), "maria@teste.com", "21/03/2002")
+        entrada = ps_service.inserir_fila_atendimento(ps_service.registrar_atendimento(paciente, Risco.VERDE))
+        ps_service.reclassificar(entrada, Risco.AMARELO)
+        ps_service.chamar_proximo()
+
+        self.assertEqual(ps_service.contar_atendimentos()[Risco.AMARELO], 1)
+        self.assertEqual(ps_service.contar_atendimentos()[Risco.VERDE], 0)
+        self.assertEqual(ps_service.relatorio_atendimentos('dia'),
+                         [(datetime(2024, 3, 1), {**{risco: 0 for risco in Risco}, Risco.AMARELO: 1})])
+        with self.assertRaises(ValidacaoError):
+            ps_service.relatorio_atendimentos('semana')
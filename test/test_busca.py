@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+from main.busca import IndiceNomes, normalizar_nome, semelhanca_nome
+from main.domain import Paciente
+from main.particionado import criar_repositorios_particionados
+from main.repository import PacienteRepository, AtendimentoRepository
+from main.repository_sqlite import PoolConexoes, PacienteRepositorySQLite
+from main.service import ProntoSocorroService
+from main.validacao import gerar_cpf
+
+NOMES = ["José da Silva", "Maria José Souza", "JOSE SILVA", "João Pereira", "Ana Beatriz Conceição",
+         "Antônio Carlos Gonçalves", "Antonia Gonçalves", "Pedro Álvares Cabral"]
+
+
+def criar_pacientes():
+    return [Paciente(nome, gerar_cpf(i), f"p{i}@teste.com", "01/01/1990") for i, nome in enumerate(NOMES, 1)]
+
+
+def nomes(resultado):
+    return [(paciente.nome, round(valor, 2)) for paciente, valor in resultado]
+
+
+class TestBuscaNome(unittest.TestCase):
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        self.pacientes = criar_pacientes()
+        self.repositorio = PacienteRepository(indexar_nome=True)
+        self.repositorio.inserir_lote(self.pacientes)
+
+    def test_normalizacao(self):
+        """RTB: Acentos, maiúsculas e pontuação não diferenciam os nomes"""
+        self.assertEqual(normalizar_nome("José D'Ávila-Gonçalves"), "jose d avila goncalves")
+        self.assertEqual(semelhanca_nome("jose silva", "José da Silva"), 1.0)
+        resultado = self.repositorio.buscar_por_nome("JOSÉ SILVA")
+        self.assertEqual(nomes(resultado)[:3], [("José da Silva", 1.0), ("JOSE SILVA", 1.0), ("Maria José Souza", 0.5)])
+
+    def test_erros_de_digitacao(self):
+        """RT1: Nomes com erros de digitação ou incompletos são encontrados, do mais semelhante ao menos"""
+        self.assertEqual(self.repositorio.buscar_por_nome("Antonio Goncalvez")[0][0].nome, "Antônio Carlos Gonçalves")
+        self.assertEqual(self.repositorio.buscar_por_nome("pedro cabrall", 1)[0][0], self.pacientes[7])
+        resultado = self.repositorio.buscar_por_nome("Beatris")
+        self.assertEqual(resultado[0][0].nome, "Ana Beatriz Conceição")
+        self.assertEqual(self.repositorio.buscar_por_nome("Xyzw"), [])
+        self.assertEqual(self.repositorio.buscar_por_nome("  "), [])
+
+    def test_indice_igual_a_busca_completa(self):
+        """RT2: A busca com índice retorna o mesmo que a busca percorrendo todos os pacientes"""
+        sem_indice = PacienteRepository()
+        sem_indice.inserir_lote(self.pacientes)
+        for consulta in ("jose silva", "Antonio Goncalves", "Maria", "joao perera", "ana conceicao"):
+            with self.subTest(consulta=consulta):
+                self.assertEqual(sorted(nomes(self.repositorio.buscar_por_nome(consulta, 3))),
+                                 sorted(nomes(sem_indice.buscar_por_nome(consulta, 3))))
+
+    def test_atualizacao(self):
+        """RT3: A atualização do nome atualiza o índice"""
+        ps_service = ProntoSocorroService(self.repositorio, AtendimentoRepository(self.repositorio))
+        ps_service.atualizar_paciente("João Pereira Lima", self.pacientes[3].cpf, "p4@teste.com", "01/01/1990")
+
+        self.assertEqual(nomes(ps_service.buscar_pacientes_por_nome("joao lima", 1)), [("João Pereira Lima", 1.0)])
+        ps_service.atualizar_paciente("Carlos Lima", self.pacientes[3].cpf, "p4@teste.com", "01/01/1990")
+        self.assertEqual(self.repositorio.buscar_por_nome("Pereira"), [])
+
+    def test_limite_e_chaves_repetidas(self):
+        """RT4: Cada paciente aparece uma vez, mesmo correspondendo a várias combinações de palavras"""
+        indice = IndiceNomes()
+        for chave in range(1, 51):
+            indice.adicionar(chave, "Maria Silva" if chave % 2 else "Maria Souza")
+        resultado = indice.buscar("maria silva", 30)
+        chaves = [chave for chave, _ in resultado]
+        self.assertEqual(len(chaves), len(set(chaves)))
+        self.assertEqual(chaves[:25], list(range(1, 51, 2)))
+        self.assertEqual({valor for _, valor in resultado[25:]}, {0.5})
+
+
+class TestBuscaNomeOutrosBackends(unittest.TestCase):
+
+    def test_sqlite(self):
+        """RT5: No SQLite, os nomes já cadastrados são indexados ao abrir o banco"""
+        pacientes = criar_pacientes()
+        with tempfile.TemporaryDirectory() as diretorio:
+            pool = PoolConexoes(os.path.join(diretorio, 'ps.db'), tamanho=1)
+            repositorio = PacienteRepositorySQLite(pool)
+            repositorio.inserir_lote(pacientes[:4])
+            repositorio.inserir(pacientes[4])
+            self.assertEqual(nomes(repositorio.buscar_por_nome("jose silva"))[:2],
+                             [("José da Silva", 1.0), ("JOSE SILVA", 1.0)])
+
+            with pool.conexao() as conexao:
+                conexao.execute('DELETE FROM pacientes_palavras')
+            repositorio = PacienteRepositorySQLite(pool)
+            repositorio.inserir_lote(pacientes[5:])
+            self.assertEqual(repositorio.buscar_por_nome("beatris conceicao")[0][0], pacientes[4])
+            self.assertEqual(repositorio.buscar_por_nome("Antonio Goncalves", 2)[0][0], pacientes[5])
+
+            repositorio.atualizar(Paciente("Maria Souza Lima", pacientes[1].cpf, "p2@teste.com", "01/01/1990"))
+            self.assertEqual(nomes(repositorio.buscar_por_nome("maria lima", 1)), [("Maria Souza Lima", 1.0)])
+            pool.fechar()
+
+    def test_particionado(self):
+        """RT6: No backend particionado, os resultados das partições são combinados pela semelhança"""
+        paciente_repo, _ = criar_repositorios_particionados(3, indexar_nome=True)
+        try:
+            paciente_repo.inserir_lote(criar_pacientes())
+            resultado = nomes(paciente_repo.buscar_por_nome("jose silva", 3))
+            self.assertEqual(sorted(resultado[:2]), [("JOSE SILVA", 1.0), ("José da Silva", 1.0)])
+            self.assertEqual(resultado[2], ("Maria José Souza", 0.5))
+        finally:
+            paciente_repo.particoes.fechar()
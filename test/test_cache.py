@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+from main.cache import PacienteRepositoryCache
+from main.domain import Paciente, Risco
+from main.error import CPFDuplicadoError, PacienteNaoCadastradoError
+from main.metricas import Metricas
+from main.repository import PacienteRepository, AtendimentoRepository
+from main.repository_sqlite import PoolConexoes, PacienteRepositorySQLite, AtendimentoRepositorySQLite
+from main.service import ProntoSocorroService
+from main.validacao import gerar_cpf
+
+
+class RepositorioContador(PacienteRepository):
+    """Repositório em memória que conta as buscas que recebe"""
+    def __init__(self):
+        super().__init__(indexar_email=True)
+        self.buscas = 0
+
+    def buscar(self, cpf):
+        self.buscas += 1
+        return super().buscar(cpf)
+
+
+class TestPacienteRepositoryCache(unittest.TestCase):
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        self.repositorio = RepositorioContador()
+        self.cache = PacienteRepositoryCache(self.repositorio, capacidade=2)
+        self.pacientes = [Paciente("Paciente", gerar_cpf(i), f"p{i}@teste.com", "01/01/2000") for i in range(1, 4)]
+        self.cache.inserir_lote(self.pacientes)
+
+    def test_busca_pelo_cache(self):
+        """RTB: Um paciente que retorna é buscado no repositório uma única vez"""
+        ps_service = ProntoSocorroService(self.cache, AtendimentoRepository(self.cache))
+        paciente = self.cache.buscar(self.pacientes[0].cpf)
+        ps_service.registrar_atendimento(paciente, Risco.VERDE)
+        ps_service.buscar_historico(self.cache.buscar(self.pacientes[0].cpf))
+
+        self.assertEqual(self.repositorio.buscas, 1)
+        self.assertEqual((self.cache.estatisticas.acertos, self.cache.estatisticas.falhas), (3, 1))
+        self.assertIsNone(self.cache.buscar(gerar_cpf(99)))
+        self.assertIsNone(self.cache.buscar(gerar_cpf(99)))  # CPFs não cadastrados não são guardados
+        self.assertEqual(self.repositorio.buscas, 3)
+        self.assertEqual(self.cache.buscar_por_email("p2@teste.com"), [self.pacientes[1]])
+
+    def test_descarte_lru(self):
+        """RT1: Com o cache cheio, o paciente usado há mais tempo é descartado"""
+        primeiro, segundo, terceiro = (p.cpf for p in self.pacientes)
+        self.cache.buscar(primeiro)
+        self.cache.buscar(segundo)
+        self.cache.buscar(primeiro)
+        self.cache.buscar(terceiro)
+
+        self.assertEqual(list(self.cache.pacientes), [primeiro, terceiro])
+        self.assertEqual(self.cache.estatisticas.descartes, 1)
+        self.assertEqual(self.cache.estatisticas.taxa_acertos, 0.25)
+
+    def test_invalidacao(self):
+        """RT2: Inclusões e atualizações invalidam o CPF no cache"""
+        cpf = self.pacientes[0].cpf
+        self.cache.buscar(cpf)
+        atualizado = Paciente("Paciente Atualizado", cpf, "novo@teste.com", "01/01/2000")
+        self.cache.atualizar(atualizado)
+
+        self.assertEqual(self.cache.buscar(cpf).nome, "Paciente Atualizado")
+        self.assertEqual(self.cache.buscar_por_email("novo@teste.com"), [atualizado])
+        self.assertEqual(self.cache.buscar_por_email("p1@teste.com"), [])
+        with self.assertRaises(CPFDuplicadoError):
+            self.cache.inserir(self.pacientes[0])
+        self.assertEqual(self.cache.estatisticas.invalidacoes, 2)
+        with self.assertRaises(PacienteNaoCadastradoError):
+            self.cache.atualizar(Paciente("Ana", gerar_cpf(99), "ana@teste.com", "10/12/1985"))
+
+        self.cache.buscar(cpf)
+        self.cache.invalidar()
+        self.assertEqual(len(self.cache.pacientes), 0)
+
+    def test_sqlite(self):
+        """RT3: Com o SQLite, o cache evita consultas ao banco e exporta as estatísticas"""
+        with tempfile.TemporaryDirectory() as diretorio:
+            pool = PoolConexoes(os.path.join(diretorio, 'ps.db'), tamanho=1)
+            cache = PacienteRepositoryCache(PacienteRepositorySQLite(pool))
+            ps_service = ProntoSocorroService(cache, AtendimentoRepositorySQLite(cache))
+            paciente = ps_service.registrar_paciente("Maria", "11111111111", "maria@teste.com", "21/03/2002")
+            ps_service.registrar_atendimento(cache.buscar(paciente.cpf), Risco.AMARELO)
+            ps_service.buscar_historico(cache.buscar(paciente.cpf))
+            ps_service.atualizar_paciente("Maria Souza", "11111111111", "maria@teste.com", "21/03/2002")
+
+            self.assertEqual(ps_service.buscar_historico(paciente)[0].paciente.nome, "Maria Souza")
+            self.assertEqual(ps_service.estatisticas_cache().acertos, 2)
+            self.assertIn('ps_cache_pacientes_total{evento="acertos"} 2',
+                          Metricas().exportar(cache=ps_service.estatisticas_cache()))
+            pool.fechar()
@@ -1,7 +1,36 @@
+import io
 import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+from main.cli import TerminalClient
 from main.service import *
-from colorama import Fore, Style
+from main.repository import PacienteRepository, AtendimentoRepository
 
 
 class TestTerminalClient(unittest.TestCase):
-    """Criar testes?"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        paciente_repo = PacienteRepository(indexar_nome=True)
+        self.cliente = TerminalClient(ProntoSocorroService(paciente_repo, AtendimentoRepository(paciente_repo)))
+
+    def executar(self, *opcoes) -> str:
+        saida = io.StringIO()
+        with patch('builtins.input', side_effect=opcoes), redirect_stdout(saida):
+            self.cliente.executar()
+        return saida.getvalue()
+
+    def test_sair(self):
+        """RTB: A opção 5 encerra o menu"""
+        saida = self.executar("5")
+
+        self.assertIn("5 - Sair", saida)
+        self.assertTrue(saida.rstrip().endswith("Saindo do sistema..."))
+
+    def test_opcoes_novas_apos_sair(self):
+        """RT1: As opções acrescentadas ao menu seguem a opção de sair, e opções desconhecidas são recusadas"""
+        saida = self.executar("0", "9", "Maria", "5")
+
+        self.assertIn("Opção inválida", saida)
+        self.assertIn("9 - Buscar Paciente por Nome", saida)
+        self.assertIn("Nenhum paciente encontrado.", saida)
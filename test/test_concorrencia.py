@@ -0,0 +1,117 @@
+import threading
+import time
+import unittest
+from benchmark.dados import gerar_cpf
+from main.concorrencia import criar_servico_concorrente, FilaAtendimentoConcorrente
+from main.domain import Paciente, Atendimento, Risco
+from main.error import CPFDuplicadoError, FilaVaziaError
+
+
+def executar_em_threads(quantidade, alvo):
+    barreira = threading.Barrier(quantidade)
+
+    def executar(indice):
+        barreira.wait()
+        alvo(indice)
+
+    threads = [threading.Thread(target=executar, args=(i,)) for i in range(quantidade)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+class TestProntoSocorroConcorrente(unittest.TestCase):
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        self.ps_service = criar_servico_concorrente(faixas=8)
+
+    def test_cpf_duplicado_entre_threads(self):
+        """RTB: Várias recepções registrando o mesmo CPF ao mesmo tempo geram um único cadastro"""
+        sucessos = []
+        duplicados = []
+
+        def registrar(indice):
+            for i in range(200):
+                try:
+                    sucessos.append(self.ps_service.registrar_paciente("Maria", gerar_cpf(i), "maria@teste.com", "21/03/2002"))
+                except CPFDuplicadoError:
+                    duplicados.append(i)
+
+        executar_em_threads(8, registrar)
+
+        self.assertEqual(len(sucessos), 200)
+        self.assertEqual(len(duplicados), 7 * 200)
+        self.assertEqual(self.ps_service.pacientes.tamanho(), 200)
+
+    def test_nenhum_paciente_duplicado_ou_perdido(self):
+        """RT1: Com recepção e consultórios simultâneos, cada paciente é chamado exatamente uma vez"""
+        produtores, consumidores, por_produtor = 4, 8, 500
+        chamados = [[] for _ in range(consumidores)]
+        recepcao_encerrada = threading.Event()
+        riscos = list(Risco)
+
+        def recepcao(indice):
+            for i in range(por_produtor):
+                numero = indice * por_produtor + i
+                paciente = self.ps_service.registrar_paciente("Maria", gerar_cpf(numero), "maria@teste.com", "21/03/2002")
+                atendimento = self.ps_service.registrar_atendimento(paciente, riscos[numero % len(riscos)])
+                self.ps_service.inserir_fila_atendimento(atendimento)
+
+        def consultorio(indice):
+            while True:
+                try:
+                    chamados[indice].append(self.ps_service.chamar_proximo())
+                except FilaVaziaError:
+                    if recepcao_encerrada.is_set() and not self.ps_service.fila_atendimento.possui_proximo():
+                        return
+                    time.sleep(0.001)  # Fila vazia: libera o processador para a recepção
+
+        threads = [threading.Thread(target=consultorio, args=(i,)) for i in range(consumidores)]
+        for t in threads:
+            t.start()
+        executar_em_threads(produtores, recepcao)
+        recepcao_encerrada.set()
+        for t in threads:
+            t.join()
+
+        todos = [atendimento for lista in chamados for atendimento in lista]
+        self.assertEqual(len(todos), produtores * por_produtor)
+        self.assertEqual(len({id(a) for a in todos}), produtores * por_produtor)
+        self.assertEqual(self.ps_service.atendimentos.tamanho(), produtores * por_produtor)
+
+    def test_fila_concorrente_respeita_prioridade(self):
+        """RT2: A fila concorrente mantém a ordem por risco e chegada"""
+        fila = FilaAtendimentoConcorrente()
+        paciente = Paciente("Maria", "11111111111", "maria@teste.com", "21/03/2002")
+        verde = Atendimento(paciente, Risco.VERDE)
+        vermelho = Atendimento(paciente, Risco.VERMELHO)
+        fila.inserir(verde)
+        entrada = fila.inserir(vermelho)
+        fila.reclassificar(entrada, Risco.AZUL)
+
+        self.assertEqual(fila.tamanho(Risco.AZUL), 1)
+        self.assertEqual([fila.proximo(), fila.proximo()], [verde, vermelho])
+
+    def test_chamadas_em_lote_entre_threads(self):
+        """RT3: Chamadas em lote simultâneas não entregam o mesmo paciente a dois consultórios"""
+        fila = FilaAtendimentoConcorrente()
+        paciente = Paciente("Maria", "11111111111", "maria@teste.com", "21/03/2002")
+        riscos = list(Risco)
+        fila.inserir_lote(Atendimento(paciente, riscos[i % len(riscos)]) for i in range(2000))
+        chamados = [[] for _ in range(8)]
+
+        def consultorio(indice):
+            while True:
+                try:
+                    lote = fila.proximos(7)
+                except FilaVaziaError:
+                    return
+                # Cada lote sai em ordem de risco
+                self.assertEqual(lote, sorted(lote, key=lambda a: a.risco.value))
+                chamados[indice] += lote
+
+        executar_em_threads(8, consultorio)
+        todos = [atendimento for lista in chamados for atendimento in lista]
+        self.assertEqual(len({id(a) for a in todos}), 2000)
@@ -95,24 +95,52 @@ class EntitiesTest(unittest.TestCase):
 
         self.assertEqual(str(contexto.exception), "A data de nascimento não pode ser futura.")
 
-    """def test_dia_invalido(self):
-        RT11: Dia inválido na data de nascimento
+    def test_entrada_atendimento(self):
+        """RT11: Cada atendimento registra o próprio horário de entrada"""
+
+        paciente = Paciente("Maria", "11111111111", "maria@teste.com", "21/03/2002")
+        antes = datetime.now()
+        atendimento = Atendimento(paciente, Risco.VERDE)
+
+        self.assertGreaterEqual(atendimento.entrada, antes)
+        self.assertLessEqual(atendimento.entrada, datetime.now())
+
+    def test_entidades_sem_dict(self):
+        """RT12: As entidades usam __slots__, sem um __dict__ por instância"""
+
+        paciente = Paciente("Maria", "11111111111", "maria@teste.com", "21/03/2002")
+        atendimento = Atendimento(paciente, Risco.VERDE)
+
+        self.assertFalse(hasattr(paciente, "__dict__"))
+        self.assertFalse(hasattr(atendimento, "__dict__"))
+
+    def test_dia_invalido(self):
+        """RT13: Dia inválido na data de nascimento"""
 
         with self.assertRaises(ValidacaoError) as context:
             Paciente("Maria", "11111111111", "maria@teste.com", "32/03/2002")
         self.assertIn("Data de nascimento", context.exception.message)
 
     def test_mes_invalido(self):
-        RT12: Mês inválido na data de nascimento
+        """RT14: Mês inválido na data de nascimento"""
 
         with self.assertRaises(ValidacaoError) as context:
             Paciente("Maria", "11111111111", "maria@teste.com", "10/13/2002")
         self.assertIn("Data de nascimento", context.exception.message)
 
     def test_data_com_caracteres_especiais(self):
-        RT13: Data de nascimento com caracteres especiais
+        """RT15: Data de nascimento com caracteres especiais"""
 
         with self.assertRaises(ValidacaoError) as context:
-            Paciente("Maria", "11111111111", "maria@teste.com", "10/XX/2002")  
+            Paciente("Maria", "11111111111", "maria@teste.com", "10/XX/2002")
         self.assertIn("Data de nascimento inválida", context.exception.message)
-"""
\ No newline at end of file
+
+    def test_cpf_digitos_verificadores(self):
+        """RT16: CPF com dígitos verificadores incorretos"""
+
+        paciente = Paciente("Maria", "529.982.247-25", "maria@teste.com", "21/03/2002")
+        self.assertEqual(paciente.cpf, "52998224725")
+
+        with self.assertRaises(ValidacaoError) as context:
+            Paciente("Maria", "529.982.247-26", "maria@teste.com", "21/03/2002")
+        self.assertIn("dígitos verificadores", context.exception.message)
@@ -0,0 +1,70 @@
+import random
+import unittest
+from datetime import datetime, timedelta
+from main.domain import Risco
+from main.error import ValidacaoError
+from main.espera import EstimadorP2, TemposEspera
+from main.repository import PacienteRepository, AtendimentoRepository
+from main.service import ProntoSocorroService
+
+
+class RelogioManual:
+    def __init__(self, inicio: datetime):
+        self.agora = inicio
+
+    def __call__(self) -> datetime:
+        return self.agora
+
+
+class TestTemposEspera(unittest.TestCase):
+
+    def test_estimador_p2(self):
+        """RTB: O estimador P² aproxima os quantis sem guardar as observações"""
+        rnd = random.Random(7)
+        valores = [rnd.expovariate(1 / 600) for _ in range(50000)]
+        ordenados = sorted(valores)
+        for quantil in (0.5, 0.9, 0.99):
+            estimador = EstimadorP2(quantil)
+            for valor in valores:
+                estimador.observar(valor)
+            exato = ordenados[int(quantil * len(ordenados))]
+            self.assertAlmostEqual(estimador.valor(), exato, delta=exato * 0.03)
+
+    def test_poucas_observacoes(self):
+        """RT1: Com até cinco observações o quantil é exato"""
+        estimador = EstimadorP2(0.99)
+        self.assertIsNone(estimador.valor())
+        for valor in (30, 10, 20):
+            estimador.observar(valor)
+        self.assertEqual(estimador.valor(), 30)
+
+    def test_janela_deslizante(self):
+        """RT2: As janelas consideram apenas os pacientes chamados dentro delas"""
+        tempos = TemposEspera()
+        inicio = datetime(2024, 1, 1, 8)
+        tempos.registrar(Risco.AMARELO, timedelta(minutes=50), inicio)
+        tempos.registrar(Risco.AMARELO, timedelta(minutes=5), inicio + timedelta(hours=2))
+
+        hora = tempos.percentis('hora', inicio + timedelta(hours=2))
+        dia = tempos.percentis('dia', inicio + timedelta(hours=2))
+        self.assertAlmostEqual(hora[Risco.AMARELO][0.99].total_seconds(), 300, delta=15)
+        self.assertAlmostEqual(dia[Risco.AMARELO][0.99].total_seconds(), 3000, delta=150)
+        self.assertIsNone(hora[Risco.VERMELHO][0.5])
+        self.assertIsNone(tempos.percentis('hora', inicio + timedelta(hours=4))[Risco.AMARELO][0.5])
+        with self.assertRaises(ValidacaoError):
+            tempos.percentis('semana')
+
+    def test_servico(self):
+        """RT3: O serviço registra o tempo de espera de cada paciente chamado"""
+        relogio = RelogioManual(datetime(2024, 1, 1, 8))
+        paciente_repo = PacienteRepository()
+        ps_service = ProntoSocorroService(paciente_repo, AtendimentoRepository(paciente_repo), relogio=relogio)
+        paciente = ps_service.registrar_paciente("Maria", "11111111111", "maria@teste.com", "21/03/2002")
+        for _ in range(3):
+            ps_service.inserir_fila_atendimento(ps_service.registrar_atendimento(paciente, Risco.VERDE))
+        for minutos in (10, 20, 40):
+            relogio.agora = datetime(2024, 1, 1, 8) + timedelta(minutes=minutos)
+            ps_service.chamar_proximo()
+
+        self.assertEqual(ps_service.percentis_espera()[Risco.VERDE][0.5], timedelta(minutes=20))
+        self.assertAlmostEqual(ps_service.percentis_espera('hora')[Risco.VERDE][0.99].total_seconds(), 2400, delta=120)
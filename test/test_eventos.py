@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import unittest
+from main.concorrencia import criar_servico_concorrente
+from main.domain import Risco
+from main.eventos import FeedFila, INSERIDO, CHAMADO, RECLASSIFICADO, REMOVIDO
+from main.protocolo import Protocolo
+from main.repository import PacienteRepository, AtendimentoRepository
+from main.service import ProntoSocorroService
+from main.validacao import gerar_cpf
+
+
+def criar_servico():
+    paciente_repo = PacienteRepository()
+    return ProntoSocorroService(paciente_repo, AtendimentoRepository(paciente_repo))
+
+
+def registrar(ps_service, quantidade, risco=Risco.VERDE):
+    atendimentos = []
+    for i in range(quantidade):
+        paciente = ps_service.registrar_paciente("Maria", gerar_cpf(ps_service.pacientes.tamanho() + 1),
+                                                 "maria@teste.com", "21/03/2002")
+        atendimentos.append(ps_service.registrar_atendimento(paciente, risco))
+    return atendimentos
+
+
+class TestFeedFila(unittest.TestCase):
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        self.ps_service = criar_servico()
+        self.feed = self.ps_service.feed_fila(capacidade=8)
+
+    def test_eventos_da_fila(self):
+        """RTB: Inserções, chamadas, reclassificações e remoções publicam eventos com os tamanhos da fila"""
+        verde, amarelo, azul = registrar(self.ps_service, 3)
+        amarelo.risco = Risco.AMARELO
+        assinatura = self.ps_service.assinar_fila()
+        entrada = self.ps_service.inserir_fila_atendimento(verde)
+        self.ps_service.inserir_fila_lote([amarelo, azul])
+        self.ps_service.reclassificar(entrada, Risco.LARANJA)
+        self.ps_service.chamar_proximo()
+        self.ps_service.remover_da_fila(self.ps_service.fila_atendimento.motor.entradas()[-1])
+
+        eventos = assinatura.proximos(timeout=0)
+        self.assertEqual([(e.sequencia, e.tipo) for e in eventos],
+                         [(0, INSERIDO), (1, INSERIDO), (2, INSERIDO), (3, RECLASSIFICADO), (4, CHAMADO), (5, REMOVIDO)])
+        self.assertEqual(eventos[3].risco, Risco.LARANJA)
+        self.assertIs(eventos[4].atendimento, verde)
+        self.assertEqual(eventos[2].tamanhos, (0, 0, 1, 2, 0))
+        self.assertEqual(eventos[-1].tamanhos, (0, 0, 1, 0, 0))
+        self.assertEqual(assinatura.proximos(timeout=0), [])
+
+    def test_buffer_circular_e_releitura(self):
+        """RT1: Uma assinatura atrasada perde apenas os eventos que saíram do buffer e pode reler a partir de uma sequência"""
+        lenta = self.feed.assinar()
+        self.ps_service.inserir_fila_lote(registrar(self.ps_service, 12))
+
+        eventos = lenta.proximos(timeout=0)
+        self.assertEqual([e.sequencia for e in eventos], list(range(4, 12)))
+        self.assertEqual(lenta.perdidos, 4)
+
+        leitura = self.feed.ler(9, limite=2)
+        self.assertEqual(([e.sequencia for e in leitura.eventos], leitura.proxima, leitura.perdidos), ([9, 10], 11, 0))
+        self.assertEqual(self.feed.ler(12).eventos, [])
+        reconectada = self.ps_service.assinar_fila(desde=10)
+        self.assertEqual([e.sequencia for e in reconectada.proximos(timeout=0)], [10, 11])
+
+    def test_assinatura_sincrona_em_outra_thread(self):
+        """RT2: Um painel em outra thread recebe os eventos sem atrasar a fila"""
+        assinatura = self.feed.assinar()
+        recebidos = []
+
+        def painel():
+            for evento in assinatura:
+                recebidos.append(evento.sequencia)
+                if len(recebidos) == 5:
+                    assinatura.cancelar()
+
+        thread = threading.Thread(target=painel)
+        thread.start()
+        for atendimento in registrar(self.ps_service, 5):
+            self.ps_service.inserir_fila_atendimento(atendimento)
+        thread.join(timeout=5)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(recebidos, [0, 1, 2, 3, 4])
+
+    def test_assinatura_async(self):
+        """RT3: Assinaturas asyncio recebem os eventos publicados por outras threads"""
+        ps_service = criar_servico_concorrente(faixas=4)
+        atendimentos = registrar(ps_service, 20)
+
+        async def executar():
+            assinaturas = [ps_service.assinar_fila_async() for _ in range(3)]
+            recepcao = threading.Thread(target=lambda: [ps_service.inserir_fila_atendimento(a) for a in atendimentos])
+            recepcao.start()
+
+            async def painel(assinatura):
+                recebidos = []
+                async for evento in assinatura:
+                    recebidos.append(evento.sequencia)
+                    if len(recebidos) == 20:
+                        assinatura.cancelar()
+                return recebidos
+
+            resultado = await asyncio.wait_for(asyncio.gather(*(painel(a) for a in assinaturas)), timeout=5)
+            recepcao.join()
+            return resultado
+
+        self.assertEqual(asyncio.run(executar()), [list(range(20))] * 3)
+        self.assertEqual(len(ps_service.feed_fila().assinaturas_async), 0)
+
+    def test_protocolo(self):
+        """RT4: Os eventos podem ser lidos pelo protocolo a partir de uma sequência"""
+        protocolo = Protocolo(self.ps_service)
+        self.ps_service.inserir_fila_lote(registrar(self.ps_service, 3))
+
+        resposta = protocolo.executar({'op': 'eventos_fila', 'desde': 1})
+        self.assertEqual(resposta['resultado']['proxima'], 3)
+        self.assertEqual([e['sequencia'] for e in resposta['resultado']['eventos']], [1, 2])
+        self.assertEqual(resposta['resultado']['eventos'][0]['tamanhos']['VERDE'], 3)
+        self.assertFalse(protocolo.executar({'op': 'eventos_fila', 'desde': -1})['ok'])
+
+    def test_sem_feed(self):
+        """RT5: Sem feed, a fila não publica eventos"""
+        ps_service = criar_servico()
+        ps_service.inserir_fila_atendimento(registrar(ps_service, 1)[0])
+
+        self.assertIsNone(ps_service.fila_atendimento.feed)
+        with self.assertRaises(ValueError):
+            FeedFila(capacidade=0)
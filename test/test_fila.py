@@ -0,0 +1,176 @@
+import random
+import unittest
+from main.fila import MotorFilaHeap, MotorFilaBaldes, MotorFilaPrazo
+
+
+class MotorFilaTestMixin:
+    """Testes comuns a todos os motores de fila"""
+
+    def test_prioridade_por_nivel(self):
+        """RTB: O item de menor nível é retirado primeiro"""
+        motor = self.criar_motor()
+        motor.inserir(2, "amarelo")
+        motor.inserir(0, "vermelho")
+        motor.inserir(4, "azul")
+
+        self.assertEqual([motor.proximo() for _ in range(3)], ["vermelho", "amarelo", "azul"])
+
+    def test_ordem_chegada_mesmo_nivel(self):
+        """RT1: Itens do mesmo nível saem na ordem de chegada, sem comparar os itens"""
+        motor = self.criar_motor()
+        itens = [object() for _ in range(10)]
+        for item in itens:
+            motor.inserir(3, item)
+
+        self.assertEqual([motor.proximo() for _ in range(10)], itens)
+
+    def test_tamanho_por_nivel(self):
+        """RT2: O tamanho é mantido no total e por nível"""
+        motor = self.criar_motor()
+        for nivel in (0, 1, 1, 4, 4, 4):
+            motor.inserir(nivel, nivel)
+        motor.proximo()
+
+        self.assertEqual(motor.tamanho(), 5)
+        self.assertEqual([motor.tamanho(nivel) for nivel in range(5)], [0, 2, 0, 0, 3])
+
+    def test_fila_vazia(self):
+        """RT3: Retirar de um motor vazio gera IndexError"""
+        with self.assertRaises(IndexError):
+            self.criar_motor().proximo()
+
+    def test_remover(self):
+        """RT4: Um item removido não é mais retirado e deixa de contar no tamanho"""
+        motor = self.criar_motor()
+        a = motor.inserir(1, "a")
+        motor.inserir(1, "b")
+        motor.remover(a)
+
+        self.assertFalse(a.ativa)
+        self.assertEqual(motor.tamanho(1), 1)
+        self.assertEqual(motor.proximo(), "b")
+        self.assertEqual(motor.tamanho(), 0)
+
+    def test_reclassificar_mantem_ordem_chegada(self):
+        """RT5: Um item reclassificado entra no novo nível respeitando a sua ordem de chegada"""
+        motor = self.criar_motor()
+        a = motor.inserir(4, "a")
+        motor.inserir(2, "b")
+        motor.inserir(2, "c")
+        motor.reclassificar(a, 2)
+
+        self.assertEqual(motor.tamanho(4), 0)
+        self.assertEqual(motor.tamanho(2), 3)
+        self.assertEqual([motor.proximo() for _ in range(3)], ["a", "b", "c"])
+
+    def test_compactacao(self):
+        """RT6: Após muitas remoções, as entradas inativas são descartadas sem alterar a ordem"""
+        motor = self.criar_motor()
+        entradas = [motor.inserir(i % 5, i) for i in range(300)]
+        for entrada in entradas[:250]:
+            motor.remover(entrada)
+
+        self.assertLess(motor.inativas, 250)
+        esperados = sorted(range(250, 300), key=lambda i: (i % 5, i))
+        self.assertEqual([motor.proximo() for _ in range(50)], esperados)
+
+    def test_operacoes_aleatorias(self):
+        """RT7: Sequência aleatória de operações equivale a ordenar por (nível, chegada)"""
+        rnd = random.Random(7)
+        motor = self.criar_motor()
+        ativas = {}
+        for i in range(5000):
+            operacao = rnd.random()
+            if operacao < 0.5 or not ativas:
+                ativas[i] = motor.inserir(rnd.randrange(5), i)
+            elif operacao < 0.7:
+                motor.remover(ativas.pop(rnd.choice(list(ativas))))
+            elif operacao < 0.85:
+                motor.reclassificar(ativas[rnd.choice(list(ativas))], rnd.randrange(5))
+            else:
+                esperado = min(ativas.values(), key=lambda e: (e.nivel, e.sequencia))
+                self.assertEqual(motor.proximo(), esperado.item)
+                del ativas[esperado.item]
+            self.assertEqual(motor.tamanho(), len(ativas))
+
+        esperados = [e.item for e in sorted(ativas.values(), key=lambda e: (e.nivel, e.sequencia))]
+        self.assertEqual([motor.proximo() for _ in range(len(ativas))], esperados)
+
+    def test_lotes(self):
+        """RT8: Inserções e retiradas em lote equivalem às mesmas operações uma a uma"""
+        rnd = random.Random(11)
+        motor, referencia = self.criar_motor(), self.criar_motor()
+        for rodada in range(200):
+            if rnd.random() < 0.6:
+                itens = [(rnd.randrange(5), f"{rodada}-{i}") for i in range(rnd.choice((1, 3, 40)))]
+                entradas = motor.inserir_lote(itens)
+                for nivel, item in itens:
+                    referencia.inserir(nivel, item)
+                self.assertEqual([(e.nivel, e.item) for e in entradas], itens)
+                if rnd.random() < 0.3:
+                    motor.reclassificar(entradas[0], rnd.randrange(5))
+                    referencia.reclassificar(next(e for e in referencia.entradas() if e.item == entradas[0].item),
+                                             entradas[0].nivel)
+            else:
+                quantidade = rnd.randrange(1, 30)
+                esperados = [referencia.proximo() for _ in range(min(quantidade, referencia.tamanho()))]
+                self.assertEqual([e.item for e in motor.proximos_entradas(quantidade)], esperados)
+            self.assertEqual([motor.tamanho(nivel) for nivel in range(5)],
+                             [referencia.tamanho(nivel) for nivel in range(5)])
+
+        self.assertEqual(motor.proximos_entradas(0), [])
+        self.assertEqual([e.item for e in motor.proximos_entradas(motor.tamanho() + 5)],
+                         [referencia.proximo() for _ in range(referencia.tamanho())])
+        self.assertEqual(motor.tamanho(), 0)
+
+
+class TestMotorFilaHeap(MotorFilaTestMixin, unittest.TestCase):
+    def criar_motor(self, niveis=5):
+        return MotorFilaHeap(niveis)
+
+
+class TestMotorFilaBaldes(MotorFilaTestMixin, unittest.TestCase):
+    def criar_motor(self, niveis=5):
+        return MotorFilaBaldes(niveis)
+
+
+class TestMotorFilaPrazo(unittest.TestCase):
+    def criar_motor(self):
+        # Os itens são o próprio instante de chegada, em segundos
+        return MotorFilaPrazo([0, 600, 3600, 7200, 14400], instante=lambda item: item)
+
+    def test_ordem_por_prazo(self):
+        """RTB: O item com o menor prazo (chegada + meta) é retirado primeiro"""
+        motor = self.criar_motor()
+        motor.inserir(4, 0)        # prazo 14400
+        motor.inserir(0, 15000)    # prazo 15000
+        motor.inserir(2, 10000)    # prazo 13600
+
+        self.assertEqual([motor.proximo() for _ in range(3)], [10000, 0, 15000])
+
+    def test_mesmo_prazo_respeita_nivel_e_chegada(self):
+        """RT1: Em prazos iguais, vence o nível mais grave e depois a ordem de chegada"""
+        motor = self.criar_motor()
+        motor.inserir(1, 0)       # prazo 600
+        motor.inserir(0, 600)     # prazo 600
+        motor.inserir(0, 600)
+
+        self.assertEqual(motor.proximo(), 600)
+        self.assertEqual(motor.tamanho(0), 1)
+
+    def test_definir_metas_reordena(self):
+        """RT2: Novas metas passam a valer na próxima retirada"""
+        motor = self.criar_motor()
+        motor.inserir(4, 0)
+        motor.inserir(3, 100)
+        motor.definir_metas([0, 600, 3600, 20000, 14400])
+
+        self.assertEqual([motor.proximo() for _ in range(2)], [0, 100])
+
+    def test_lotes_apos_definir_metas(self):
+        """RT3: Lotes usam a ordem das novas metas"""
+        motor = self.criar_motor()
+        motor.inserir_lote([(4, 0), (0, 15000), (2, 10000)])
+        motor.definir_metas([0, 0, 0, 0, 0])
+
+        self.assertEqual([e.item for e in motor.proximos_entradas(3)], [0, 10000, 15000])
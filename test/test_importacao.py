@@ -0,0 +1,95 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+from benchmark.dados import gerar_cpf
+from main.domain import Paciente
+from main.importacao import importar_pacientes, ler_arquivo
+from main.repository import PacienteRepository, AtendimentoRepository
+from main.service import ProntoSocorroService
+
+
+class TestImportacao(unittest.TestCase):
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.paciente_repo = PacienteRepository()
+        self.ps_service = ProntoSocorroService(self.paciente_repo, AtendimentoRepository(self.paciente_repo))
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def caminho(self, nome):
+        return os.path.join(self.diretorio.name, nome)
+
+    def escrever_csv(self, nome, linhas):
+        with open(self.caminho(nome), 'w', newline='', encoding='utf-8') as arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(('nome', 'cpf', 'email', 'nascimento'))
+            escritor.writerows(linhas)
+        return self.caminho(nome)
+
+    def ler_relatorio(self, nome):
+        with open(self.caminho(nome), newline='', encoding='utf-8') as arquivo:
+            return list(csv.DictReader(arquivo))
+
+    def test_importacao_csv(self):
+        """RTB: Pacientes válidos de um CSV são importados em lotes"""
+        linhas = [("Paciente", gerar_cpf(i + 1), f"p{i}@teste.com", "01/01/2000") for i in range(25)]
+        resultado = self.ps_service.importar_pacientes(self.escrever_csv('pacientes.csv', linhas), tamanho_lote=10)
+
+        self.assertEqual((resultado.lidos, resultado.importados, resultado.rejeitados), (25, 25, 0))
+        self.assertEqual(self.paciente_repo.tamanho(), 25)
+
+    def test_rejeitados(self):
+        """RT1: Registros inválidos e CPFs duplicados (no lote ou já cadastrados) vão para o relatório"""
+        self.paciente_repo.inserir(Paciente("Maria", "11111111111", "maria@teste.com", "21/03/2002"))
+        linhas = [
+            ("João", "22222222222", "joao@teste.com", "21/03/2000"),
+            ("Maria", "111.111.111-11", "maria@teste.com", "21/03/2002"),  # Já cadastrado
+            ("Ana123", "33333333333", "ana@teste.com", "10/12/1985"),      # Nome inválido
+            ("Joana", "222.222.222-22", "joana@teste.com", "01/01/1990"),  # Repetido no lote
+        ]
+        caminho = self.escrever_csv('pacientes.csv', linhas)
+        resultado = self.ps_service.importar_pacientes(caminho, self.caminho('rejeitados.csv'))
+
+        self.assertEqual((resultado.lidos, resultado.importados, resultado.rejeitados), (4, 1, 3))
+        relatorio = self.ler_relatorio('rejeitados.csv')
+        self.assertEqual([r['linha'] for r in relatorio], ['3', '4', '5'])
+        self.assertIn('CPF já cadastrado', relatorio[0]['motivo'])
+        self.assertIn('nome', relatorio[1]['motivo'])
+        self.assertEqual(relatorio[2]['nome'], 'Joana')
+
+    def test_importacao_jsonl(self):
+        """RT2: Importação de JSONL com linhas inválidas e campos ausentes"""
+        with open(self.caminho('pacientes.jsonl'), 'w', encoding='utf-8') as arquivo:
+            arquivo.write(json.dumps({"nome": "João", "cpf": "22222222222", "email": "joao@teste.com",
+                                      "nascimento": "21/03/2000"}) + "\n")
+            arquivo.write("{quebrado\n")
+            arquivo.write(json.dumps({"nome": "Ana", "cpf": "33333333333"}) + "\n")
+
+        resultado = importar_pacientes(self.paciente_repo, ler_arquivo(self.caminho('pacientes.jsonl')),
+                                       self.caminho('rejeitados.csv'))
+
+        self.assertEqual((resultado.importados, resultado.rejeitados), (1, 2))
+        motivos = [r['motivo'] for r in self.ler_relatorio('rejeitados.csv')]
+        self.assertEqual(motivos, ['JSON inválido.', 'Campos ausentes: email, nascimento.'])
+
+    def test_fluxo_consumido_sob_demanda(self):
+        """RT3: O fluxo de registros é lido um lote por vez"""
+        lidos = []
+
+        def gerar():
+            for i in range(100):
+                lidos.append(i)
+                yield i + 1, {"nome": "Paciente", "cpf": gerar_cpf(i + 1), "email": "p@teste.com",
+                              "nascimento": "01/01/2000"}
+
+        inseridos_por_lote = []
+        inserir_lote = self.paciente_repo.inserir_lote
+        self.paciente_repo.inserir_lote = lambda lote: (inseridos_por_lote.append(len(lidos)), inserir_lote(lote))
+        importar_pacientes(self.paciente_repo, gerar(), tamanho_lote=30)
+
+        self.assertEqual(inseridos_por_lote, [30, 60, 90, 100])
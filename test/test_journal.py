@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+from benchmark.dados import gerar_cpf
+from main.domain import Paciente, Atendimento, FilaAtendimento, Risco
+from main.journal import JournalFila
+from main.repository import PacienteRepository
+
+
+class TestJournalFila(unittest.TestCase):
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.journal = JournalFila(self.diretorio.name)
+        self.fila = self.journal.recuperar(FilaAtendimento())
+        self.pacientes = [Paciente("Maria", gerar_cpf(i + 1), "maria@teste.com", "21/03/2002") for i in range(6)]
+
+    def tearDown(self):
+        self.journal.fechar()
+        self.diretorio.cleanup()
+
+    def reabrir(self, **kwargs) -> FilaAtendimento:
+        self.journal.fechar()
+        self.journal = JournalFila(self.diretorio.name, **kwargs)
+        return self.journal.recuperar(FilaAtendimento())
+
+    def preencher(self):
+        riscos = [Risco.VERDE, Risco.AMARELO, Risco.VERDE, Risco.AZUL, Risco.VERDE, Risco.AMARELO]
+        entradas = [self.fila.inserir(Atendimento(p, r)) for p, r in zip(self.pacientes, riscos)]
+        self.fila.proximo()                               # Chama o primeiro AMARELO
+        self.fila.reclassificar(entradas[3], Risco.VERDE)  # AZUL passa a VERDE, mantendo a chegada
+        self.fila.remover(entradas[2])                     # Paciente desiste do atendimento
+
+    def test_recuperacao_pelo_log(self):
+        """RTB: A fila é reconstruída a partir do log, sem duplicar entradas ao reabrir"""
+        self.preencher()
+
+        fila = self.reabrir()
+        self.assertEqual(fila.tamanho(), 4)
+        fila = self.reabrir()
+        self.assertEqual(fila.tamanho(), 4)
+        self.assertEqual(fila.tamanho(Risco.VERDE), 3)
+
+    def test_recuperacao_mantem_ordem(self):
+        """RT1: Após a recuperação, risco, ordem de chegada e reclassificações são preservados"""
+        self.preencher()
+        fila = self.reabrir()
+
+        chamados = [fila.proximo() for _ in range(fila.tamanho())]
+        self.assertEqual([a.paciente.cpf for a in chamados],
+                         [self.pacientes[i].cpf for i in (5, 0, 3, 4)])
+        self.assertEqual([a.risco for a in chamados], [Risco.AMARELO] + [Risco.VERDE] * 3)
+
+    def test_recuperacao_com_snapshot(self):
+        """RT2: Com snapshot periódico, a recuperação combina o snapshot e o log mais recente"""
+        self.journal.fechar()
+        self.journal = JournalFila(self.diretorio.name, eventos_por_snapshot=4)
+        self.fila = self.journal.recuperar(FilaAtendimento())
+        self.preencher()
+
+        self.assertTrue(os.path.exists(os.path.join(self.diretorio.name, 'fila.snapshot')))
+        self.assertFalse(os.path.exists(os.path.join(self.diretorio.name, 'fila-0.log')))
+        fila = self.reabrir(eventos_por_snapshot=4)
+
+        chamados = [fila.proximo() for _ in range(fila.tamanho())]
+        self.assertEqual([a.paciente.cpf for a in chamados],
+                         [self.pacientes[i].cpf for i in (5, 0, 3, 4)])
+
+    def test_linha_incompleta(self):
+        """RT3: Uma linha parcialmente gravada no momento da falha é ignorada"""
+        self.fila.inserir(Atendimento(self.pacientes[0], Risco.VERDE))
+        self.journal.sincronizar()
+        with open(os.path.join(self.diretorio.name, 'fila-0.log'), 'a') as arquivo:
+            arquivo.write('["i",1,0,{"paciente"')
+
+        fila = self.reabrir()
+        self.assertEqual(fila.tamanho(), 1)
+        self.assertEqual(fila.proximo().paciente, self.pacientes[0])
+
+    def test_linha_incompleta_seguida_de_novos_eventos(self):
+        """RT6: A linha incompleta é descartada na recuperação e os eventos seguintes são recuperados"""
+        self.fila.inserir(Atendimento(self.pacientes[0], Risco.VERDE))
+        self.journal.sincronizar()
+        with open(os.path.join(self.diretorio.name, 'fila-0.log'), 'a') as arquivo:
+            arquivo.write('["i",1,0,{"paciente"')
+
+        fila = self.reabrir()
+        for paciente in self.pacientes[1:3]:
+            fila.inserir(Atendimento(paciente, Risco.VERDE))
+        fila = self.reabrir()
+        self.assertEqual([a.paciente.cpf for a in fila.proximos(5)], [p.cpf for p in self.pacientes[:3]])
+
+    def test_novas_insercoes_apos_recuperacao(self):
+        """RT4: Pacientes inseridos após a recuperação entram depois dos restaurados"""
+        repo = PacienteRepository()
+        repo.inserir(self.pacientes[0])
+        self.fila.inserir(Atendimento(self.pacientes[0], Risco.VERDE))
+        self.journal.fechar()
+        self.journal = JournalFila(self.diretorio.name)
+        fila = self.journal.recuperar(FilaAtendimento(), repo)
+
+        fila.inserir(Atendimento(self.pacientes[1], Risco.VERDE))
+        restaurado = fila.proximo()
+        self.assertIs(restaurado.paciente, self.pacientes[0])
+        self.assertEqual(fila.proximo().paciente, self.pacientes[1])
+
+    def test_lotes(self):
+        """RT5: Lotes de inserções e de chamadas são gravados em uma linha e recuperados por inteiro"""
+        riscos = [Risco.VERDE, Risco.AMARELO, Risco.VERDE, Risco.VERMELHO]
+        self.fila.inserir_lote([Atendimento(p, r) for p, r in zip(self.pacientes, riscos)])
+        self.fila.proximos(2)
+        self.journal.sincronizar()
+        with open(os.path.join(self.diretorio.name, 'fila-0.log')) as arquivo:
+            self.assertEqual(len(arquivo.readlines()), 2)
+        with open(os.path.join(self.diretorio.name, 'fila-0.log'), 'a') as arquivo:
+            arquivo.write('["C",[0,')  # Lote de chamadas incompleto: nenhuma chamada é aplicada
+
+        fila = self.reabrir()
+        self.assertEqual([a.paciente.cpf for a in fila.proximos(5)], [self.pacientes[i].cpf for i in (0, 2)])
@@ -0,0 +1,104 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from main.lote import ExecutorLote, ler_linha
+from main.repository import PacienteRepository, AtendimentoRepository
+from main.service import ProntoSocorroService
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ROTEIRO = """
+# Cadastro e atendimento de uma paciente
+registrar_paciente nome="Maria Souza" cpf=11111111111 email=maria@teste.com nascimento=21/03/2002
+{"op": "enfileirar", "cpf": "11111111111", "risco": "AMARELO", "id": 1}
+triagem gravidade_alta=sim
+enfileirar cpf=22222222222 risco=VERDE
+chamar_proximo
+buscar_por_nome nome='maria sousa' limite=1
+"""
+
+
+def criar_servico():
+    paciente_repo = PacienteRepository(indexar_nome=True)
+    return ProntoSocorroService(paciente_repo, AtendimentoRepository(paciente_repo))
+
+
+class TestLote(unittest.TestCase):
+
+    def executar(self, formato, parar_no_erro=False):
+        saida = io.StringIO()
+        resultado = ExecutorLote(criar_servico(), saida, formato, parar_no_erro).executar(ROTEIRO.splitlines())
+        return resultado, saida.getvalue().splitlines()
+
+    def test_forma_abreviada(self):
+        """RTB: A forma abreviada é convertida em requisições do protocolo"""
+        self.assertEqual(ler_linha('triagem risco_morte=nao gravidade_baixa=Sim discriminadores=febre,dor'),
+                         {'op': 'triagem', 'risco_morte': False, 'gravidade_baixa': True,
+                          'discriminadores': ['febre', 'dor']})
+        self.assertEqual(ler_linha("atualizar_paciente nome='Ana Lima' cpf=1"),
+                         {'op': 'atualizar_paciente', 'nome': 'Ana Lima', 'cpf': '1'})
+        self.assertIsNone(ler_linha('  # comentário'))
+        for linha in ('enfileirar cpf', 'triagem risco_morte=talvez', 'registrar_paciente nome="Maria', '{"op": '):
+            with self.subTest(linha=linha), self.assertRaises(ValueError):
+                ler_linha(linha)
+
+    def test_formato_texto(self):
+        """RT1: Cada operação gera uma linha de resultado, e os erros indicam a linha do roteiro"""
+        resultado, linhas = self.executar('texto')
+
+        self.assertEqual((resultado.operacoes, resultado.erros), (6, 1))
+        self.assertEqual(linhas[2], 'ok triagem: "LARANJA"')
+        self.assertEqual(linhas[3], 'erro na linha 6 (enfileirar): Paciente não cadastrado')
+        self.assertIn('"semelhanca": ', linhas[5])
+
+    def test_formato_json_e_silencioso(self):
+        """RT2: O formato json repete as respostas do protocolo e o silencioso mostra apenas os erros"""
+        _, linhas = self.executar('json')
+        respostas = [json.loads(linha) for linha in linhas]
+        self.assertEqual(respostas[1]['id'], 1)
+        self.assertEqual(respostas[4]['resultado']['risco'], 'AMARELO')
+
+        resultado, linhas = self.executar('silencioso', parar_no_erro=True)
+        self.assertEqual((resultado.operacoes, linhas), (4, ['erro na linha 6 (enfileirar): Paciente não cadastrado']))
+
+    def test_linha_de_comando(self):
+        """RT3: O roteiro é lido da entrada padrão, sem carregar o menu interativo"""
+        with tempfile.TemporaryDirectory() as diretorio:
+            processo = subprocess.run(
+                [sys.executable, '-X', 'importtime', os.path.join(RAIZ, 'main.py'), '--journal', diretorio, 'lote',
+                 '--formato', 'silencioso'],
+                input=ROTEIRO, capture_output=True, text=True, cwd=diretorio)
+
+        self.assertEqual(processo.returncode, 1)
+        self.assertEqual(processo.stdout, 'erro na linha 6 (enfileirar): Paciente não cadastrado\n')
+        self.assertIn('Operações: 6, erros: 1', processo.stderr)
+        self.assertNotIn('colorama', processo.stderr)
+        self.assertNotIn('main.cli', processo.stderr)
+
+    def test_campo_que_nao_e_texto(self):
+        """RT4: Uma linha com um campo de tipo inválido é respondida com erro sem interromper o roteiro"""
+        saida = io.StringIO()
+        roteiro = ['{"op": "registrar_paciente", "nome": 1, "cpf": "11111111111", "email": "maria@teste.com", '
+                   '"nascimento": "21/03/2002"}',
+                   'registrar_paciente nome="Maria Souza" cpf=11111111111 email=maria@teste.com nascimento=21/03/2002']
+        resultado = ExecutorLote(criar_servico(), saida, 'texto').executar(roteiro)
+
+        self.assertEqual((resultado.operacoes, resultado.erros), (2, 1))
+        linhas = saida.getvalue().splitlines()
+        self.assertEqual(linhas[0], 'erro na linha 1 (registrar_paciente): Requisição inválida: o campo nome deve ser um texto.')
+        self.assertTrue(linhas[1].startswith('ok registrar_paciente'))
+
+    def test_respostas_escritas_se_o_roteiro_falhar(self):
+        """RT5: As respostas já executadas são escritas mesmo se a leitura do roteiro for interrompida"""
+        def roteiro():
+            yield 'chamar_proximo'
+            raise OSError('falha de leitura')
+
+        saida = io.StringIO()
+        with self.assertRaises(OSError):
+            ExecutorLote(criar_servico(), saida, 'texto').executar(roteiro())
+        self.assertIn('erro na linha 1 (chamar_proximo)', saida.getvalue())
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from main.domain import Risco
+from main.error import FilaVaziaError
+from main.metricas import Metricas, instrumentar
+from main.repository import PacienteRepository, AtendimentoRepository
+from main.service import ProntoSocorroService
+
+
+class TestMetricas(unittest.TestCase):
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        paciente_repo = PacienteRepository()
+        self.ps_service = ProntoSocorroService(paciente_repo, AtendimentoRepository(paciente_repo))
+        self.paciente = self.ps_service.registrar_paciente("Maria", "11111111111", "maria@teste.com", "21/03/2002")
+
+    def test_servico_sem_instrumentacao(self):
+        """RTB: Sem instrumentação, as operações do serviço não são substituídas"""
+        self.assertIsNone(self.ps_service.metricas)
+        self.assertNotIn('chamar_proximo', vars(self.ps_service))
+
+    def test_latencias_erros_e_fila(self):
+        """RT1: Operações medidas, erros contados e tamanho da fila por risco exportados"""
+        metricas = instrumentar(self.ps_service)
+        for risco in (Risco.VERMELHO, Risco.AMARELO, Risco.AMARELO):
+            self.ps_service.inserir_fila_atendimento(self.ps_service.registrar_atendimento(self.paciente, risco))
+        self.ps_service.chamar_proximo()
+        self.ps_service.chamar_proximo()
+        self.ps_service.chamar_proximo()
+        with self.assertRaises(FilaVaziaError):
+            self.ps_service.chamar_proximo()
+
+        texto = metricas.exportar(self.ps_service.fila_atendimento)
+        self.assertIn('ps_operacao_duracao_segundos_count{operacao="registrar_atendimento"} 3', texto)
+        self.assertIn('ps_operacao_duracao_segundos_count{operacao="chamar_proximo"} 4', texto)
+        self.assertIn('ps_operacao_duracao_segundos_bucket{operacao="chamar_proximo",le="+Inf"} 4', texto)
+        self.assertIn('ps_erros_total{operacao="chamar_proximo",erro="FilaVaziaError"} 1', texto)
+        self.assertIn('ps_fila_pacientes{risco="VERMELHO"} 0', texto)
+
+        self.ps_service.inserir_fila_atendimento(self.ps_service.registrar_atendimento(self.paciente, Risco.AZUL))
+        self.assertIn('ps_fila_pacientes{risco="AZUL"} 1', metricas.exportar(self.ps_service.fila_atendimento))
+
+    def test_histograma_cumulativo(self):
+        """RT2: Os intervalos do histograma são cumulativos, como no formato do Prometheus"""
+        metricas = Metricas(intervalos=(0.001, 0.01))
+        for segundos in (0.0005, 0.005, 0.005, 2.0):
+            metricas.observar('chamar_proximo', segundos)
+
+        linhas = metricas.exportar().splitlines()
+        self.assertIn('ps_operacao_duracao_segundos_bucket{operacao="chamar_proximo",le="0.001"} 1', linhas)
+        self.assertIn('ps_operacao_duracao_segundos_bucket{operacao="chamar_proximo",le="0.01"} 3', linhas)
+        self.assertIn('ps_operacao_duracao_segundos_bucket{operacao="chamar_proximo",le="+Inf"} 4', linhas)
+        self.assertIn('ps_operacao_duracao_segundos_sum{operacao="chamar_proximo"} 2.0105', linhas)
+
+    def test_gravar_arquivo(self):
+        """RT3: As métricas são gravadas em um arquivo de texto"""
+        metricas = instrumentar(self.ps_service)
+        self.ps_service.buscar_historico(self.paciente)
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = os.path.join(diretorio, 'ps.prom')
+            metricas.gravar(caminho, self.ps_service.fila_atendimento)
+            with open(caminho, encoding='utf-8') as arquivo:
+                self.assertIn('operacao="buscar_historico"', arquivo.read())
+            self.assertEqual(os.listdir(diretorio), ['ps.prom'])
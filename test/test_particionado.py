@@ -0,0 +1,86 @@
+import unittest
+from datetime import datetime, timedelta
+from benchmark.dados import gerar_cpf
+from main.domain import Paciente, Atendimento, Risco
+from main.error import CPFDuplicadoError, PacienteNaoCadastradoError
+from main.importacao import importar_pacientes
+from main.particionado import criar_repositorios_particionados
+from main.service import ProntoSocorroService
+
+
+class TestRepositoriosParticionados(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.paciente_repo, cls.atendimento_repo = criar_repositorios_particionados(3, indexar_email=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.paciente_repo.particoes.fechar()
+
+    def test_pacientes(self):
+        """RTB: Pacientes são distribuídos entre as partições e encontrados pelo CPF"""
+        pacientes = [Paciente("Paciente", gerar_cpf(i), f"p{i}@teste.com", "01/01/2000") for i in range(1, 31)]
+        self.paciente_repo.inserir_lote(pacientes[1:])
+        self.paciente_repo.inserir(pacientes[0])
+
+        self.assertEqual(self.paciente_repo.buscar(pacientes[7].cpf), pacientes[7])
+        self.assertIsNone(self.paciente_repo.buscar(gerar_cpf(999)))
+        self.assertEqual(self.paciente_repo.existentes([pacientes[3].cpf, gerar_cpf(999), pacientes[20].cpf]),
+                         {pacientes[3].cpf, pacientes[20].cpf})
+        self.assertEqual(self.paciente_repo.buscar_por_email("P5@teste.com"), [pacientes[4]])
+        self.assertGreaterEqual(self.paciente_repo.tamanho(), 30)
+        with self.assertRaises(CPFDuplicadoError):
+            self.paciente_repo.inserir(pacientes[12])
+
+    def test_atendimentos(self):
+        """RT1: O histórico fica na partição do paciente e registra o risco final do atendimento"""
+        ps_service = ProntoSocorroService(self.paciente_repo, self.atendimento_repo)
+        paciente = ps_service.registrar_paciente("Maria", "529.982.247-25", "maria@teste.com", "21/03/2002")
+        inicio = datetime(2024, 1, 1)
+        self.atendimento_repo.inserir_lote([Atendimento(paciente, Risco.AZUL, inicio + timedelta(hours=h))
+                                            for h in range(3)])
+        atendimento = ps_service.registrar_atendimento(paciente, Risco.VERDE)
+        entrada = ps_service.inserir_fila_atendimento(atendimento)
+        ps_service.reclassificar(entrada, Risco.LARANJA)
+        ps_service.chamar_proximo()
+
+        historico = ps_service.buscar_historico(paciente)
+        self.assertEqual([a.risco for a in historico], [Risco.AZUL] * 3 + [Risco.LARANJA])
+        self.assertEqual(len(ps_service.buscar_historico(paciente, inicio + timedelta(hours=1), inicio + timedelta(hours=2))), 2)
+        pagina = ps_service.pagina_historico(paciente, 3, recentes_primeiro=True)
+        self.assertEqual([a.risco for a in pagina.atendimentos], [Risco.LARANJA, Risco.AZUL, Risco.AZUL])
+        self.assertEqual(len(ps_service.pagina_historico(paciente, 3, pagina.cursor, True).atendimentos), 1)
+        with self.assertRaises(PacienteNaoCadastradoError):
+            self.atendimento_repo.inserir(Atendimento(Paciente("João", "22222222222", "joao@teste.com", "01/01/2000"), Risco.AZUL))
+
+    def test_importacao(self):
+        """RT2: A importação valida e deduplica os lotes dentro das partições"""
+        linhas = [(i + 2, {"nome": "Paciente", "cpf": gerar_cpf(1000 + i % 40), "email": "p@teste.com",
+                           "nascimento": "01/01/2000"}) for i in range(50)]
+        linhas.append((52, {"nome": "Paciente", "cpf": "52998224726", "email": "p@teste.com", "nascimento": "01/01/2000"}))
+
+        resultado = importar_pacientes(self.paciente_repo, iter(linhas), tamanho_lote=20)
+
+        self.assertEqual((resultado.lidos, resultado.importados, resultado.rejeitados), (51, 40, 11))
+        self.assertIsNotNone(self.paciente_repo.buscar(gerar_cpf(1039)))
+
+    def test_atendimentos_com_a_mesma_entrada(self):
+        """RT3: Atendimentos do mesmo paciente com a mesma entrada são encerrados cada um na sua linha"""
+        ps_service = ProntoSocorroService(self.paciente_repo, self.atendimento_repo)
+        paciente = ps_service.registrar_paciente("Ana", gerar_cpf(2000), "ana@teste.com", "01/01/1990")
+        entrada = datetime(2024, 2, 1, 8)
+        atendimentos = [Atendimento(paciente, Risco.VERDE, entrada) for _ in range(3)]
+        self.atendimento_repo.inserir_lote(atendimentos)
+        primeiro = ps_service.inserir_fila_atendimento(atendimentos[0])
+        ps_service.inserir_fila_lote(atendimentos[1:])
+        ps_service.reclassificar(primeiro, Risco.VERMELHO)
+
+        self.assertEqual(ps_service.chamar_proximo(), atendimentos[0])
+        self.assertEqual([a.risco for a in ps_service.buscar_historico(paciente)],
+                         [Risco.VERMELHO, Risco.VERDE, Risco.VERDE])
+        atendimentos[2].risco = Risco.AZUL
+        ps_service.chamar_proximos(2)
+        self.assertEqual([a.risco for a in ps_service.buscar_historico(paciente)],
+                         [Risco.VERMELHO, Risco.VERDE, Risco.AZUL])
+        self.assertEqual(self.atendimento_repo.linhas_abertas, {})
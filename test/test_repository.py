@@ -1,8 +1,9 @@
 import unittest
+from datetime import datetime
 from main.domain import Paciente, Atendimento, Risco
 from main.service import ProntoSocorroService
 from main.repository import PacienteRepository, AtendimentoRepository
-from main.error import PacienteNaoCadastradoError
+from main.error import PacienteNaoCadastradoError, CPFDuplicadoError, ValidacaoError
 
 class TestAtendimentoRepository(unittest.TestCase):
 
@@ -47,4 +48,166 @@ class TestAtendimentoRepository(unittest.TestCase):
         historico = self.ps_service.buscar_historico(paciente)
 
         self.assertEqual(len(historico), 3)
-        
\ No newline at end of file
+
+    def test_historico_ordem_cronologica(self):
+        """RT3: O histórico é retornado em ordem de entrada, mesmo com inserções fora de ordem"""
+
+        paciente = self.ps_service.registrar_paciente("Fernanda", "33333333333", "fernanda@teste.com", "20/04/1987")
+
+        atendimento1 = Atendimento(paciente, Risco.AMARELO, datetime(2024, 1, 10, 8, 0))
+        atendimento2 = Atendimento(paciente, Risco.VERDE, datetime(2024, 3, 5, 14, 30))
+        atendimento3 = Atendimento(paciente, Risco.AZUL, datetime(2024, 2, 20, 9, 15))
+        for atendimento in (atendimento1, atendimento2, atendimento3):
+            self.atendimento_repo.inserir(atendimento)
+
+        historico = self.ps_service.buscar_historico(paciente)
+        self.assertEqual(historico, [atendimento1, atendimento3, atendimento2])
+
+    def test_historico_por_periodo(self):
+        """RT4: Busca do histórico restrita a um período, com limites inclusivos"""
+
+        paciente = self.ps_service.registrar_paciente("Fernanda", "33333333333", "fernanda@teste.com", "20/04/1987")
+        outro = self.ps_service.registrar_paciente("Carlos", "11111111111", "carlos@teste.com", "15/06/1990")
+
+        atendimentos = [Atendimento(paciente, Risco.VERDE, datetime(2024, mes, 1)) for mes in range(1, 7)]
+        for atendimento in atendimentos:
+            self.atendimento_repo.inserir(atendimento)
+        self.atendimento_repo.inserir(Atendimento(outro, Risco.VERDE, datetime(2024, 3, 1)))
+
+        historico = self.ps_service.buscar_historico(paciente, datetime(2024, 2, 1), datetime(2024, 4, 1))
+        self.assertEqual(historico, atendimentos[1:4])
+
+        historico = self.ps_service.buscar_historico(paciente, inicio=datetime(2024, 5, 15))
+        self.assertEqual(historico, atendimentos[5:])
+
+        historico = self.ps_service.buscar_historico(paciente, fim=datetime(2023, 12, 31))
+        self.assertEqual(historico, [])
+
+
+    def test_atendimento_encerrado(self):
+        """RT5: Atendimento encerrado continua no histórico, com o risco final, sem manter o objeto"""
+
+        paciente = self.ps_service.registrar_paciente("Fernanda", "33333333333", "fernanda@teste.com", "20/04/1987")
+        atendimento1 = self.ps_service.registrar_atendimento(paciente, Risco.AZUL)
+        atendimento2 = self.ps_service.registrar_atendimento(paciente, Risco.VERDE)
+        entrada = self.ps_service.inserir_fila_atendimento(atendimento1)
+        self.ps_service.reclassificar(entrada, Risco.LARANJA)
+        self.ps_service.chamar_proximo()
+
+        self.assertEqual(len(self.atendimento_repo.abertos), 0)
+        historico = self.ps_service.buscar_historico(paciente)
+        self.assertEqual(historico, [atendimento1, atendimento2])
+        self.assertIsNot(historico[0], atendimento1)  # Recriado a partir do arquivo colunar
+        self.assertEqual(historico[0].risco, Risco.LARANJA)
+        self.assertEqual(self.atendimento_repo.tamanho(), 2)
+
+        self.ps_service.inserir_fila_atendimento(atendimento2)
+        self.assertIs(self.ps_service.buscar_historico(paciente)[1], atendimento2)
+        self.assertEqual(self.atendimento_repo.tamanho(), 2)
+
+    def test_historico_paginado(self):
+        """RT6: Histórico em páginas, nas duas ordens, com entradas repetidas e inclusões entre as páginas"""
+
+        paciente = self.ps_service.registrar_paciente("Fernanda", "33333333333", "fernanda@teste.com", "20/04/1987")
+        for dia in (5, 1, 3, 3, 2, 4, 3):
+            self.atendimento_repo.inserir(Atendimento(paciente, Risco.VERDE, datetime(2024, 1, dia)))
+        completo = self.ps_service.buscar_historico(paciente)
+
+        for recentes_primeiro, esperado in ((False, completo), (True, completo[::-1])):
+            paginas, cursor = [], None
+            while True:
+                pagina = self.ps_service.pagina_historico(paciente, 3, cursor, recentes_primeiro)
+                paginas.append(pagina.atendimentos)
+                cursor = pagina.cursor
+                if cursor is None:
+                    break
+            self.assertEqual([len(p) for p in paginas], [3, 3, 1])
+            self.assertEqual([a.entrada for p in paginas for a in p], [a.entrada for a in esperado])
+
+        pagina = self.ps_service.pagina_historico(paciente, 4)
+        self.atendimento_repo.inserir(Atendimento(paciente, Risco.AZUL, datetime(2024, 1, 1)))
+        restante = self.ps_service.pagina_historico(paciente, 4, pagina.cursor)
+        self.assertEqual([a.entrada.day for a in restante.atendimentos], [3, 4, 5])
+        self.assertEqual([a.entrada.day for a in self.ps_service.iterar_historico(paciente, True, tamanho_pagina=2)],
+                         [5, 4, 3, 3, 3, 2, 1, 1])
+        periodo = self.ps_service.pagina_historico(paciente, 2, inicio=datetime(2024, 1, 2), fim=datetime(2024, 1, 3))
+        self.assertEqual([a.entrada.day for a in periodo.atendimentos], [2, 3])
+        self.assertIsNotNone(periodo.cursor)
+        with self.assertRaises(ValidacaoError):
+            self.ps_service.pagina_historico(paciente, 2, "cursor")
+
+    def test_atendimento_registrado_fora_da_fila(self):
+        """RT7: Atendimentos registrados e nunca inseridos na fila não ficam abertos"""
+
+        paciente = self.ps_service.registrar_paciente("Fernanda", "33333333333", "fernanda@teste.com", "20/04/1987")
+        for _ in range(3):
+            self.ps_service.registrar_atendimento(paciente, Risco.VERDE)
+
+        self.assertEqual((self.atendimento_repo.abertos, self.atendimento_repo.linhas_abertas), ({}, {}))
+        self.assertEqual(len(self.ps_service.buscar_historico(paciente)), 3)
+
+    def test_mesma_entrada(self):
+        """RT8: Atendimentos do mesmo paciente com a mesma entrada são abertos e encerrados nas suas linhas"""
+
+        paciente = self.ps_service.registrar_paciente("Fernanda", "33333333333", "fernanda@teste.com", "20/04/1987")
+        entrada = datetime(2024, 1, 1)
+        verde, azul = Atendimento(paciente, Risco.VERDE, entrada), Atendimento(paciente, Risco.AZUL, entrada)
+        self.atendimento_repo.inserir(verde)
+        self.atendimento_repo.inserir(azul)
+
+        self.assertEqual(self.atendimento_repo.abrir(verde), 0)
+        self.assertEqual(self.atendimento_repo.abrir(azul), 1)
+        azul.risco = Risco.AMARELO
+        self.atendimento_repo.encerrar(azul)
+        self.atendimento_repo.encerrar(verde)
+        self.assertEqual([a.risco for a in self.ps_service.buscar_historico(paciente)], [Risco.VERDE, Risco.AMARELO])
+        self.assertIsNone(self.atendimento_repo.abrir(Atendimento(paciente, Risco.VERDE, entrada)))
+
+class TestPacienteRepository(unittest.TestCase):
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        self.paciente_repo = PacienteRepository(indexar_email=True, indexar_nascimento=True)
+
+    def test_busca_por_cpf(self):
+        """RTB: Paciente inserido é encontrado pelo CPF, com ou sem pontuação"""
+
+        paciente = Paciente("Maria", "111.111.111-11", "maria@teste.com", "21/03/2002")
+        self.paciente_repo.inserir(paciente)
+
+        self.assertEqual(paciente.cpf, "11111111111")
+        self.assertIs(self.paciente_repo.buscar("11111111111"), paciente)
+        self.assertIs(self.paciente_repo.buscar("111.111.111-11"), paciente)
+        self.assertIsNone(self.paciente_repo.buscar("22222222222"))
+
+    def test_cpf_duplicado(self):
+        """RT1: Não pode existir dois pacientes com o mesmo CPF (regra 5)"""
+
+        self.paciente_repo.inserir(Paciente("Maria", "11111111111", "maria@teste.com", "21/03/2002"))
+
+        with self.assertRaises(CPFDuplicadoError) as context:
+            self.paciente_repo.inserir(Paciente("João", "111.111.111-11", "joao@teste.com", "21/03/2000"))
+        self.assertIn("CPF já cadastrado", context.exception.message)
+        self.assertEqual(self.paciente_repo.tamanho(), 1)
+
+    def test_indices_secundarios(self):
+        """RT2: Busca pelos índices de e-mail e data de nascimento"""
+
+        maria = Paciente("Maria", "11111111111", "maria@teste.com", "21/03/2002")
+        joao = Paciente("João", "22222222222", "joao@teste.com", "21/03/2002")
+        self.paciente_repo.inserir(maria)
+        self.paciente_repo.inserir(joao)
+
+        self.assertEqual(self.paciente_repo.buscar_por_email("MARIA@teste.com"), [maria])
+        self.assertEqual(self.paciente_repo.buscar_por_nascimento("21/03/2002"), [maria, joao])
+        self.assertEqual(self.paciente_repo.buscar_por_email("ana@teste.com"), [])
+
+    def test_busca_sem_indices_secundarios(self):
+        """RT3: Sem os índices secundários, a busca por e-mail e nascimento continua funcionando"""
+
+        repo = PacienteRepository()
+        maria = Paciente("Maria", "11111111111", "maria@teste.com", "21/03/2002")
+        repo.inserir(maria)
+
+        self.assertEqual(repo.buscar_por_email("maria@teste.com"), [maria])
+        self.assertEqual(repo.buscar_por_nascimento("21/03/2002"), [maria])
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from main.domain import Paciente, Atendimento, Risco
+from main.error import CPFDuplicadoError, PacienteNaoCadastradoError
+from main.repository_sqlite import PoolConexoes, PacienteRepositorySQLite, AtendimentoRepositorySQLite
+from main.service import ProntoSocorroService
+
+
+class TestRepositorySQLite(unittest.TestCase):
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.diretorio.name, 'ps.db')
+        self.pool = PoolConexoes(self.caminho, tamanho=2)
+        self.paciente_repo = PacienteRepositorySQLite(self.pool)
+        self.atendimento_repo = AtendimentoRepositorySQLite(self.paciente_repo)
+        self.ps_service = ProntoSocorroService(self.paciente_repo, self.atendimento_repo)
+
+    def tearDown(self):
+        self.pool.fechar()
+        self.diretorio.cleanup()
+
+    def test_cadastro_e_busca(self):
+        """RTB: Paciente cadastrado é encontrado pelo CPF, e-mail e data de nascimento"""
+        paciente = self.ps_service.registrar_paciente("Maria", "111.111.111-11", "maria@teste.com", "21/03/2002")
+
+        self.assertEqual(self.paciente_repo.buscar("11111111111"), paciente)
+        self.assertEqual(self.paciente_repo.buscar_por_email("MARIA@teste.com"), [paciente])
+        self.assertEqual(self.paciente_repo.buscar_por_nascimento("21/03/2002"), [paciente])
+        self.assertIsNone(self.paciente_repo.buscar("22222222222"))
+
+    def test_cpf_duplicado(self):
+        """RT1: Não pode existir dois pacientes com o mesmo CPF (regra 5)"""
+        self.ps_service.registrar_paciente("Maria", "11111111111", "maria@teste.com", "21/03/2002")
+
+        with self.assertRaises(CPFDuplicadoError):
+            self.ps_service.registrar_paciente("João", "11111111111", "joao@teste.com", "21/03/2000")
+        with self.assertRaises(CPFDuplicadoError):
+            self.paciente_repo.inserir_lote([Paciente("Ana", "22222222222", "ana@teste.com", "10/12/1985"),
+                                             Paciente("João", "11111111111", "joao@teste.com", "21/03/2000")])
+        self.assertEqual(self.paciente_repo.tamanho(), 1)  # O lote com erro não é gravado
+
+    def test_historico_por_periodo(self):
+        """RT2: Histórico em ordem cronológica e restrito a um período"""
+        paciente = self.ps_service.registrar_paciente("Fernanda", "33333333333", "fernanda@teste.com", "20/04/1987")
+        atendimentos = [Atendimento(paciente, Risco.VERDE, datetime(2024, mes, 1)) for mes in (3, 1, 2, 5, 4)]
+        self.atendimento_repo.inserir_lote(atendimentos)
+
+        historico = self.ps_service.buscar_historico(paciente)
+        self.assertEqual([a.entrada.month for a in historico], [1, 2, 3, 4, 5])
+
+        historico = self.ps_service.buscar_historico(paciente, datetime(2024, 2, 1), datetime(2024, 4, 1))
+        self.assertEqual([a.entrada.month for a in historico], [2, 3, 4])
+
+    def test_historico_paginado(self):
+        """RT5: Histórico em páginas, lidas a partir do cursor, nas duas ordens"""
+        paciente = self.ps_service.registrar_paciente("Fernanda", "33333333333", "fernanda@teste.com", "20/04/1987")
+        self.atendimento_repo.inserir_lote(Atendimento(paciente, Risco.VERDE, datetime(2024, 1, dia))
+                                           for dia in (5, 1, 3, 3, 2, 4, 3))
+
+        pagina = self.ps_service.pagina_historico(paciente, 4)
+        self.assertEqual([a.entrada.day for a in pagina.atendimentos], [1, 2, 3, 3])
+        pagina = self.ps_service.pagina_historico(paciente, 4, pagina.cursor)
+        self.assertEqual([a.entrada.day for a in pagina.atendimentos], [3, 4, 5])
+        self.assertIsNone(pagina.cursor)
+        self.assertEqual([a.entrada.day for a in self.ps_service.iterar_historico(paciente, True, tamanho_pagina=2)],
+                         [5, 4, 3, 3, 3, 2, 1])
+
+    def test_paciente_nao_cadastrado(self):
+        """RT3: Atendimento e histórico de paciente não cadastrado geram erro"""
+        paciente = Paciente("Ana", "22222222222", "ana@teste.com", "10/12/1985")
+
+        with self.assertRaises(PacienteNaoCadastradoError):
+            self.atendimento_repo.inserir(Atendimento(paciente, Risco.VERDE))
+        with self.assertRaises(PacienteNaoCadastradoError):
+            self.ps_service.buscar_historico(paciente)
+
+    def test_dados_persistem(self):
+        """RT4: Os dados continuam disponíveis ao reabrir o banco"""
+        paciente = self.ps_service.registrar_paciente("Maria", "11111111111", "maria@teste.com", "21/03/2002")
+        self.ps_service.registrar_atendimento(paciente, Risco.AMARELO)
+        self.pool.fechar()
+
+        self.pool = PoolConexoes(self.caminho, tamanho=1)
+        paciente_repo = PacienteRepositorySQLite(self.pool)
+        historico = AtendimentoRepositorySQLite(paciente_repo).historico_atendimentos("11111111111")
+        self.assertEqual(paciente_repo.buscar("11111111111"), paciente)
+        self.assertEqual([a.risco for a in historico], [Risco.AMARELO])
@@ -1,6 +1,8 @@
 import unittest
+from datetime import datetime, timedelta
 from typing import List
 from main.domain import *
+from main.fila import MotorFilaHeap
 from main.repository import PacienteRepository, AtendimentoRepository
 from main.service import ProntoSocorroService
 
@@ -26,17 +28,17 @@ class TestProntoSocorroService(unittest.TestCase):
         ficha = FichaAnalise(risco_morte=False, gravidade_alta=False, gravidade_moderada=False, gravidade_baixa=True)
         self.assertEqual(self.ps_service.classificar_risco(ficha), Risco.VERDE)
 
-    def test_risco_laranja(self):
+    def test_risco_amarelo(self):
         """RT2: Paciente com gravidade moderada"""
 
         ficha = FichaAnalise(risco_morte=False, gravidade_alta=False, gravidade_moderada=True, gravidade_baixa=False)
-        self.assertEqual(self.ps_service.classificar_risco(ficha), Risco.LARANJA)
+        self.assertEqual(self.ps_service.classificar_risco(ficha), Risco.AMARELO)
 
-    def test_risco_amarelo(self):
+    def test_risco_laranja(self):
         """RT3: Paciente com gravidade alta"""
 
         ficha = FichaAnalise(risco_morte=False, gravidade_alta=True, gravidade_moderada=False, gravidade_baixa=False)
-        self.assertEqual(self.ps_service.classificar_risco(ficha), Risco.AMARELO)
+        self.assertEqual(self.ps_service.classificar_risco(ficha), Risco.LARANJA)
 
     def test_risco_vermelho(self):
         """RT4: Paciente com risco de morte"""
@@ -61,8 +63,8 @@ class TestProntoSocorroService(unittest.TestCase):
         proximo = self.ps_service.chamar_proximo()
         self.assertEqual(proximo, atendimento2)  
 
-    """def test__mesmo_risco_ordem_chegada(self):
-        RT1: Se os pacientes tiverem o mesmo risco, o primeiro a chegar deve ser chamado primeiro
+    def test__mesmo_risco_ordem_chegada(self):
+        """RT1: Se os pacientes tiverem o mesmo risco, o primeiro a chegar deve ser chamado primeiro"""
         paciente1 = Paciente("Diego", "55555555555", "diego@teste.com", "20/03/1985")
         paciente2 = Paciente("Fernanda", "66666666666", "fernanda@teste.com", "11/07/1990")
 
@@ -74,7 +76,6 @@ class TestProntoSocorroService(unittest.TestCase):
 
         proximo = self.fila.proximo()
         self.assertEqual(proximo, atendimento1)  
-    """
 
     def test_chamada_paciente_fila_mantem_ordem_(self):
         """RT2: Após chamada de um paciente, a fila continua na ordem correta"""
@@ -113,19 +114,18 @@ class TestProntoSocorroService(unittest.TestCase):
         proximo = self.ps_service.chamar_proximo()
         self.assertEqual(proximo, atendimento)
 
-    """def test_multiplos_pacientes_riscos_iguais(self):
-        RT5: Com múltiplos pacientes na fila com o mesmo risco, o primeiro a chegar deve ser chamado primeiro
+    def test_multiplos_pacientes_riscos_iguais(self):
+        """RT5: Com múltiplos pacientes na fila com o mesmo risco, o primeiro a chegar deve ser chamado primeiro"""
         paciente1 = self.ps_service.registrar_paciente("Amanda", "99999999999", "amanda@teste.com", "05/07/1982")
         atendimento1 = self.ps_service.registrar_atendimento(paciente1, Risco.AZUL)
         self.ps_service.inserir_fila_atendimento(atendimento1)  # Insere primeiro paciente
         
-        paciente2 = self.ps_service.registrar_paciente("Roberto", "10101010101", "roberto@teste.com", "29/12/1978")
+        paciente2 = self.ps_service.registrar_paciente("Roberto", "10101010133", "roberto@teste.com", "29/12/1978")
         atendimento2 = self.ps_service.registrar_atendimento(paciente2, Risco.AZUL)
         self.ps_service.inserir_fila_atendimento(atendimento2)  # Insere segundo paciente
 
         proximo = self.ps_service.chamar_proximo()
         self.assertEqual(proximo, atendimento1)  # Paciente inserido primeiro deve ser chamado primeiro
-    """
 
 
     # Os testes abaixo cobrem RF4: Chamar Próximo da Fila
@@ -183,11 +183,11 @@ class TestProntoSocorroService(unittest.TestCase):
         proximo = self.ps_service.chamar_proximo()
         self.assertEqual(proximo, atendimento2)  # O próximo deve ser o paciente de risco AMARELO
 
-    """def test_rt4_remocao_pacientes_mesmo_risco(self):
-        RT4: Remoção de pacientes com risco igual mantém a ordem de chegada
+    def test_rt4_remocao_pacientes_mesmo_risco(self):
+        """RT4: Remoção de pacientes com risco igual mantém a ordem de chegada"""
 
         paciente1 = self.ps_service.registrar_paciente("Amanda", "99999999999", "amanda@teste.com", "05/07/1982")
-        paciente2 = self.ps_service.registrar_paciente("Roberto", "10101010101", "roberto@teste.com", "29/12/1978")
+        paciente2 = self.ps_service.registrar_paciente("Roberto", "10101010133", "roberto@teste.com", "29/12/1978")
 
         atendimento1 = self.ps_service.registrar_atendimento(paciente1, Risco.AZUL)
         atendimento2 = self.ps_service.registrar_atendimento(paciente2, Risco.AZUL)
@@ -199,4 +199,131 @@ class TestProntoSocorroService(unittest.TestCase):
         self.assertEqual(chamado, atendimento1)  # Primeiro paciente inserido deve ser chamado primeiro
         chamado2 = self.ps_service.chamar_proximo()
         self.assertEqual(chamado2, atendimento2)  # Depois o segundo paciente inserido
-"""
\ No newline at end of file
+
+
+    def test_fila_com_motor_heap(self):
+        """RT5: A fila respeita risco e ordem de chegada também com o motor baseado em heap"""
+
+        fila = FilaAtendimento(MotorFilaHeap(len(Risco)))
+        paciente1 = Paciente("Amanda", "99999999999", "amanda@teste.com", "05/07/1982")
+        paciente2 = Paciente("Roberto", "22222222222", "roberto@teste.com", "29/12/1978")
+
+        atendimento1 = Atendimento(paciente1, Risco.AZUL)
+        atendimento2 = Atendimento(paciente2, Risco.AZUL)
+        atendimento3 = Atendimento(paciente2, Risco.VERMELHO)
+
+        for atendimento in (atendimento1, atendimento2, atendimento3):
+            fila.inserir(atendimento)
+
+        self.assertEqual(fila.tamanho(Risco.AZUL), 2)
+        self.assertEqual([fila.proximo() for _ in range(3)], [atendimento3, atendimento1, atendimento2])
+
+
+    def test_reclassificar_paciente_na_fila(self):
+        """RT6: Paciente reclassificado passa a ser chamado conforme o novo risco"""
+
+        paciente1 = self.ps_service.registrar_paciente("Lucas", "66666666666", "lucas@teste.com", "15/08/1993")
+        paciente2 = self.ps_service.registrar_paciente("Miguel", "77777777777", "miguel@teste.com", "02/11/1990")
+
+        atendimento1 = self.ps_service.registrar_atendimento(paciente1, Risco.AMARELO)
+        atendimento2 = self.ps_service.registrar_atendimento(paciente2, Risco.VERDE)
+
+        self.ps_service.inserir_fila_atendimento(atendimento1)
+        entrada = self.ps_service.inserir_fila_atendimento(atendimento2)
+        self.ps_service.reclassificar(entrada, Risco.VERMELHO)
+
+        self.assertEqual(atendimento2.risco, Risco.VERMELHO)
+        self.assertEqual(self.ps_service.fila_atendimento.tamanho(Risco.VERDE), 0)
+        self.assertEqual(self.ps_service.chamar_proximo(), atendimento2)
+
+    def test_remover_paciente_da_fila(self):
+        """RT7: Paciente que desiste do atendimento é removido da fila"""
+
+        paciente1 = self.ps_service.registrar_paciente("Lucas", "66666666666", "lucas@teste.com", "15/08/1993")
+        paciente2 = self.ps_service.registrar_paciente("Miguel", "77777777777", "miguel@teste.com", "02/11/1990")
+
+        atendimento1 = self.ps_service.registrar_atendimento(paciente1, Risco.VERMELHO)
+        atendimento2 = self.ps_service.registrar_atendimento(paciente2, Risco.VERDE)
+
+        entrada = self.ps_service.inserir_fila_atendimento(atendimento1)
+        self.ps_service.inserir_fila_atendimento(atendimento2)
+
+        self.assertEqual(self.ps_service.remover_da_fila(entrada), atendimento1)
+        self.assertEqual(self.ps_service.chamar_proximo(), atendimento2)
+        self.assertEqual(self.ps_service.fila_atendimento.tamanho(), 0)
+
+    def test_alterar_atendimento_fora_da_fila(self):
+        """RT8: Não é possível reclassificar ou remover um atendimento que já saiu da fila"""
+
+        paciente = self.ps_service.registrar_paciente("Lucas", "66666666666", "lucas@teste.com", "15/08/1993")
+        atendimento = self.ps_service.registrar_atendimento(paciente, Risco.AMARELO)
+
+        entrada = self.ps_service.inserir_fila_atendimento(atendimento)
+        self.ps_service.chamar_proximo()
+
+        with self.assertRaises(AtendimentoForaDaFilaError):
+            self.ps_service.reclassificar(entrada, Risco.VERMELHO)
+        with self.assertRaises(AtendimentoForaDaFilaError):
+            self.ps_service.remover_da_fila(entrada)
+
+
+    def test_fila_por_prazo_evita_espera_excessiva(self):
+        """RT9: Na fila por prazo, um paciente que excedeu a meta de espera passa à frente"""
+
+        fila = FilaAtendimento.por_prazo()
+        ps_service = ProntoSocorroService(self.paciente_repo, self.atendimento_repo, fila)
+        paciente1 = ps_service.registrar_paciente("Amanda", "99999999999", "amanda@teste.com", "05/07/1982")
+        paciente2 = ps_service.registrar_paciente("Roberto", "22222222222", "roberto@teste.com", "29/12/1978")
+
+        agora = datetime.now()
+        azul = Atendimento(paciente1, Risco.AZUL, agora - timedelta(hours=5))
+        amarelo = Atendimento(paciente2, Risco.AMARELO, agora)
+        ps_service.inserir_fila_atendimento(amarelo)
+        ps_service.inserir_fila_atendimento(azul)
+
+        self.assertEqual(ps_service.chamar_proximo(), azul)
+        self.assertEqual(ps_service.chamar_proximo(), amarelo)
+
+    def test_fila_por_prazo_metas_configuraveis(self):
+        """RT10: As metas de espera da fila por prazo podem ser configuradas por risco"""
+
+        fila = FilaAtendimento.por_prazo({Risco.VERDE: timedelta(minutes=5)})
+        paciente = Paciente("Amanda", "99999999999", "amanda@teste.com", "05/07/1982")
+
+        agora = datetime.now()
+        verde = Atendimento(paciente, Risco.VERDE, agora)
+        laranja = Atendimento(paciente, Risco.LARANJA, agora)
+        fila.inserir(laranja)
+        fila.inserir(verde)
+        self.assertEqual(fila.proximo(), verde)
+
+        fila.inserir(verde)
+        fila.definir_metas({})
+        self.assertEqual(fila.tamanho(), 2)
+        self.assertEqual(fila.proximo(), laranja)
+
+    def test_definir_metas_fila_sem_prazo(self):
+        """RT11: Definir metas em uma fila que não é ordenada por prazo gera erro"""
+
+        with self.assertRaises(ModoFilaError) as context:
+            self.ps_service.fila_atendimento.definir_metas({Risco.VERDE: timedelta(minutes=5)})
+        self.assertIn("prazo", context.exception.message)
+
+    def test_inserir_lote_e_chamar_proximos(self):
+        """RT12: Um lote de atendimentos entra na fila de uma vez e vários pacientes são chamados juntos"""
+
+        pacientes = [self.ps_service.registrar_paciente(nome, cpf, "vitima@teste.com", "01/01/1990") for nome, cpf in
+                     (("Amanda", "99999999999"), ("Roberto", "10101010133"), ("Carlos", "11111111111"))]
+        riscos = [Risco.AMARELO, Risco.VERMELHO, Risco.AMARELO]
+        atendimentos = [self.ps_service.registrar_atendimento(p, r) for p, r in zip(pacientes, riscos)]
+        entradas = self.ps_service.inserir_fila_lote(atendimentos)
+
+        self.assertEqual([entrada.item for entrada in entradas], atendimentos)
+        self.assertEqual(self.ps_service.fila_atendimento.tamanho(Risco.AMARELO), 2)
+        self.assertEqual(self.ps_service.chamar_proximos(2), [atendimentos[1], atendimentos[0]])
+        self.assertEqual(self.ps_service.chamar_proximos(5), [atendimentos[2]])
+        self.assertEqual(sum(self.ps_service.tempos_espera.chamados.values()), 3)
+        with self.assertRaises(FilaVaziaError):
+            self.ps_service.chamar_proximos(2)
+        with self.assertRaises(ValidacaoError):
+            self.ps_service.chamar_proximos(0)
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import unittest
+from benchmark.dados import gerar_cpf
+from main.protocolo import Protocolo
+from main.repository import PacienteRepository, AtendimentoRepository
+from main.service import ProntoSocorroService
+from main.servidor import ServidorPS
+
+
+def criar_servico():
+    paciente_repo = PacienteRepository()
+    return ProntoSocorroService(paciente_repo, AtendimentoRepository(paciente_repo))
+
+
+MARIA = {'op': 'registrar_paciente', 'nome': 'Maria', 'cpf': '11111111111',
+         'email': 'maria@teste.com', 'nascimento': '21/03/2002'}
+
+
+class TestProtocolo(unittest.TestCase):
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        self.protocolo = Protocolo(criar_servico())
+
+    def test_fluxo_completo(self):
+        """RTB: Registro, triagem, fila, chamada e histórico pelo protocolo"""
+        self.assertTrue(self.protocolo.executar(MARIA)['ok'])
+
+        triagem = self.protocolo.executar({'op': 'triagem', 'risco_morte': True})
+        self.assertEqual(triagem['resultado'], 'VERMELHO')
+
+        enfileirado = self.protocolo.executar({'op': 'enfileirar', 'cpf': '11111111111', 'gravidade_baixa': True})
+        self.assertEqual(enfileirado['resultado']['risco'], 'VERDE')
+
+        chamado = self.protocolo.executar({'op': 'chamar_proximo', 'id': 7})
+        self.assertEqual(chamado['id'], 7)
+        self.assertEqual(chamado['resultado']['paciente']['cpf'], '11111111111')
+
+        historico = self.protocolo.executar({'op': 'historico', 'cpf': '11111111111'})
+        self.assertEqual(len(historico['resultado']), 1)
+
+    def test_erros(self):
+        """RT1: Erros de negócio e requisições inválidas são respondidos sem interromper o serviço"""
+        self.protocolo.executar(MARIA)
+
+        self.assertEqual(self.protocolo.executar(MARIA)['erro'], 'CPF já cadastrado no sistema.')
+        self.assertIn('fila de atendimento', self.protocolo.executar({'op': 'chamar_proximo'})['erro'])
+        self.assertEqual(self.protocolo.executar({'op': 'historico', 'cpf': '22222222222'})['erro'],
+                         'Paciente não cadastrado')
+        self.assertEqual(self.protocolo.executar({'op': 'desconhecida'})['erro'], 'Operação desconhecida.')
+        self.assertFalse(self.protocolo.executar({'op': 'enfileirar'})['ok'])
+
+
+class TestServidorPS(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.servidor = ServidorPS(criar_servico())
+        servidor = await self.servidor.iniciar('127.0.0.1', 0)
+        self.porta = servidor.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        await self.servidor.encerrar()
+
+    async def enviar(self, reader, writer, linha: bytes) -> dict:
+        writer.write(linha)
+        await writer.drain()
+        return json.loads(await reader.readline())
+
+    async def test_requisicoes_pela_rede(self):
+        """RTB: Respostas chegam em ordem, uma por linha, inclusive para JSON inválido"""
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.porta)
+
+        resposta = await self.enviar(reader, writer, json.dumps(MARIA).encode() + b'\n')
+        self.assertTrue(resposta['ok'])
+        resposta = await self.enviar(reader, writer, b'{invalido\n')
+        self.assertEqual(resposta['erro'], 'JSON inválido.')
+        resposta = await self.enviar(reader, writer, b'{"op": "historico", "cpf": "11111111111"}\n')
+        self.assertEqual(resposta['resultado'], [])
+
+        writer.close()
+        await writer.wait_closed()
+
+    async def test_muitas_conexoes_simultaneas(self):
+        """RT1: Vários clientes simultâneos compartilham a mesma fila sem perder pacientes"""
+        async def cliente(indice):
+            reader, writer = await asyncio.open_connection('127.0.0.1', self.porta)
+            cpf = gerar_cpf(indice + 1)
+            await self.enviar(reader, writer, json.dumps({**MARIA, 'cpf': cpf}).encode() + b'\n')
+            resposta = await self.enviar(reader, writer, json.dumps({'op': 'enfileirar', 'cpf': cpf,
+                                                                     'risco': 'AZUL'}).encode() + b'\n')
+            writer.close()
+            await writer.wait_closed()
+            return resposta['ok']
+
+        resultados = await asyncio.gather(*(cliente(i) for i in range(50)))
+
+        self.assertTrue(all(resultados))
+        self.assertEqual(self.servidor.protocolo.ps_service.fila_atendimento.tamanho(), 50)
+
+    async def test_requisicoes_malformadas(self):
+        """RT2: Requisições fora do UTF-8 ou com campos de tipo inválido são respondidas sem encerrar a conexão"""
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.porta)
+
+        resposta = await self.enviar(reader, writer, b'{"op": "historico", "cpf": "\xff\xfe"}\n')
+        self.assertEqual(resposta, {'ok': False, 'erro': 'Requisição não está em UTF-8.'})
+        resposta = await self.enviar(reader, writer, json.dumps({**MARIA, 'nome': 1}).encode() + b'\n')
+        self.assertFalse(resposta['ok'])
+        self.assertIn('nome', resposta['erro'])
+        resposta = await self.enviar(reader, writer, json.dumps(MARIA).encode() + b'\n')
+        self.assertTrue(resposta['ok'])
+
+        writer.close()
+        await writer.wait_closed()
@@ -0,0 +1,36 @@
+import unittest
+from datetime import timedelta
+from main.domain import Risco
+from main.error import ValidacaoError
+from main.simulacao import Simulacao
+
+
+class TestSimulacao(unittest.TestCase):
+
+    def test_simulacao_deterministica(self):
+        """RTB: A simulação com a mesma semente produz o mesmo resultado"""
+        primeira = Simulacao(medicos=2, chegadas_por_hora=8, semente=3, pacientes=50).executar(timedelta(hours=6))
+        segunda = Simulacao(medicos=2, chegadas_por_hora=8, semente=3, pacientes=50).executar(timedelta(hours=6))
+        self.assertGreater(primeira.chegadas, 0)
+        self.assertEqual(primeira.chegadas, segunda.chegadas)
+        self.assertEqual(primeira.espera_media, segunda.espera_media)
+        self.assertEqual(primeira.chegadas, primeira.atendidos + primeira.aguardando)
+        self.assertLessEqual(primeira.ocupacao, 1.0)
+
+    def test_simulacao_prioriza_risco(self):
+        """RT1: Com os médicos sobrecarregados, os riscos mais graves esperam menos"""
+        for motor in ('baldes', 'heap', 'prazo'):
+            resultado = Simulacao(medicos=3, chegadas_por_hora=12, motor=motor, pacientes=50).executar(timedelta(hours=8))
+            self.assertGreater(resultado.aguardando, 0)
+            self.assertLess(resultado.espera_media[Risco.LARANJA], resultado.espera_media[Risco.VERDE])
+            self.assertGreaterEqual(resultado.fila_maxima, resultado.aguardando)
+
+    def test_chegadas_por_hora(self):
+        """RT2: Sem chegadas nas horas simuladas, nenhum paciente é registrado"""
+        taxas = [0] * 12 + [30] * 12
+        resultado = Simulacao(chegadas_por_hora=taxas, pacientes=10).executar(timedelta(hours=4))
+        self.assertEqual((resultado.chegadas, resultado.eventos), (0, 0))  # Chegadas rejeitadas não são eventos
+        with self.assertRaises(ValidacaoError):
+            Simulacao(chegadas_por_hora=[10] * 23)
+        with self.assertRaises(ValidacaoError):
+            Simulacao(motor='desconhecido')
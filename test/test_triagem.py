@@ -0,0 +1,70 @@
+import itertools
+import random
+import unittest
+from main.domain import FichaAnalise, Risco
+from main.error import ValidacaoError
+from main.triagem import DISCRIMINADORES_GERAIS, FLUXOGRAMAS, MotorTriagem
+
+
+def classificar_referencia(ficha: FichaAnalise) -> Risco:
+    """Regras de referência: o risco mais grave entre os discriminadores presentes, ou AZUL."""
+    presentes = set(ficha.discriminadores)
+    for campo in ('risco_morte', 'gravidade_alta', 'gravidade_moderada', 'gravidade_baixa'):
+        if getattr(ficha, campo):
+            presentes.add(campo)
+    for risco in (Risco.VERMELHO, Risco.LARANJA, Risco.AMARELO, Risco.VERDE):
+        regras = DISCRIMINADORES_GERAIS.get(risco, ()) + FLUXOGRAMAS[ficha.fluxograma].get(risco, ())
+        if presentes.intersection(regras):
+            return risco
+    return Risco.AZUL
+
+
+class TestMotorTriagem(unittest.TestCase):
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        self.motor = MotorTriagem()
+
+    def test_campos_da_ficha(self):
+        """RTB: Todas as combinações dos campos booleanos seguem a escala de cores"""
+        for campos in itertools.product((False, True), repeat=4):
+            ficha = FichaAnalise(*campos)
+            self.assertEqual(self.motor.classificar(ficha), classificar_referencia(ficha), campos)
+        self.assertEqual(self.motor.classificar(FichaAnalise(False, True, True, True)), Risco.LARANJA)
+        self.assertEqual(self.motor.classificar(FichaAnalise(False, False, True, True)), Risco.AMARELO)
+
+    def test_fluxogramas_regras_de_referencia(self):
+        """RT1: O motor compilado coincide com as regras de referência em fichas aleatórias"""
+        rnd = random.Random(3)
+        nomes = sorted(self.motor.bits)
+        fichas = [FichaAnalise(*(rnd.random() < 0.05 for _ in range(4)), rnd.choice(sorted(FLUXOGRAMAS)),
+                               frozenset(rnd.sample(nomes, rnd.randrange(4))))
+                  for _ in range(5000)]
+
+        self.assertEqual(self.motor.classificar_lote(fichas), [classificar_referencia(f) for f in fichas])
+
+    def test_discriminadores_do_fluxograma(self):
+        """RT2: Discriminadores específicos valem apenas no seu fluxograma"""
+        dor = FichaAnalise(False, False, False, False, 'dor_toracica', frozenset({'dor_precordial'}))
+        self.assertEqual(self.motor.classificar(dor), Risco.LARANJA)
+        geral = FichaAnalise(False, False, False, True, 'geral', frozenset({'dor_precordial'}))
+        self.assertEqual(self.motor.classificar(geral), Risco.VERDE)
+
+    def test_nomes_desconhecidos(self):
+        """RT3: Fluxograma ou discriminador desconhecido"""
+        with self.assertRaises(ValidacaoError):
+            self.motor.classificar(FichaAnalise(False, False, False, False, 'inexistente'))
+        with self.assertRaises(ValidacaoError):
+            self.motor.classificar(FichaAnalise(False, False, False, False, 'geral', frozenset({'inexistente'})))
+
+    def test_tabelas_personalizadas(self):
+        """RT4: Tabelas de regras próprias, com mais de 8 discriminadores por fluxograma"""
+        gerais = {Risco.VERMELHO: ('risco_morte',), Risco.LARANJA: ('gravidade_alta',),
+                  Risco.AMARELO: ('gravidade_moderada',), Risco.VERDE: ('gravidade_baixa',)}
+        fluxogramas = {'teste': {Risco.VERDE: tuple(f'v{i}' for i in range(20)), Risco.VERMELHO: ('grave',)}}
+        motor = MotorTriagem(gerais, fluxogramas)
+
+        self.assertEqual(motor.classificar(FichaAnalise(False, False, False, False, 'teste', frozenset({'v17'}))),
+                         Risco.VERDE)
+        self.assertEqual(motor.classificar(FichaAnalise(False, True, False, False, 'teste', frozenset({'v3', 'grave'}))),
+                         Risco.VERMELHO)
@@ -0,0 +1,61 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from benchmark.dados import gerar_cpf, gerar_pacientes
+from main import validacao
+from main.domain import Paciente
+from main.error import ValidacaoError
+from main.validacao import validar_colunas, verificar_digitos_cpf
+
+FUTURO = (datetime.now() + timedelta(days=1)).strftime("%d/%m/%Y")
+
+REGISTROS = [
+    ("Maria", "11111111111", "maria@teste.com", "21/03/2002"),
+    ("Maria", "529.982.247-25", "maria@teste.com", "21/03/2002"),
+    ("", "52998224725", "maria@teste.com", "21/03/2002"),
+    ("Maria123", "52998224725", "maria@teste.com", "21/03/2002"),
+    ("Maria", "1111111", "maria@teste.com", "21/03/2002"),
+    ("Maria", "11111aaaa11", "maria@teste.com", "21/03/2002"),
+    ("Maria", "52998224726", "maria@teste.com", "21/03/2002"),
+    ("Maria", "52998224715", "maria.com", "21/03/2002"),
+    ("Maria", "52998224725", "", "21/03/2002"),
+    ("Maria", "52998224725", "maria@teste.com", "31/02/2002"),
+    ("Maria", "52998224725", "maria@teste.com", "10/XX/2002"),
+    ("Maria", "52998224725", "maria@teste.com", "1/3/2002"),
+    ("Maria", "52998224725", "maria@teste.com", FUTURO),
+    ("Maria123", "abc", "maria.com", "xx"),
+]
+
+
+def motivo_por_objeto(registro):
+    try:
+        Paciente(*registro)
+        return None
+    except ValidacaoError as e:
+        return e.message
+
+
+class TestValidacaoColunas(unittest.TestCase):
+
+    def test_mesmo_veredito_do_paciente(self):
+        """RTB: A validação em colunas dá o mesmo veredito e a mesma mensagem que a de um Paciente"""
+        cpfs, motivos = validar_colunas(*zip(*REGISTROS))
+
+        self.assertEqual(motivos, [motivo_por_objeto(registro) for registro in REGISTROS])
+        self.assertEqual(cpfs[1], "52998224725")
+
+    def test_sem_numpy(self):
+        """RT1: Sem NumPy, os dígitos verificadores são conferidos linha a linha"""
+        cpfs = [gerar_cpf(i) for i in range(1, 200)] + ["52998224726", "12345678900"]
+        with mock.patch.object(validacao, 'np', None):
+            self.assertEqual(verificar_digitos_cpf(cpfs), [True] * 199 + [False, False])
+
+    def test_lote_gerado(self):
+        """RT2: Pacientes gerados para os benchmarks são todos válidos"""
+        _, motivos = validar_colunas(*zip(*gerar_pacientes(1000)))
+
+        self.assertEqual(motivos, [None] * 1000)
+
+    def test_lote_vazio(self):
+        """RT3: Um lote vazio não tem rejeições"""
+        self.assertEqual(validar_colunas([], [], [], []), ([], []))